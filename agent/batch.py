@@ -0,0 +1,294 @@
+"""
+Batch runner for the SQL agent: answers a file of canned business questions
+(nightly KPI reports) with the same ReAct agent as the chat UI.
+
+- The Gold schema is discovered once and shared by every question.
+- Questions run concurrently. LLM calls are not combined into batched
+  requests: each agent step is its own call, and a semaphore only caps how
+  many are in flight (--llm-concurrency); Dremio queries are capped the same
+  way (--dremio-concurrency).
+- SQL generated by several questions is executed once per batch (after the
+  guard and normalize_sql); duplicates wait for, and reuse, the first result.
+  Failed executions are not kept, so a later duplicate runs the SQL again.
+- Questions the agent answered before (paraphrases included, see
+  question_memo.py) rerun the remembered SQL without calling the LLM;
+  --no-memo always asks the agent.
+- Each answer is written as one JSON line with its SQL and timings.
+
+The LLM can be replaced (run_batch(llm=...)) and Dremio is reached through
+DREMIO_HOST/DREMIO_PORT, so a batch runs against a stub model and a local
+Flight server as well.
+
+Questions file: one question per line (.txt, '#' comments allowed) or JSON
+lines with "question" and optional "id" (.jsonl).
+
+Usage:
+    python batch.py questions.txt --output results.jsonl
+    python batch.py kpis.jsonl --concurrency 16 --llm-concurrency 8 --dremio-concurrency 4
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from langchain.tools import Tool
+from langchain_core.runnables import Runnable
+
+from result_cache import normalize_sql
+from sql_agent import (
+    DREMIO_POOL_SIZE,
+    MAX_DISPLAY_ROWS,
+    MISTRAL_API_KEY,
+    SQL_ROW_LIMIT,
+    SQL_TOOL_DESCRIPTION,
+    STREAM_MAX_BYTES,
+    _execute_checked_async,
+    create_agent,
+    create_llm,
+    discover_schema,
+    format_result,
+    question_memo,
+    recall_question,
+    remember_answer,
+)
+from sql_guard import QueryRejected, guard_sql
+
+logger = logging.getLogger(__name__)
+
+# Timings of the question being answered; each question runs in its own task
+_question_stats: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "question_stats", default=None
+)
+
+
+def _record(kind: str, seconds: float):
+    stats = _question_stats.get()
+    if stats is not None:
+        stats[f"{kind}_calls"] += 1
+        stats[f"{kind}_seconds"] += seconds
+
+
+class BoundedLLM(Runnable):
+    """Chat model wrapper limiting concurrent calls across the batch."""
+
+    def __init__(self, llm, semaphore: asyncio.Semaphore):
+        self.llm = llm
+        self.semaphore = semaphore
+
+    def invoke(self, input, config=None, **kwargs):
+        return self.llm.invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        async with self.semaphore:
+            start = time.perf_counter()
+            try:
+                return await self.llm.ainvoke(input, config, **kwargs)
+            finally:
+                _record("llm", time.perf_counter() - start)
+
+
+# Prefixes of sql_query observations reporting a failed query
+_FAILED_RESULTS = ("SQL Error", "Query rejected")
+
+
+class SharedSQL:
+    """sql_query tool for a batch: each distinct guarded SQL runs once on Dremio."""
+
+    def __init__(self, dremio_concurrency: int):
+        self.semaphore = asyncio.Semaphore(dremio_concurrency)
+        self._results: Dict[str, asyncio.Task] = {}
+        self.executed = 0
+        self.reused = 0
+
+    async def _execute(self, query: str) -> str:
+        async with self.semaphore:
+            try:
+                result = await _execute_checked_async(
+                    query, max_rows=MAX_DISPLAY_ROWS, max_bytes=STREAM_MAX_BYTES
+                )
+                return format_result(result)
+            except QueryRejected as e:
+                return f"Query rejected: {str(e)}"
+            except Exception as e:
+                return f"SQL Error: {str(e)}"
+
+    async def run(self, query: str) -> str:
+        start = time.perf_counter()
+        try:
+            query = guard_sql(query, SQL_ROW_LIMIT)
+        except QueryRejected as e:
+            return f"Query rejected: {str(e)}"
+
+        key = normalize_sql(query)
+        task = self._results.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._execute(query))
+            self._results[key] = task
+            self.executed += 1
+        else:
+            self.reused += 1
+        try:
+            # Shielded: a question timing out must not cancel a shared query
+            result = await asyncio.shield(task)
+        finally:
+            _record("sql", time.perf_counter() - start)
+        if result.startswith(_FAILED_RESULTS) and self._results.get(key) is task:
+            # Errors may be transient (timeouts, lost connections): only
+            # questions already waiting share them
+            del self._results[key]
+        return result
+
+    def tool(self) -> Tool:
+        return Tool(
+            name="sql_query",
+            func=None,
+            coroutine=self.run,
+            description=SQL_TOOL_DESCRIPTION,
+        )
+
+
+def load_questions(path: Path) -> List[dict]:
+    """[{"id", "question"}, ...] from a .txt or .jsonl questions file."""
+    questions = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or (path.suffix != ".jsonl" and line.startswith("#")):
+            continue
+        item = json.loads(line) if path.suffix == ".jsonl" else {"question": line}
+        item.setdefault("id", f"q{len(questions) + 1}")
+        questions.append(item)
+    return questions
+
+
+async def _recall(item: dict, shared_sql: "SharedSQL") -> Optional[dict]:
+    """Answer from the question memo, or None to ask the agent."""
+    hit = await asyncio.to_thread(recall_question, item["question"])
+    if hit is None:
+        return None
+    result = await shared_sql.run(hit.sql)
+    if result.startswith(_FAILED_RESULTS):
+        logger.info(f"Remembered SQL for {hit.question!r} failed, asking the agent: {result}")
+        question_memo.forget(hit.question)
+        return None
+    return {"ok": True, "answer": result, "sql": [hit.sql], "error": None,
+            "memo": {"question": hit.question, "similarity": round(hit.similarity, 3)}}
+
+
+async def _answer(agent, shared_sql: "SharedSQL", index: int, item: dict,
+                  timeout: Optional[float], use_memo: bool) -> dict:
+    stats = {"llm_calls": 0, "llm_seconds": 0.0, "sql_calls": 0, "sql_seconds": 0.0}
+    _question_stats.set(stats)
+    record = {"index": index, "id": item["id"], "question": item["question"]}
+    start = time.perf_counter()
+    try:
+        recalled = await asyncio.wait_for(_recall(item, shared_sql), timeout) if use_memo else None
+        if recalled is not None:
+            record.update(recalled)
+        else:
+            response = await asyncio.wait_for(agent.ainvoke({"input": item["question"]}), timeout)
+            await asyncio.to_thread(remember_answer, item["question"], response)
+            record.update(
+                ok=True,
+                answer=response.get("output"),
+                sql=[action.tool_input for action, _ in response.get("intermediate_steps", [])
+                     if hasattr(action, "tool_input")],
+                error=None,
+                memo=None,
+            )
+    except Exception as e:
+        record.update(ok=False, answer=None, sql=[], error=f"{type(e).__name__}: {e}", memo=None)
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    record.update({k: round(v, 3) if isinstance(v, float) else v for k, v in stats.items()})
+    return record
+
+
+async def run_batch(questions: List[dict], output: Path, llm=None, concurrency: int = 8,
+                    llm_concurrency: int = 4, dremio_concurrency: int = 4,
+                    timeout: Optional[float] = None, use_memo: bool = True) -> dict:
+    """
+    Answer every question, appending one JSON line per answer to output.
+
+    Returns a summary of the batch.
+    """
+    if dremio_concurrency > DREMIO_POOL_SIZE:
+        logger.info(f"Dremio concurrency capped at DREMIO_POOL_SIZE={DREMIO_POOL_SIZE}")
+        dremio_concurrency = DREMIO_POOL_SIZE
+
+    start = time.perf_counter()
+    table_info = await asyncio.to_thread(discover_schema)
+    shared_sql = SharedSQL(dremio_concurrency)
+    llm = BoundedLLM(llm or create_llm(), asyncio.Semaphore(llm_concurrency))
+    agent = create_agent(table_info, llm=llm, sql_tool=shared_sql.tool(), verbose=False)
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def answer(index, item):
+        async with slots:
+            return await _answer(agent, shared_sql, index, item, timeout, use_memo)
+
+    ok = failed = llm_calls = memo_hits = 0
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "a", encoding="utf-8") as out:
+        for next_answer in asyncio.as_completed(
+            [answer(i, item) for i, item in enumerate(questions)]
+        ):
+            record = await next_answer
+            out.write(json.dumps(record, default=str) + "\n")
+            out.flush()
+            ok += record["ok"]
+            failed += not record["ok"]
+            llm_calls += record["llm_calls"]
+            memo_hits += record["memo"] is not None
+            logger.info(f"[{ok + failed}/{len(questions)}] {record['id']}: "
+                        f"{'ok' if record['ok'] else record['error']} in {record['seconds']:.1f}s")
+
+    return {
+        "questions": len(questions),
+        "ok": ok,
+        "failed": failed,
+        "seconds": round(time.perf_counter() - start, 3),
+        "llm_calls": llm_calls,
+        "memo_hits": memo_hits,
+        "sql_executed": shared_sql.executed,
+        "sql_reused": shared_sql.reused,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a file of questions with the SQL agent.")
+    parser.add_argument("questions", type=Path, help="Questions file (.txt or .jsonl)")
+    parser.add_argument("--output", type=Path, default=Path("batch_results.jsonl"),
+                        help="JSON lines file answers are appended to (default: batch_results.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Questions answered at the same time")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="LLM calls in flight at once (each call is still one request)")
+    parser.add_argument("--dremio-concurrency", type=int, default=4, help="Concurrent Dremio queries")
+    parser.add_argument("--timeout", type=float, help="Seconds allowed per question")
+    parser.add_argument("--no-memo", action="store_true",
+                        help="Ask the agent even for questions answered before")
+    args = parser.parse_args()
+
+    if not MISTRAL_API_KEY:
+        sys.exit("MISTRAL_API_KEY not found. Add it to agent/.env")
+
+    questions = load_questions(args.questions)
+    summary = asyncio.run(run_batch(
+        questions, args.output,
+        concurrency=args.concurrency,
+        llm_concurrency=args.llm_concurrency,
+        dremio_concurrency=args.dremio_concurrency,
+        timeout=args.timeout,
+        use_memo=not args.no_memo,
+    ))
+    print(json.dumps(summary, indent=2))
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: Arrow compute formatter vs. the original per-cell Python loop.
+
+Builds a table shaped like gold.customer_segmentation (long preferred_models
+strings, nulls, decimals) and times rendering of the first N rows.
+
+Usage: python bench_formatting.py [rows] [display_rows]
+"""
+
+import random
+import sys
+import time
+from decimal import Decimal
+
+import pyarrow as pa
+
+from formatting import format_table
+
+MODELS = ["EcoRide Model S", "EcoRide Urban", "EcoRide Cruiser", "EcoRide Voyager",
+          "EcoRide Compact", "EcoRide Sport", "EcoRide Family", "EcoRide Cargo"]
+
+
+def build_table(rows: int) -> pa.Table:
+    rng = random.Random(42)
+    return pa.table({
+        "customer_id": pa.array(range(rows), pa.int64()),
+        "first_name": [f"Customer{i}" for i in range(rows)],
+        "email": [f"customer{i}@example.com" for i in range(rows)],
+        "city": [rng.choice(["Luxembourg", "Esch-sur-Alzette", "Differdange", None])
+                 for _ in range(rows)],
+        "state": ["LU"] * rows,
+        "country": ["Luxembourg"] * rows,
+        "total_purchases": pa.array([rng.randint(0, 12) for _ in range(rows)], pa.int64()),
+        "average_purchase_value": pa.array(
+            [Decimal(f"{rng.uniform(20000, 90000):.2f}") for _ in range(rows)],
+            pa.decimal128(12, 2),
+        ),
+        "preferred_models": [", ".join(rng.sample(MODELS, rng.randint(1, len(MODELS)))) * 4
+                             for _ in range(rows)],
+    })
+
+
+def legacy_format(table: pa.Table, display_rows: int) -> str:
+    """The run_sql_query loop this module replaced."""
+    data = table.to_pydict()
+    columns = table.column_names
+    output = " | ".join(columns) + "\n"
+    output += "-" * len(output) + "\n"
+    for i in range(min(display_rows, table.num_rows)):
+        output += " | ".join(str(data[col][i]) for col in columns) + "\n"
+    return output
+
+
+def timed(fn, *args, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    display_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    table = build_table(rows)
+    print(f"Table: {rows} rows, {table.num_columns} columns, {table.nbytes / 1e6:.1f} MB")
+
+    legacy = timed(legacy_format, table, display_rows)
+    arrow = timed(format_table, table, display_rows)
+    print(f"legacy loop  : {legacy * 1000:9.2f} ms")
+    print(f"arrow compute: {arrow * 1000:9.2f} ms  ({legacy / arrow:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
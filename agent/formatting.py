@@ -0,0 +1,61 @@
+"""
+Arrow-native rendering of query results for the agent.
+
+Slices the table to the rows that will be shown, then turns every column
+into strings with Arrow compute kernels instead of a Python loop per cell.
+"""
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+NULL_TEXT = "None"
+ELLIPSIS = "..."
+
+
+def _to_strings(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Cast one column to strings with type-aware formatting."""
+    t = column.type
+    if pa.types.is_timestamp(t):
+        # %S already carries the fractional part for sub-second units
+        fmt = "%Y-%m-%d %H:%M:%S"
+        if t.tz is not None:
+            fmt += "%z"
+        return pc.strftime(column, format=fmt)
+    if pa.types.is_string(t) or pa.types.is_large_string(t):
+        return column
+    try:
+        # Decimals, dates, numbers and booleans all have a string cast kernel
+        return pc.cast(column, pa.string())
+    except (pa.ArrowNotImplementedError, pa.ArrowInvalid):
+        # Nested types (lists, structs, maps) fall back to Python repr
+        return pa.chunked_array(
+            [pa.array([None if v is None else str(v) for v in column.to_pylist()], pa.string())],
+            pa.string(),
+        )
+
+
+def _truncate(column: pa.ChunkedArray, max_width: int) -> pa.ChunkedArray:
+    too_long = pc.greater(pc.utf8_length(column), max_width)
+    shortened = pc.binary_join_element_wise(
+        pc.utf8_slice_codeunits(column, 0, max(max_width - len(ELLIPSIS), 0)), ELLIPSIS, ""
+    )
+    return pc.if_else(too_long, shortened, column)
+
+
+def format_table(table: pa.Table, max_rows: int, max_width: int = 80) -> str:
+    """Render the first max_rows rows as a pipe-separated text table."""
+    table = table.slice(0, max_rows)
+    header = " | ".join(table.column_names)
+    lines = [header, "-" * (len(header) + 1)]
+
+    if table.num_rows:
+        cells = []
+        for column in table.columns:
+            strings = pc.fill_null(_to_strings(column), NULL_TEXT)
+            if max_width:
+                strings = _truncate(strings, max_width)
+            cells.append(strings)
+        rows = pc.binary_join_element_wise(*cells, " | ")
+        lines.extend(rows.to_pylist())
+
+    return "\n".join(lines) + "\n"
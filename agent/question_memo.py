@@ -0,0 +1,271 @@
+"""
+Question memo for the SQL agent.
+
+Remembers the SQL that answered a question, together with the fingerprint of
+the Gold schema it was written against, and finds near-duplicate questions
+(paraphrases such as "top 5 customers by total spent" / "show me the top 5
+customers by total spending") by token similarity. A confident match skips
+the ReAct loop and runs the remembered SQL directly.
+
+Matching is deliberately conservative: numbers, quoted values and direction
+words (top/bottom, most/least, ...) must be identical, and every remaining
+word must have a counterpart with the same stem (or nearly the same spelling)
+in the other question, so "top 10" never reuses the SQL of "top 5", "in Paris"
+never that of "in Berlin" and "per session" never that of "per station".
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from result_cache import normalize_sql
+
+logger = logging.getLogger(__name__)
+
+_CONTRACTION = re.compile(r"(?<=[a-z])'(?=[a-z])")
+_WORD = re.compile(r"'[^']*'|\"[^\"]*\"|\d+(?:\.\d+)?|[a-z]+")
+
+STOPWORDS = frozenset("""
+a all an and any are as at be been by can could did do does each find for from
+get give had has have how i in is it its list me my of on or our per please see
+show tell that the their there these this to us was we were what whats which
+who with would you your
+""".split())
+
+# Words that change the meaning of an otherwise identical question
+POLAR_WORDS = frozenset("""
+top bottom highest lowest most least fewest max maximum min minimum best worst
+largest smallest biggest first last latest earliest oldest newest asc ascending
+desc descending increase decrease above below over under more less not no
+without except excluding exclude only before after
+""".split())
+
+# Irregular forms of words common in business questions
+IRREGULAR_STEMS = {
+    "spent": "spend", "sold": "sell", "bought": "buy", "paid": "pay", "made": "make",
+    "won": "win", "lost": "lose", "drove": "drive", "driven": "drive", "ran": "run",
+}
+
+# Markers of tool observations that did not answer the question
+_FAILED_OBSERVATIONS = ("SQL Error", "Query rejected", "Query executed successfully. No results")
+
+
+def _stem(word: str) -> str:
+    word = IRREGULAR_STEMS.get(word, word)
+    if len(word) > 5 and word.endswith("ing"):
+        word = word[:-3]
+    elif len(word) > 4 and word.endswith("ed"):
+        word = word[:-2]
+    elif len(word) > 4 and word.endswith("ies"):
+        word = word[:-3] + "y"
+    elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    # charge / charging / charged, rate / rated
+    if len(word) > 3 and word.endswith("e"):
+        word = word[:-1]
+    return word
+
+
+def _bigrams(word: str) -> Set[str]:
+    padded = f" {word} "
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+def _dice(a: str, b: str) -> float:
+    if a == b:
+        return 1.0
+    x, y = _bigrams(a), _bigrams(b)
+    return 2 * len(x & y) / (len(x) + len(y))
+
+
+def analyze(question: str) -> Tuple[Tuple[str, ...], FrozenSet[str]]:
+    """(content words, exact-match constraints) of a question."""
+    words, constraints = [], set()
+    for token in _WORD.findall(_CONTRACTION.sub("", question.lower())):
+        if token[0] in "'\"" or token[0].isdigit():
+            constraints.add(token.strip("'\""))
+        elif token in POLAR_WORDS:
+            constraints.add(token)
+        elif token not in STOPWORDS:
+            words.append(_stem(token))
+    return tuple(words), frozenset(constraints)
+
+
+def similarity(a: Tuple[str, ...], b: Tuple[str, ...], min_word: float = 0.8) -> float:
+    """
+    Mean best-match similarity of the words of a and b, in both directions.
+
+    0 if any word has no counterpart at least min_word similar. The floor is
+    high because near-miss nouns share many bigrams ("session" / "station"
+    is 0.5, "count" / "country" 0.71); inflections are left to _stem.
+    """
+    if not a or not b:
+        return 1.0 if a == b else 0.0
+    scores = []
+    for left, right in ((a, b), (b, a)):
+        for word in left:
+            best = max(_dice(word, other) for other in right)
+            if best < min_word:
+                return 0.0
+            scores.append(best)
+    return sum(scores) / len(scores)
+
+
+def answer_sql(response: dict) -> Optional[str]:
+    """
+    The SQL worth remembering from an agent response, or None.
+
+    Only answers backed by exactly one distinct successful sql_query call
+    (with rows) are remembered; multi-query answers cannot be replayed as one
+    query.
+    """
+    output = response.get("output") or ""
+    if not output or "Agent stopped" in output:
+        return None
+    queries = {}
+    for action, observation in response.get("intermediate_steps", []):
+        if getattr(action, "tool", None) != "sql_query":
+            continue
+        if str(observation).startswith(_FAILED_OBSERVATIONS):
+            continue
+        queries[normalize_sql(action.tool_input)] = action.tool_input.strip()
+    return next(iter(queries.values())) if len(queries) == 1 else None
+
+
+@dataclass
+class MemoHit:
+    """A remembered question close enough to reuse its SQL."""
+
+    question: str
+    sql: str
+    similarity: float
+
+
+class QuestionMemo:
+    """Bounded LRU of (question, SQL, schema version), optionally persisted as JSON lines."""
+
+    def __init__(self, max_entries: int = 1000, min_similarity: float = 0.85,
+                 path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.min_similarity = min_similarity
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._index: Dict[str, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        if self.path and self.path.exists():
+            self._load()
+
+    @staticmethod
+    def _key(words: Tuple[str, ...], constraints: FrozenSet[str]) -> str:
+        return " ".join(words) + " | " + " ".join(sorted(constraints))
+
+    def _add(self, entry: dict):
+        words, constraints = analyze(entry["question"])
+        key = self._key(words, constraints)
+        self._remove(key)
+        entry.update(words=words, constraints=constraints)
+        self._entries[key] = entry
+        for word in set(words):
+            self._index.setdefault(word, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for word in set(entry["words"]):
+            keys = self._index.get(word)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[word]
+
+    @staticmethod
+    def _stored(entry: dict) -> dict:
+        return {k: entry[k] for k in ("question", "sql", "schema_version", "at")}
+
+    def _load(self):
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            try:
+                self._add(json.loads(line))
+            except (ValueError, KeyError):
+                continue
+        self._save()
+        logger.info(f"Loaded {len(self._entries)} remembered questions from {self.path}")
+
+    def _save(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            for entry in self._entries.values():
+                f.write(json.dumps(self._stored(entry)) + "\n")
+
+    def record(self, question: str, sql: str, schema_version: str):
+        """Remember the SQL that answered question."""
+        entry = {"question": question.strip(), "sql": sql, "schema_version": schema_version,
+                 "at": time.time()}
+        with self._lock:
+            size = len(self._entries)
+            self._add(entry)
+            if not self.path:
+                return
+            if len(self._entries) <= size:
+                # An entry was replaced or evicted: rewrite the file so it
+                # stays bounded by max_entries
+                self._save()
+            else:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(self._stored(entry)) + "\n")
+
+    def lookup(self, question: str, schema_version: str) -> Optional[MemoHit]:
+        """The most similar remembered question for this schema, if similar enough."""
+        words, constraints = analyze(question)
+        with self._lock:
+            candidates = set().union(*(self._index.get(word, ()) for word in set(words)))
+            if not words:
+                candidates.add(self._key(words, constraints))
+            best, best_score = None, 0.0
+            for key in candidates:
+                entry = self._entries.get(key)
+                if (entry is None or entry["schema_version"] != schema_version
+                        or entry["constraints"] != constraints):
+                    continue
+                score = similarity(words, entry["words"])
+                if score > best_score:
+                    best, best_score = key, score
+            if best is None or best_score < self.min_similarity:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best)
+            self.hits += 1
+            entry = self._entries[best]
+            return MemoHit(question=entry["question"], sql=entry["sql"], similarity=best_score)
+
+    def forget(self, question: str):
+        """Drop a remembered question, e.g. when its SQL stopped working."""
+        with self._lock:
+            self._remove(self._key(*analyze(question)))
+            if self.path:
+                self._save()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+    def questions(self) -> List[str]:
+        with self._lock:
+            return [entry["question"] for entry in self._entries.values()]
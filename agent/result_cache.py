@@ -0,0 +1,152 @@
+"""
+Query result cache for the SQL agent.
+
+Results are keyed on the normalised SQL text and the current Nessie commit of
+the branch the Gold tables live on, so a gold rebuild (new commit) naturally
+invalidates every cached answer. Arrow tables are kept in LRU order under a
+memory cap.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Quoted literals/identifiers are kept verbatim; everything else is folded
+_SQL_TOKEN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\s+|[^'\"\s]+")
+
+
+def normalize_sql(query: str) -> str:
+    """Collapse whitespace, drop trailing semicolons and lowercase unquoted text."""
+    parts = []
+    for token in _SQL_TOKEN.findall(query.strip().rstrip(";").strip()):
+        if token[0] in "'\"":
+            parts.append(token)
+        elif token.isspace():
+            parts.append(" ")
+        else:
+            parts.append(token.lower())
+    return "".join(parts)
+
+
+class NessieHead:
+    """Current commit hash of a Nessie branch, refreshed at most every few seconds."""
+
+    def __init__(self, nessie_url: str, branch: str = "main", refresh_seconds: float = 5):
+        self.url = f"{nessie_url.rstrip('/')}/api/v2/trees/{branch}"
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._hash: Optional[str] = None
+        self._checked_at = 0.0
+
+    def _fetch(self) -> Optional[str]:
+        try:
+            with urllib.request.urlopen(self.url, timeout=2) as response:
+                return json.load(response)["reference"]["hash"]
+        except Exception as e:
+            logger.warning(f"Could not read Nessie head from {self.url}: {e}")
+            return None
+
+    def current(self) -> Optional[str]:
+        with self._lock:
+            if time.monotonic() - self._checked_at > self.refresh_seconds:
+                self._hash = self._fetch()
+                self._checked_at = time.monotonic()
+            return self._hash
+
+
+class ResultCache:
+    """LRU cache of query results bounded by total Arrow bytes."""
+
+    def __init__(self, max_bytes: int, version: Callable[[], Optional[str]]):
+        self.max_bytes = max_bytes
+        self._version = version
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _put(self, key: Hashable, result, nbytes: int):
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (result, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self.evictions += 1
+
+    def _lookup(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    @staticmethod
+    def _key(commit: str, query: str, args: tuple, kwargs: dict) -> Hashable:
+        return (commit, normalize_sql(query), args, tuple(sorted(kwargs.items())))
+
+    def get_or_execute(self, query: str, execute: Callable, *args, **kwargs):
+        """
+        Return a cached result for query, or run execute(query, ...) and cache it.
+
+        Caching is bypassed when the Nessie commit cannot be determined,
+        since there is then no safe way to tell whether the data changed.
+        """
+        commit = self._version()
+        if commit is None:
+            return execute(query, *args, **kwargs)
+
+        key = self._key(commit, query, args, kwargs)
+        result = self._lookup(key)
+        if result is None:
+            result = execute(query, *args, **kwargs)
+            self._put(key, result, result.table.nbytes)
+        return result
+
+    async def get_or_execute_async(self, query: str, execute: Callable, *args, **kwargs):
+        """Async version of get_or_execute for an awaitable execute."""
+        commit = await asyncio.to_thread(self._version)
+        if commit is None:
+            return await execute(query, *args, **kwargs)
+
+        key = self._key(commit, query, args, kwargs)
+        result = self._lookup(key)
+        if result is None:
+            result = await execute(query, *args, **kwargs)
+            self._put(key, result, result.table.nbytes)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,89 @@
+"""
+Process-wide schema catalog for the SQL agent.
+
+Loads every table and column of a Dremio schema from INFORMATION_SCHEMA in a
+single query and caches it with a TTL, so opening a chat costs at most one
+Dremio round trip instead of one per table.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaCatalog:
+    """Cached view of the tables and column types under one schema path."""
+
+    def __init__(self, execute_arrow: Callable[[str], pa.Table], schema_path: str,
+                 ttl_seconds: float = 300):
+        self._execute_arrow = execute_arrow
+        self.schema_path = schema_path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._tables: Optional[Dict[str, List[Tuple[str, str]]]] = None
+        self._loaded_at = 0.0
+        self.version = 0
+
+    def _columns_query(self) -> str:
+        schema = self.schema_path.replace("'", "''")
+        return (
+            'SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE '
+            'FROM INFORMATION_SCHEMA."COLUMNS" '
+            f"WHERE TABLE_SCHEMA = '{schema}' "
+            "ORDER BY TABLE_NAME, ORDINAL_POSITION"
+        )
+
+    def _load(self) -> Dict[str, List[Tuple[str, str]]]:
+        logger.info(f"Loading schema catalog for {self.schema_path}...")
+        data = self._execute_arrow(self._columns_query()).to_pydict()
+        tables: Dict[str, List[Tuple[str, str]]] = {}
+        for table, column, data_type in zip(
+            data["TABLE_NAME"], data["COLUMN_NAME"], data["DATA_TYPE"]
+        ):
+            tables.setdefault(table, []).append((column, data_type))
+        logger.info(f"Found {len(tables)} tables: {list(tables)}")
+        return tables
+
+    def tables(self) -> Dict[str, List[Tuple[str, str]]]:
+        """Return {table_name: [(column, type), ...]}, reloading when stale."""
+        with self._lock:
+            expired = time.monotonic() - self._loaded_at > self.ttl_seconds
+            if self._tables is None or expired:
+                self._tables = self._load()
+                self._loaded_at = time.monotonic()
+                self.version += 1
+            return self._tables
+
+    def invalidate(self):
+        """Drop the cached catalog; the next access reloads it."""
+        with self._lock:
+            self._tables = None
+        logger.info(f"Schema catalog for {self.schema_path} invalidated")
+
+    def fingerprint(self) -> str:
+        """Hash of the tables and column types; changes only when the schema does."""
+        tables = sorted(self.tables().items())
+        return hashlib.sha256(repr(tables).encode()).hexdigest()[:16]
+
+    @property
+    def table_count(self) -> int:
+        return len(self.tables())
+
+    def describe(self) -> str:
+        """Render the catalog as the table_info block of the agent prompt."""
+        tables = self.tables()
+        if not tables:
+            return "No tables found in the Data Lakehouse."
+
+        schema_info = f"Available tables in {self.schema_path} (use full path in queries):\n\n"
+        for i, (table_name, columns) in enumerate(sorted(tables.items()), 1):
+            column_list = ", ".join(f"{name} ({data_type})" for name, data_type in columns)
+            schema_info += f"{i}. {self.schema_path}.{table_name}\n"
+            schema_info += f"   Columns: {column_list}\n\n"
+        return schema_info
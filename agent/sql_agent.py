@@ -0,0 +1,574 @@
+"""
+SQL agent core for the Data Lakehouse: Dremio Flight client pool, cached
+schema discovery, the guarded/cached sql_query tool and the ReAct agent.
+
+Shared by the Chainlit UI (app.py) and the batch runner (batch.py); nothing
+here depends on Chainlit.
+"""
+
+import os
+import logging
+import base64
+import time
+import queue
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from dataclasses import dataclass
+from typing import Optional
+
+import pyarrow as pa
+from langchain_mistralai import ChatMistralAI
+from langchain.agents import AgentExecutor, create_react_agent
+from langchain.tools import Tool
+from langchain.prompts import PromptTemplate
+from pyarrow import flight
+from dotenv import load_dotenv
+
+from result_cache import NessieHead, ResultCache
+from formatting import format_table
+from question_memo import MemoHit, QuestionMemo, answer_sql
+from schema_catalog import SchemaCatalog
+from sql_guard import QueryRejected, check_plan_cost, explain_query, guard_sql
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+DREMIO_HOST = os.getenv("DREMIO_HOST", "dremio")
+DREMIO_PORT = os.getenv("DREMIO_PORT", "32010")
+DREMIO_USER = os.getenv("DREMIO_USER", "dremio")
+DREMIO_PASSWORD = os.getenv("DREMIO_PASSWORD", "dremio123")
+MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
+MISTRAL_MODEL = os.getenv("MISTRAL_MODEL", "mistral-large-latest")
+SCHEMA_PATH = os.getenv("SCHEMA_PATH", "catalog.gold")
+SCHEMA_CACHE_TTL = float(os.getenv("SCHEMA_CACHE_TTL", "300"))
+
+# SQL guard: LIMIT injected into row-level agent queries, and optional
+# EXPLAIN cost ceiling in estimated rows (0 disables the EXPLAIN check)
+SQL_ROW_LIMIT = int(os.getenv("SQL_ROW_LIMIT", "1000"))
+SQL_MAX_PLAN_COST = float(os.getenv("SQL_MAX_PLAN_COST", "0"))
+
+# Query result cache, invalidated whenever the Nessie branch head moves
+NESSIE_URL = os.getenv("NESSIE_URL", "http://nessie:19120")
+NESSIE_BRANCH = os.getenv("NESSIE_BRANCH", "main")
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Question memo: SQL of answered questions reused for paraphrases, skipping
+# the LLM when the similarity is at least QUESTION_MEMO_MIN_SIMILARITY
+# (1 = same wording only, above 1 = off; without QUESTION_MEMO_PATH the memo
+# lives in memory only)
+QUESTION_MEMO_MIN_SIMILARITY = float(os.getenv("QUESTION_MEMO_MIN_SIMILARITY", "0.85"))
+QUESTION_MEMO_MAX_ENTRIES = int(os.getenv("QUESTION_MEMO_MAX_ENTRIES", "1000"))
+QUESTION_MEMO_PATH = os.getenv("QUESTION_MEMO_PATH")
+
+# Result budgets for agent queries: rows shown to the LLM, and the hard cap
+# on Arrow bytes pulled from Dremio before the stream is cancelled
+MAX_DISPLAY_ROWS = int(os.getenv("MAX_DISPLAY_ROWS", "20"))
+STREAM_MAX_BYTES = int(os.getenv("STREAM_MAX_BYTES", str(8 * 1024 * 1024)))
+MAX_CELL_WIDTH = int(os.getenv("MAX_CELL_WIDTH", "80"))
+
+# Max threads used to read a multi-endpoint Flight result
+FLIGHT_FETCH_WORKERS = int(os.getenv("FLIGHT_FETCH_WORKERS", "8"))
+
+# Flight client pool shared by chat sessions
+DREMIO_POOL_SIZE = int(os.getenv("DREMIO_POOL_SIZE", "8"))
+DREMIO_POOL_TIMEOUT = float(os.getenv("DREMIO_POOL_TIMEOUT", "30"))
+DREMIO_HEALTH_CHECK_INTERVAL = float(os.getenv("DREMIO_HEALTH_CHECK_INTERVAL", "60"))
+
+logger.info(f"Dremio host: {DREMIO_HOST}:{DREMIO_PORT}")
+logger.info(f"Mistral API key configured: {bool(MISTRAL_API_KEY)}")
+
+
+@dataclass
+class QueryResult:
+    """Arrow result of a (possibly truncated) streaming query."""
+
+    table: pa.Table
+    total_rows: Optional[int]  # None when the true count is unknown
+    truncated: bool
+
+
+@dataclass
+class EndpointTiming:
+    """Fetch statistics for one Flight endpoint."""
+
+    endpoint: int
+    rows: int
+    bytes: int
+    seconds: float
+
+
+class DremioClient:
+    """PyArrow Flight client for Dremio using Basic auth."""
+
+    def __init__(self):
+        self.location = f"grpc://{DREMIO_HOST}:{DREMIO_PORT}"
+        self.client = flight.connect(self.location)
+        self.options = self._create_auth_options()
+        self._remote_clients = {}
+
+    def _create_auth_options(self):
+        """Create flight options with Basic auth header."""
+        auth_string = f"{DREMIO_USER}:{DREMIO_PASSWORD}"
+        auth_encoded = base64.b64encode(auth_string.encode()).decode()
+        return flight.FlightCallOptions(
+            headers=[(b"authorization", f"Basic {auth_encoded}".encode())]
+        )
+
+    def ping(self) -> bool:
+        """Return True if Dremio answers a trivial query on this channel."""
+        try:
+            self.execute_stream("SELECT 1", max_rows=1)
+            return True
+        except Exception as e:
+            logger.warning(f"Dremio health check failed: {e}")
+            return False
+
+    def close(self):
+        """Close this client's gRPC channels."""
+        for client in [self.client, *self._remote_clients.values()]:
+            try:
+                client.close()
+            except Exception:
+                pass
+        self._remote_clients.clear()
+
+    def _get_info(self, query: str):
+        return self.client.get_flight_info(
+            flight.FlightDescriptor.for_command(query),
+            self.options
+        )
+
+    def _do_get(self, endpoint):
+        """Open a stream for an endpoint, on the server it points to if any."""
+        client = self.client
+        if endpoint.locations:
+            uri = endpoint.locations[0].uri.decode()
+            if uri != self.location and not uri.startswith("arrow-flight-reuse-connection"):
+                if uri not in self._remote_clients:
+                    self._remote_clients[uri] = flight.connect(uri)
+                client = self._remote_clients[uri]
+        return client.do_get(endpoint.ticket, self.options)
+
+    def _fetch_endpoint(self, index: int, endpoint):
+        start = time.perf_counter()
+        table = self._do_get(endpoint).read_all()
+        timing = EndpointTiming(
+            endpoint=index,
+            rows=table.num_rows,
+            bytes=table.nbytes,
+            seconds=time.perf_counter() - start,
+        )
+        return table, timing
+
+    def execute(self, query: str):
+        """Execute SQL query and return results as dict and column names."""
+        table = self.execute_arrow(query)
+        return table.to_pydict(), table.column_names
+
+    def execute_arrow(self, query: str) -> pa.Table:
+        """Execute SQL query and return the full result as an Arrow table."""
+        table, _ = self.execute_parallel(query)
+        return table
+
+    def execute_parallel(self, query: str):
+        """
+        Execute SQL query, reading every Flight endpoint concurrently.
+
+        Dremio may split large results across several endpoints. Each one is
+        read on its own thread and the resulting batches are concatenated
+        without copying. Returns the table and a per-endpoint timing list.
+        """
+        info = self._get_info(query)
+        endpoints = list(info.endpoints)
+
+        if len(endpoints) <= 1:
+            results = [self._fetch_endpoint(i, ep) for i, ep in enumerate(endpoints)]
+        else:
+            workers = min(len(endpoints), FLIGHT_FETCH_WORKERS)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(
+                    lambda args: self._fetch_endpoint(*args), enumerate(endpoints)
+                ))
+
+        tables = [table for table, _ in results]
+        timings = [timing for _, timing in results]
+        for t in timings:
+            logger.debug(
+                f"Endpoint {t.endpoint}: {t.rows} rows, {t.bytes} bytes in {t.seconds:.3f}s"
+            )
+
+        if not tables:
+            return info.schema.empty_table(), timings
+        return pa.concat_tables(tables), timings
+
+    def execute_stream(self, query: str, max_rows: Optional[int] = None,
+                       max_bytes: Optional[int] = None) -> QueryResult:
+        """
+        Execute SQL query, reading record batches until a budget is reached.
+
+        Stops as soon as max_rows or max_bytes is exceeded and cancels the
+        rest of the stream, so a huge result never lands in memory.
+        """
+        info = self._get_info(query)
+
+        batches = []
+        rows = 0
+        nbytes = 0
+        truncated = False
+        schema = info.schema
+        for endpoint in info.endpoints:
+            reader = self._do_get(endpoint)
+            schema = reader.schema
+            for chunk in reader:
+                batch = chunk.data
+                if batch is None:
+                    continue
+                if max_rows is not None and rows + batch.num_rows > max_rows:
+                    batch = batch.slice(0, max_rows - rows)
+                    truncated = True
+                batches.append(batch)
+                rows += batch.num_rows
+                nbytes += batch.nbytes
+                if truncated or (max_bytes is not None and nbytes >= max_bytes):
+                    truncated = True
+                    break
+
+            if truncated:
+                reader.cancel()
+                break
+
+        # Dremio may advertise the total in the FlightInfo; otherwise we only
+        # know it when the stream was read to the end
+        if info.total_records >= 0:
+            total_rows = info.total_records
+        elif not truncated:
+            total_rows = rows
+        else:
+            total_rows = None
+
+        table = pa.Table.from_batches(batches, schema=schema)
+        return QueryResult(table=table, total_rows=total_rows, truncated=truncated)
+
+
+class DremioClientPool:
+    """
+    Bounded pool of Dremio Flight clients shared by all chat sessions.
+
+    Each query checks out its own client, so concurrent sessions no longer
+    serialise on a single gRPC channel. Idle clients are health-checked
+    before reuse and replaced when a call fails at the transport level.
+    """
+
+    def __init__(self, size: int = DREMIO_POOL_SIZE):
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._last_used = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=size, thread_name_prefix="dremio-flight"
+        )
+
+    def _acquire(self) -> DremioClient:
+        if not self._slots.acquire(timeout=DREMIO_POOL_TIMEOUT):
+            raise TimeoutError(
+                f"No Dremio connection available after {DREMIO_POOL_TIMEOUT}s "
+                f"(pool size {self.size})"
+            )
+        try:
+            try:
+                client = self._idle.get_nowait()
+            except queue.Empty:
+                logger.info("Creating Dremio Flight client...")
+                return DremioClient()
+
+            idle_for = time.monotonic() - self._last_used.get(id(client), 0)
+            if idle_for > DREMIO_HEALTH_CHECK_INTERVAL and not client.ping():
+                logger.warning("Discarding unhealthy Dremio client, reconnecting...")
+                client.close()
+                self._last_used.pop(id(client), None)
+                client = DremioClient()
+            return client
+        except BaseException:
+            # Connecting failed (Dremio down, bad credentials): give the slot back
+            self._slots.release()
+            raise
+
+    def _release(self, client: DremioClient, broken: bool = False):
+        if broken:
+            client.close()
+            self._last_used.pop(id(client), None)
+        else:
+            self._last_used[id(client)] = time.monotonic()
+            self._idle.put(client)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Check out a client for the duration of the block."""
+        client = self._acquire()
+        broken = False
+        try:
+            yield client
+        except (flight.FlightUnavailableError, flight.FlightInternalError):
+            broken = True
+            raise
+        finally:
+            self._release(client, broken=broken)
+
+    def run(self, method: str, *args, **kwargs):
+        """Call a DremioClient method on a pooled client, retrying once on a dead channel."""
+        try:
+            with self.connection() as client:
+                return getattr(client, method)(*args, **kwargs)
+        except flight.FlightUnavailableError:
+            logger.warning("Dremio connection lost, retrying on a fresh client...")
+            with self.connection() as client:
+                return getattr(client, method)(*args, **kwargs)
+
+    async def run_async(self, method: str, *args, **kwargs):
+        """Awaitable version of run() on the pool's own thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(self.run, method, *args, **kwargs)
+        )
+
+    def execute(self, query: str):
+        return self.run("execute", query)
+
+    def execute_arrow(self, query: str) -> pa.Table:
+        return self.run("execute_arrow", query)
+
+    def execute_stream(self, query: str, max_rows: Optional[int] = None,
+                       max_bytes: Optional[int] = None) -> QueryResult:
+        return self.run("execute_stream", query, max_rows=max_rows, max_bytes=max_bytes)
+
+    async def execute_async(self, query: str):
+        return await self.run_async("execute", query)
+
+    async def execute_stream_async(self, query: str, max_rows: Optional[int] = None,
+                                   max_bytes: Optional[int] = None) -> QueryResult:
+        return await self.run_async(
+            "execute_stream", query, max_rows=max_rows, max_bytes=max_bytes
+        )
+
+
+# Global pool
+dremio_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> DremioClientPool:
+    """Get or create the process-wide Dremio client pool."""
+    global dremio_pool
+    with _pool_lock:
+        if dremio_pool is None:
+            logger.info(f"Creating Dremio client pool (size {DREMIO_POOL_SIZE})...")
+            dremio_pool = DremioClientPool()
+    return dremio_pool
+
+
+# Global schema catalog
+schema_catalog = None
+
+
+def get_schema_catalog() -> SchemaCatalog:
+    """Get or create the process-wide schema catalog."""
+    global schema_catalog
+    with _pool_lock:
+        if schema_catalog is None:
+            schema_catalog = SchemaCatalog(
+                lambda query: get_pool().execute_arrow(query),
+                SCHEMA_PATH,
+                ttl_seconds=SCHEMA_CACHE_TTL,
+            )
+    return schema_catalog
+
+
+# Query result cache shared by all sessions
+result_cache = ResultCache(
+    RESULT_CACHE_MAX_BYTES, NessieHead(NESSIE_URL, NESSIE_BRANCH).current
+)
+
+
+# Remembered question -> SQL pairs shared by all sessions
+question_memo = QuestionMemo(
+    QUESTION_MEMO_MAX_ENTRIES, QUESTION_MEMO_MIN_SIMILARITY, QUESTION_MEMO_PATH
+)
+
+
+def discover_schema() -> str:
+    """Describe tables and columns of SCHEMA_PATH from the cached catalog."""
+    return get_schema_catalog().describe()
+
+
+def format_result(result: QueryResult) -> str:
+    """Render a query result as a pipe-separated text table for the LLM."""
+    columns = result.table.column_names
+    if not columns:
+        return "Query executed successfully. No results returned."
+
+    # Get row count
+    row_count = min(result.table.num_rows, MAX_DISPLAY_ROWS)
+    if row_count == 0:
+        return "Query executed successfully. No results returned."
+
+    # Format as table
+    output = format_table(result.table, row_count, max_width=MAX_CELL_WIDTH)
+
+    if result.truncated:
+        if result.total_rows is not None:
+            output += f"\n... ({result.total_rows} total rows, showing first {row_count})"
+        else:
+            output += f"\n... (more than {row_count} rows, showing first {row_count})"
+
+    return output
+
+
+def _execute_checked(query: str, **kwargs) -> QueryResult:
+    """Refuse over-budget plans (when SQL_MAX_PLAN_COST is set), then run the query."""
+    pool = get_pool()
+    if SQL_MAX_PLAN_COST > 0:
+        check_plan_cost(query, pool.execute_arrow(explain_query(query)), SQL_MAX_PLAN_COST)
+    return pool.execute_stream(query, **kwargs)
+
+
+async def _execute_checked_async(query: str, **kwargs) -> QueryResult:
+    pool = get_pool()
+    if SQL_MAX_PLAN_COST > 0:
+        plan = await pool.run_async("execute_arrow", explain_query(query))
+        check_plan_cost(query, plan, SQL_MAX_PLAN_COST)
+    return await pool.execute_stream_async(query, **kwargs)
+
+
+def run_sql_query(query: str) -> str:
+    """Execute SQL query against Dremio and return results."""
+    try:
+        query = guard_sql(query, SQL_ROW_LIMIT)
+        result = result_cache.get_or_execute(
+            query, _execute_checked,
+            max_rows=MAX_DISPLAY_ROWS, max_bytes=STREAM_MAX_BYTES
+        )
+        return format_result(result)
+    except QueryRejected as e:
+        return f"Query rejected: {str(e)}"
+    except Exception as e:
+        return f"SQL Error: {str(e)}"
+
+
+async def run_sql_query_async(query: str) -> str:
+    """Async version of run_sql_query that does not block the event loop."""
+    try:
+        query = guard_sql(query, SQL_ROW_LIMIT)
+        result = await result_cache.get_or_execute_async(
+            query, _execute_checked_async,
+            max_rows=MAX_DISPLAY_ROWS, max_bytes=STREAM_MAX_BYTES
+        )
+        return format_result(result)
+    except QueryRejected as e:
+        return f"Query rejected: {str(e)}"
+    except Exception as e:
+        return f"SQL Error: {str(e)}"
+
+
+def recall_question(question: str) -> Optional[MemoHit]:
+    """Remembered SQL for a paraphrase of question under the current schema, if any."""
+    if QUESTION_MEMO_MIN_SIMILARITY > 1:
+        return None
+    return question_memo.lookup(question, get_schema_catalog().fingerprint())
+
+
+def remember_answer(question: str, response: dict):
+    """Remember the SQL behind a successful agent response."""
+    sql = answer_sql(response)
+    if sql is not None:
+        question_memo.record(question, sql, get_schema_catalog().fingerprint())
+
+
+AGENT_PROMPT = PromptTemplate.from_template("""You are a SQL expert for a Data Lakehouse. You MUST ALWAYS query the database to answer questions.
+
+CRITICAL RULES:
+1. NEVER answer without first executing a SQL query using the sql_query tool
+2. NEVER make up or hallucinate data - only use actual query results
+3. If a query fails or returns no results, say "I could not find data for that question" - do NOT invent an answer
+4. ALWAYS filter out NULL values in your WHERE clause when querying specific fields (e.g., WHERE column IS NOT NULL)
+5. Use the full table path: catalog.gold.table_name
+
+{table_info}
+
+Tools: {tools}
+Tool names: {tool_names}
+
+You must ALWAYS use this EXACT format:
+
+Thought: I need to query the database
+Action: sql_query
+Action Input: SELECT ... FROM catalog.gold.table_name ...
+
+After you see the Observation with results, respond with ONLY:
+
+Thought: I now have the results
+Final Answer: [your answer here]
+
+NEVER skip "Final Answer:" - it must appear after your last Thought.
+
+Begin!
+
+Question: {input}
+{agent_scratchpad}""")
+
+
+def create_llm():
+    """The configured Mistral chat model."""
+    return ChatMistralAI(
+        model=MISTRAL_MODEL,
+        temperature=0,
+        mistral_api_key=MISTRAL_API_KEY
+    )
+
+
+SQL_TOOL_DESCRIPTION = "Execute a SQL query against the Dremio database. Input should be a valid SQL query."
+
+
+def create_agent(table_info: str, llm=None, sql_tool=None, verbose: bool = True):
+    """
+    Create the SQL agent with discovered schema.
+
+    llm defaults to the configured Mistral model and sql_tool to the guarded,
+    cached sql_query tool; the batch runner passes its own.
+    """
+    logger.info("Creating agent...")
+
+    if llm is None:
+        llm = create_llm()
+
+    if sql_tool is None:
+        sql_tool = Tool(
+            name="sql_query",
+            func=run_sql_query,
+            coroutine=run_sql_query_async,
+            description=SQL_TOOL_DESCRIPTION
+        )
+    tools = [sql_tool]
+
+    prompt = AGENT_PROMPT.partial(table_info=table_info)
+    agent = create_react_agent(llm, tools, prompt)
+
+    def parsing_error_handler(_error):
+        return "Format error. Remember: after Observation, you must respond with exactly:\nThought: I now have the results\nFinal Answer: [your answer based on the data]"
+
+    return AgentExecutor(
+        agent=agent,
+        tools=tools,
+        verbose=verbose,
+        handle_parsing_errors=parsing_error_handler,
+        max_iterations=10,
+        return_intermediate_steps=True
+    )
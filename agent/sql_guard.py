@@ -0,0 +1,182 @@
+"""
+SQL guard for queries written by the agent.
+
+Parses the LLM's SQL with sqlglot before it reaches Dremio: injects or
+tightens a LIMIT on row-level queries, refuses unbounded cross joins and
+write statements, and can refuse plans whose EXPLAIN cost is too high.
+Queries sqlglot cannot parse (e.g. Dremio's AT BRANCH syntax) are passed
+through unchanged.
+
+The parse tree is only used for analysis. The LIMIT is spliced into the
+original text, so the query Dremio runs is the one the agent wrote
+(regenerating it would translate Dremio functions such as TO_CHAR or
+DATE_DIFF into another dialect's).
+"""
+
+import logging
+import re
+from typing import Optional
+
+import pyarrow as pa
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import ParseError, TokenError
+from sqlglot.tokens import TokenType
+
+logger = logging.getLogger(__name__)
+
+_WRITE_STATEMENTS = (
+    exp.Insert, exp.Update, exp.Delete, exp.Merge, exp.Create, exp.Drop, exp.Alter,
+)
+
+# Dremio EXPLAIN PLAN lines read "... cumulative cost = {1.0E7 rows, ...}"
+_PLAN_COST = re.compile(r"cumulative cost = \{([0-9.Ee+-]+) rows")
+
+
+class QueryRejected(ValueError):
+    """Raised when a query is refused by the guard."""
+
+
+def _is_aggregate(select: exp.Select) -> bool:
+    """True if select returns one row per group (window functions keep every row)."""
+    if select.args.get("group"):
+        return True
+    for e in select.expressions:
+        for agg in e.find_all(exp.AggFunc):
+            window = agg.find_ancestor(exp.Window, exp.Select)
+            if not isinstance(window, exp.Window):
+                return True
+    return False
+
+
+def _conjuncts(condition: exp.Expression):
+    """The AND-ed terms of a WHERE condition."""
+    if isinstance(condition, exp.Paren):
+        yield from _conjuncts(condition.this)
+    elif isinstance(condition, exp.And):
+        yield from _conjuncts(condition.left)
+        yield from _conjuncts(condition.right)
+    else:
+        yield condition
+
+
+def _links(where: Optional[exp.Where], left: set, right: str) -> bool:
+    """True if a WHERE term compares columns of the right table with columns of a left one."""
+    if where is None:
+        return False
+    for term in _conjuncts(where.this):
+        if not isinstance(term, exp.Predicate):
+            continue
+        tables = {column.table.lower() for column in term.find_all(exp.Column)}
+        if right in tables and tables & left:
+            return True
+    return False
+
+
+def _check_joins(select: exp.Select):
+    source = select.args.get("from") or select.args.get("from_")
+    left = {source.this.alias_or_name.lower()} if source is not None else set()
+    for join in select.args.get("joins") or []:
+        right = join.this.alias_or_name.lower()
+        if isinstance(join.this, (exp.Unnest, exp.Lateral)):
+            left.add(right)
+            continue
+        unbounded = join.kind == "CROSS" or not (join.args.get("on") or join.args.get("using"))
+        if unbounded and not _links(select.args.get("where"), left, right):
+            raise QueryRejected(
+                f"Unbounded cross join with {join.this.sql()} (no ON/USING and no WHERE "
+                "condition relating it to the other tables). Add a join condition."
+            )
+        left.add(right)
+
+
+def _limit_value(tree: exp.Expression) -> Optional[int]:
+    """Literal row count of the top-level LIMIT or FETCH FIRST/NEXT n ROWS."""
+    count = _limit_count(tree)
+    if isinstance(count, exp.Literal) and count.is_int:
+        return int(count.name)
+    return None
+
+
+def _limit_count(tree: exp.Expression) -> Optional[exp.Expression]:
+    """Row count expression of the top-level LIMIT or FETCH (not its OFFSET)."""
+    limit = tree.args.get("limit")
+    if limit is None:
+        return None
+    return limit.args.get("count" if isinstance(limit, exp.Fetch) else "expression")
+
+
+def _set_limit(query: str, tree: exp.Expression, row_limit: int) -> Optional[str]:
+    """
+    query with its top-level LIMIT/FETCH row count replaced, or LIMIT appended.
+
+    The row count is located through the parse tree, so the offset of
+    "LIMIT 100, 5000" or "LIMIT 5000 OFFSET 100" is kept. None if its
+    position in the text is unknown.
+    """
+    if tree.args.get("limit") is not None:
+        count = _limit_count(tree)
+        start, end = (count.meta.get("start"), count.meta.get("end")) if count is not None else (None, None)
+        if start is None or end is None or query[start:end + 1] != count.name:
+            return None
+        return f"{query[:start]}{row_limit}{query[end + 1:]}"
+
+    statement = [t for t in sqlglot.tokenize(query) if t.token_type != TokenType.SEMICOLON]
+    # On a new line, so a trailing "-- comment" cannot swallow it
+    return f"{query[:statement[-1].end + 1]}\nLIMIT {row_limit}"
+
+
+def guard_sql(query: str, row_limit: int) -> str:
+    """
+    Return query, rewritten if needed so it is safe to run on Dremio.
+
+    Raises QueryRejected for write statements and unbounded cross joins.
+    """
+    try:
+        tree = sqlglot.parse_one(query)
+    except (ParseError, TokenError) as e:
+        logger.debug(f"SQL guard could not parse query, passing through: {e}")
+        return query
+
+    if isinstance(tree, _WRITE_STATEMENTS):
+        raise QueryRejected("Only read-only SELECT queries are allowed.")
+
+    for select in tree.find_all(exp.Select):
+        _check_joins(select)
+
+    if not isinstance(tree, (exp.Select, exp.Union)):
+        return query
+    if isinstance(tree, exp.Select) and _is_aggregate(tree):
+        return query
+
+    current = _limit_value(tree)
+    if current is not None and current <= row_limit:
+        return query
+    if tree.args.get("limit") is not None and current is None:
+        # Non-literal LIMIT (e.g. an expression); leave it to the row budget
+        return query
+
+    rewritten = _set_limit(query, tree, row_limit)
+    if rewritten is None:
+        logger.debug("SQL guard could not locate the row count, passing through")
+        return query
+    logger.info(f"SQL guard applied LIMIT {row_limit}")
+    return rewritten
+
+
+def explain_query(query: str) -> str:
+    return f"EXPLAIN PLAN FOR {query}"
+
+
+def check_plan_cost(query: str, plan: pa.Table, max_cost: float):
+    """Raise QueryRejected if the EXPLAIN plan's cost is above max_cost rows."""
+    text = "\n".join(
+        str(value) for column in plan.columns for value in column.to_pylist()
+    )
+    costs = [float(c) for c in _PLAN_COST.findall(text)]
+    if costs and max(costs) > max_cost:
+        raise QueryRejected(
+            f"Query plan is too expensive ({max(costs):.3g} rows estimated, "
+            f"limit {max_cost:.3g}). Filter or aggregate more before querying."
+        )
+
@@ -0,0 +1,121 @@
+"""run_batch against a fake chat model and a local Arrow Flight server standing in for Dremio."""
+
+import asyncio
+import json
+import re
+import threading
+
+import pyarrow as pa
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable
+from pyarrow import flight
+
+import batch
+import sql_agent
+
+SQL = "SELECT region, SUM(amount) AS total FROM catalog.gold.sales GROUP BY region"
+
+COLUMNS = pa.table({"TABLE_NAME": ["sales", "sales"], "COLUMN_NAME": ["region", "amount"],
+                    "DATA_TYPE": ["VARCHAR", "DOUBLE"]})
+
+
+class FakeLLM(Runnable):
+    """ReAct model that runs SQL once, then answers with the observation."""
+
+    def invoke(self, input, config=None, **kwargs):
+        prompt = input.to_string()
+        observations = re.findall(r"Observation: (.*?)(?:\nThought:|$)", prompt, re.DOTALL)
+        if observations:
+            return AIMessage(content=f"Thought: I now have the results\nFinal Answer: {observations[-1].strip()}")
+        return AIMessage(content=f"Thought: I need to query the database\nAction: sql_query\nAction Input: {SQL}")
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        return self.invoke(input, config, **kwargs)
+
+
+class FakeDremio(flight.FlightServerBase):
+    """
+    Flight server answering the schema query and every other query with one
+    row per endpoint ("north", then "south"); the first `failures` queries fail.
+    """
+
+    def __init__(self, failures=0, delay=0.0):
+        super().__init__("grpc://127.0.0.1:0")
+        self.failures = failures
+        self.delay = delay
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def _parts(self, query):
+        if "INFORMATION_SCHEMA" in query:
+            return [COLUMNS]
+        return [pa.table({"region": ["north"], "total": [42.0]}),
+                pa.table({"region": ["south"], "total": [7.0]})]
+
+    def get_flight_info(self, context, descriptor):
+        query = descriptor.command.decode()
+        if "INFORMATION_SCHEMA" not in query:
+            with self._lock:
+                self.queries.append(query)
+                failed = len(self.queries) <= self.failures
+            if failed:
+                raise flight.FlightServerError("Dremio unavailable")
+        parts = self._parts(query)
+        endpoints = [flight.FlightEndpoint(f"{i}:{query}".encode(), []) for i in range(len(parts))]
+        return flight.FlightInfo(parts[0].schema, descriptor, endpoints, -1, -1)
+
+    def do_get(self, context, ticket):
+        index, query = ticket.ticket.decode().split(":", 1)
+        threading.Event().wait(self.delay)
+        return flight.RecordBatchStream(self._parts(query)[int(index)])
+
+
+@pytest.fixture
+def dremio(monkeypatch):
+    servers = []
+
+    def start(**kwargs):
+        server = FakeDremio(**kwargs)
+        servers.append(server)
+        monkeypatch.setattr(sql_agent, "DREMIO_HOST", "127.0.0.1")
+        monkeypatch.setattr(sql_agent, "DREMIO_PORT", str(server.port))
+        monkeypatch.setattr(sql_agent, "dremio_pool", None)
+        monkeypatch.setattr(sql_agent, "schema_catalog", None)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def _run(tmp_path, questions, **kwargs):
+    output = tmp_path / "results.jsonl"
+    summary = asyncio.run(batch.run_batch(
+        [{"id": f"q{i}", "question": q} for i, q in enumerate(questions)],
+        output, llm=FakeLLM(), use_memo=False, **kwargs,
+    ))
+    records = sorted((json.loads(line) for line in output.read_text().splitlines()),
+                     key=lambda r: r["index"])
+    return summary, records
+
+
+def test_duplicate_sql_runs_once(tmp_path, dremio):
+    server = dremio(delay=0.05)
+    summary, records = _run(tmp_path, ["Total sales per region?", "Sales by region"], concurrency=2)
+
+    assert isinstance(sql_agent.dremio_pool, sql_agent.DremioClientPool)
+    assert len(server.queries) == 1
+    assert (summary["sql_executed"], summary["sql_reused"]) == (1, 1)
+    assert all("north" in r["answer"] and "south" in r["answer"] for r in records)
+
+
+def test_failed_sql_is_not_reused(tmp_path, dremio):
+    server = dremio(failures=1)
+    summary, records = _run(tmp_path, ["Total sales per region?", "Sales by region"], concurrency=1)
+
+    assert len(server.queries) == 2
+    assert summary["sql_executed"] == 2
+    answers = sorted(r["answer"] for r in records)
+    assert answers[0].startswith("SQL Error") and "north" in answers[1]
+
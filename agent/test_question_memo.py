@@ -0,0 +1,57 @@
+"""Paraphrase matching and persistence of the question memo."""
+
+import pytest
+
+from question_memo import QuestionMemo
+
+SQL = "SELECT 1"
+SCHEMA = "v1"
+
+
+@pytest.mark.parametrize("remembered, asked", [
+    ("top 5 customers by total spent", "show me the top 5 customers by total spending"),
+    ("Total sales per region", "what are the total sales by region?"),
+    ("charging sessions per station", "charge sessions for each station"),
+    ("Which vehicles were sold most?", "which vehicle sells most"),
+])
+def test_paraphrase_matches(remembered, asked):
+    memo = QuestionMemo()
+    memo.record(remembered, SQL, SCHEMA)
+
+    hit = memo.lookup(asked, SCHEMA)
+
+    assert hit is not None and hit.question == remembered
+
+
+@pytest.mark.parametrize("remembered, asked", [
+    ("average duration per charging session", "average duration per charging station"),
+    ("total sales per country", "total sales count"),
+    ("top 5 customers by total spent", "top 10 customers by total spent"),
+    ("top 5 customers by total spent", "bottom 5 customers by total spent"),
+    ("sales in 'Paris'", "sales in 'Berlin'"),
+])
+def test_near_miss_does_not_match(remembered, asked):
+    memo = QuestionMemo()
+    memo.record(remembered, SQL, SCHEMA)
+
+    assert memo.lookup(asked, SCHEMA) is None
+
+
+def test_other_schema_does_not_match():
+    memo = QuestionMemo()
+    memo.record("Total sales per region", SQL, SCHEMA)
+
+    assert memo.lookup("Total sales per region", "v2") is None
+
+
+def test_file_is_compacted_on_eviction(tmp_path):
+    path = tmp_path / "memo.jsonl"
+    memo = QuestionMemo(max_entries=2, path=str(path))
+    for region in ("north", "south", "east", "west"):
+        memo.record(f"total sales in the {region} region", SQL, SCHEMA)
+    memo.record("total sales in the west region", "SELECT 2", SCHEMA)
+
+    assert len(path.read_text().splitlines()) == 2
+    reloaded = QuestionMemo(max_entries=2, path=str(path))
+    assert reloaded.questions() == ["total sales in the east region", "total sales in the west region"]
+    assert reloaded.lookup("total sales in the west region", SCHEMA).sql == "SELECT 2"
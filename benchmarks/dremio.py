@@ -0,0 +1,42 @@
+"""
+Minimal Dremio Arrow Flight helper shared by the benchmark scripts.
+
+Connection settings come from the same environment variables as the agent
+(DREMIO_HOST, DREMIO_PORT, DREMIO_USER, DREMIO_PASSWORD).
+"""
+
+import base64
+import os
+import time
+
+import pyarrow as pa
+from pyarrow import flight
+
+DREMIO_HOST = os.getenv("DREMIO_HOST", "localhost")
+DREMIO_PORT = os.getenv("DREMIO_PORT", "32010")
+DREMIO_USER = os.getenv("DREMIO_USER", "dremio")
+DREMIO_PASSWORD = os.getenv("DREMIO_PASSWORD", "dremio123")
+
+
+class Dremio:
+    """Blocking Flight client returning Arrow tables."""
+
+    def __init__(self):
+        self.client = flight.connect(f"grpc://{DREMIO_HOST}:{DREMIO_PORT}")
+        auth = base64.b64encode(f"{DREMIO_USER}:{DREMIO_PASSWORD}".encode()).decode()
+        self.options = flight.FlightCallOptions(
+            headers=[(b"authorization", f"Basic {auth}".encode())]
+        )
+
+    def query(self, sql: str):
+        info = self.client.get_flight_info(flight.FlightDescriptor.for_command(sql), self.options)
+        tables = [self.client.do_get(ep.ticket, self.options).read_all() for ep in info.endpoints]
+        if not tables:
+            return info.schema.empty_table()
+        return pa.concat_tables(tables)
+
+    def timed(self, sql: str):
+        """Run sql and return (table, seconds)."""
+        start = time.perf_counter()
+        table = self.query(sql)
+        return table, time.perf_counter() - start
@@ -0,0 +1,95 @@
+"""
+Benchmark: raw CSV/JSONL landing files versus their Parquet copies.
+
+For every source in data/convert_to_parquet.py, converts the raw file to a
+temporary Parquet file and reports file sizes and scan times for:
+
+- row:      reading the raw file row by row in Python (csv / json.loads),
+            like a row-oriented ingestion connector
+- arrow:    reading the raw file with Arrow's CSV/JSON reader
+- parquet:  reading the whole Parquet file
+- 1 column: reading a single column from Parquet (column pruning)
+
+Usage:
+    python benchmarks/landing_formats.py [--repeat 5]
+"""
+
+import argparse
+import csv
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import pyarrow.csv as pa_csv
+import pyarrow.json as pa_json
+import pyarrow.parquet as pq
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "data"))
+from convert_to_parquet import DATA_DIR, SOURCES, convert_to_parquet  # noqa: E402
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            return sum(1 for _ in csv.DictReader(f))
+        return sum(1 for line in f if line.strip() and json.loads(line) is not None)
+
+
+def read_arrow(path):
+    reader = pa_csv.read_csv if path.endswith(".csv") else pa_json.read_json
+    return reader(path).num_rows
+
+
+def timed(fn, repeat):
+    """Median wall time of fn over repeat runs, in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    header = (f"{'source':<36} {'rows':>8} {'raw MB':>8} {'pq MB':>8} {'ratio':>6} "
+              f"{'row ms':>8} {'arrow ms':>9} {'pq ms':>7} {'1 col ms':>9}")
+    print(header)
+    print("-" * len(header))
+
+    totals = {"raw": 0, "parquet": 0}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, spec in SOURCES.items():
+            raw_path = os.path.join(args.data_dir, name)
+            if not os.path.exists(raw_path):
+                print(f"{name:<36} missing")
+                continue
+            parquet_path = os.path.join(tmp, os.path.splitext(name)[0] + ".parquet")
+            stats = convert_to_parquet(raw_path, parquet_path, spec)
+            first_column = pq.ParquetFile(parquet_path).schema_arrow.names[0]
+
+            row_ms = timed(lambda: read_rows(raw_path), args.repeat)
+            arrow_ms = timed(lambda: read_arrow(raw_path), args.repeat)
+            pq_ms = timed(lambda: pq.read_table(parquet_path), args.repeat)
+            col_ms = timed(lambda: pq.read_table(parquet_path, columns=[first_column]), args.repeat)
+
+            totals["raw"] += stats["raw_bytes"]
+            totals["parquet"] += stats["parquet_bytes"]
+            print(f"{name:<36} {stats['rows']:>8,} {stats['raw_bytes'] / 1e6:>8.2f} "
+                  f"{stats['parquet_bytes'] / 1e6:>8.2f} "
+                  f"{stats['raw_bytes'] / max(stats['parquet_bytes'], 1):>5.1f}x "
+                  f"{row_ms:>8.1f} {arrow_ms:>9.1f} {pq_ms:>7.1f} {col_ms:>9.1f}")
+
+    print(f"\nTotal: {totals['raw'] / 1e6:.2f} MB raw -> {totals['parquet'] / 1e6:.2f} MB Parquet "
+          f"({totals['raw'] / max(totals['parquet'], 1):.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
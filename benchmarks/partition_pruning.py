@@ -0,0 +1,92 @@
+"""
+Benchmark: Iceberg file pruning on partitioned/sorted Silver and Gold tables.
+
+Runs typical agent and Superset queries filtered on the partition and sort
+columns configured in dbt_project.yml, then reads Dremio's job history to
+report how many rows/bytes were actually scanned versus the table size.
+
+Usage (against the docker-compose stack):
+    DREMIO_HOST=localhost python benchmarks/partition_pruning.py
+"""
+
+import time
+import uuid
+
+from dremio import Dremio
+
+QUERIES = [
+    (
+        "agent: sessions per station on one day",
+        "catalog.silver.charging_sessions",
+        "SELECT station_id, COUNT(*) AS sessions FROM catalog.silver.charging_sessions "
+        "WHERE start_time >= TIMESTAMP '2024-01-15 00:00:00' "
+        "AND start_time < TIMESTAMP '2024-01-16 00:00:00' GROUP BY station_id",
+    ),
+    (
+        "agent: one station's utilization",
+        "catalog.gold.charging_station_utilization",
+        "SELECT * FROM catalog.gold.charging_station_utilization WHERE station_id = 22",
+    ),
+    (
+        "superset: monthly revenue for a quarter",
+        "catalog.gold.enriched_sales",
+        "SELECT DATE_TRUNC('month', sale_date) AS sale_month, SUM(sale_price) AS revenue "
+        "FROM catalog.gold.enriched_sales "
+        "WHERE sale_date >= DATE '2023-07-01' AND sale_date < DATE '2023-10-01' "
+        "GROUP BY DATE_TRUNC('month', sale_date)",
+    ),
+    (
+        "superset: one month of silver sales",
+        "catalog.silver.sales",
+        "SELECT payment_method, COUNT(*) AS sales, AVG(sale_price) AS avg_price "
+        "FROM catalog.silver.sales "
+        "WHERE sale_date >= DATE '2023-04-01' AND sale_date < DATE '2023-05-01' "
+        "GROUP BY payment_method",
+    ),
+]
+
+
+def job_stats(dremio: Dremio, tag: str, timeout: float = 15) -> dict:
+    """Look up scan statistics of the job whose SQL contains tag."""
+    sql = (
+        "SELECT rows_scanned, bytes_scanned FROM sys.jobs_recent "
+        f"WHERE query LIKE '%{tag}%' AND query NOT LIKE '%sys.jobs_recent%'"
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        rows = dremio.query(sql).to_pylist()
+        if rows:
+            return rows[0]
+        time.sleep(1)
+    return {"rows_scanned": None, "bytes_scanned": None}
+
+
+def table_stats(dremio: Dremio, table: str) -> dict:
+    rows = dremio.query(f"SELECT COUNT(*) AS n FROM {table}").column("n")[0].as_py()
+    files = dremio.query(
+        f"SELECT COUNT(*) AS n FROM TABLE(table_files('{table}'))"
+    ).column("n")[0].as_py()
+    return {"rows": rows, "files": files}
+
+
+def main():
+    dremio = Dremio()
+    print(f"{'query':45} {'files':>6} {'rows':>10} {'scanned':>10} {'pruned':>7} {'time':>8}")
+    for name, table, sql in QUERIES:
+        tag = f"bench-{uuid.uuid4().hex[:12]}"
+        _, seconds = dremio.timed(f"{sql} /* {tag} */")
+        stats = job_stats(dremio, tag)
+        total = table_stats(dremio, table)
+
+        scanned = stats["rows_scanned"]
+        pruned = "n/a"
+        if scanned is not None and total["rows"]:
+            pruned = f"{1 - scanned / total['rows']:.0%}"
+        print(
+            f"{name:45} {total['files']:>6} {total['rows']:>10} "
+            f"{scanned if scanned is not None else 'n/a':>10} {pruned:>7} {seconds * 1000:>6.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
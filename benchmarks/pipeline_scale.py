@@ -0,0 +1,225 @@
+"""
+Benchmark: the whole pipeline at increasing data scales.
+
+For each --scale, generates synthetic source files (synthetic_data.py),
+then times every stage end to end:
+
+- generate: writing the source files
+- bronze:   the bronze_ingestion job (full reload of every file)
+- silver:   the silver_transformation job (full refresh, nothing skipped)
+- gold:     the gold_transformation job (full refresh, nothing skipped)
+- quality:  the quality_checks_only job (full scope)
+- agent:    typical agent queries against Gold over Arrow Flight
+
+Dagster jobs run through `dagster job execute` in orchestration/, with
+DATA_FOLDER pointing at the generated files. Every stage result is appended
+as one JSON line to --results (with scale, rows, seconds, git commit), and
+--baseline compares this run with an earlier results file.
+
+Usage (against the docker-compose stack):
+    python benchmarks/pipeline_scale.py --scale 1 10 100
+    python benchmarks/pipeline_scale.py --scale 10 --baseline benchmarks/results/main.jsonl
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import yaml
+
+from synthetic_data import FILES, generate
+
+ROOT = Path(__file__).resolve().parent.parent
+ORCHESTRATION_DIR = ROOT / "orchestration"
+DEFAULT_RESULTS = Path(__file__).resolve().parent / "results" / "pipeline_scale.jsonl"
+
+STAGES = ["generate", "bronze", "silver", "gold", "quality", "agent"]
+# Must match DBT_DOMAINS in orchestration/orchestration/assets.py
+DBT_DOMAINS = ["ecoride", "chargenet", "vehicle_health"]
+
+AGENT_QUERIES = [
+    "SELECT customer_id, first_name, total_spent FROM catalog.gold.customer_lifetime_value "
+    "ORDER BY total_spent DESC LIMIT 10",
+    "SELECT station_id, total_sessions, average_duration FROM catalog.gold.charging_station_utilization "
+    "ORDER BY total_sessions DESC LIMIT 10",
+    "SELECT DATE_TRUNC('month', sale_date) AS sale_month, SUM(sale_price) AS revenue "
+    "FROM catalog.gold.enriched_sales GROUP BY DATE_TRUNC('month', sale_date)",
+    "SELECT model_name, SUM(total_sales) AS sales, AVG(average_rating) AS rating "
+    "FROM catalog.gold.vehicle_usage GROUP BY model_name",
+    "SELECT health_status, COUNT(*) AS vehicles FROM catalog.gold.vehicle_health_analysis "
+    "GROUP BY health_status",
+]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _job_config(stage: str) -> dict:
+    """Run config forcing each stage to do its full work."""
+    if stage == "bronze":
+        ops = {f"bronze__{table}": {"config": {"full_reload": True}} for table in FILES}
+    elif stage in ("silver", "gold"):
+        ops = {f"{stage}_{domain}_dbt_assets": {"config": {"full_refresh": True, "skip_unchanged": False}}
+               for domain in DBT_DOMAINS}
+    else:
+        ops = {name: {"config": {"scope": "full"}} for name in ("soda_silver_quality", "soda_gold_quality")}
+    return {"ops": ops}
+
+
+JOBS = {
+    "bronze": "bronze_ingestion",
+    "silver": "silver_transformation",
+    "gold": "gold_transformation",
+    "quality": "quality_checks_only",
+}
+
+
+def run_job(stage: str, data_dir: str) -> float:
+    """Execute a stage's Dagster job; returns seconds. Raises if the job fails."""
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
+        yaml.safe_dump(_job_config(stage), f)
+        config_path = f.name
+    try:
+        start = time.perf_counter()
+        subprocess.run(
+            ["dagster", "job", "execute", "-m", "orchestration.definitions",
+             "-j", JOBS[stage], "-c", config_path],
+            cwd=ORCHESTRATION_DIR,
+            env={**os.environ, "DATA_FOLDER": data_dir},
+            check=True,
+            capture_output=True,
+        )
+        return time.perf_counter() - start
+    finally:
+        os.unlink(config_path)
+
+
+def run_agent_queries(repeat: int) -> float:
+    """Median total time of the agent query set."""
+    from dremio import Dremio
+
+    dremio = Dremio()
+    totals = []
+    for _ in range(repeat):
+        totals.append(sum(dremio.timed(sql)[1] for sql in AGENT_QUERIES))
+    return statistics.median(totals)
+
+
+def run_scale(scale: float, stages, seed: int, repeat: int, keep_data: bool):
+    """Run the selected stages at one scale; yields one result dict per stage."""
+    data_dir = tempfile.mkdtemp(prefix=f"lakehouse-x{scale:g}-")
+    rows = None
+    try:
+        for stage in stages:
+            result = {"scale": scale, "stage": stage, "ok": True, "error": None}
+            try:
+                if stage == "generate":
+                    start = time.perf_counter()
+                    rows = generate(data_dir, scale, seed)
+                    result["seconds"] = time.perf_counter() - start
+                elif stage == "agent":
+                    result["seconds"] = run_agent_queries(repeat)
+                else:
+                    if rows is None:
+                        rows = generate(data_dir, scale, seed)
+                    result["seconds"] = run_job(stage, data_dir)
+            except subprocess.CalledProcessError as e:
+                result.update(ok=False, seconds=None,
+                              error=(e.stderr or b"").decode(errors="replace")[-2000:])
+            except Exception as e:
+                result.update(ok=False, seconds=None, error=repr(e))
+            result["rows"] = sum(rows.values()) if rows else None
+            yield result
+            if not result["ok"] and stage != "agent":
+                break  # later stages depend on this one
+    finally:
+        if keep_data:
+            print(f"Generated data kept in {data_dir}")
+        else:
+            for name in os.listdir(data_dir):
+                os.unlink(os.path.join(data_dir, name))
+            os.rmdir(data_dir)
+
+
+def load_results(path: Path) -> dict:
+    """{(scale, stage): [seconds, ...]} of the successful results in a results file."""
+    results = {}
+    for line in path.read_text().splitlines():
+        r = json.loads(line)
+        if r.get("ok") and r.get("seconds") is not None:
+            results.setdefault((r["scale"], r["stage"]), []).append(r["seconds"])
+    return results
+
+
+def compare(current: list, baseline: dict, tolerance: float) -> bool:
+    """Print current vs baseline medians; returns False on any regression."""
+    ok = True
+    print(f"\n{'scale':>7} {'stage':<10} {'baseline s':>11} {'now s':>9} {'change':>8}")
+    for r in current:
+        base = baseline.get((r["scale"], r["stage"]))
+        if not r["ok"] or not base:
+            continue
+        base_s = statistics.median(base)
+        change = r["seconds"] / base_s - 1 if base_s else 0.0
+        flag = ""
+        if change > tolerance:
+            flag, ok = "  REGRESSION", False
+        print(f"{r['scale']:>7g} {r['stage']:<10} {base_s:>11.2f} {r['seconds']:>9.2f} {change:>+8.0%}{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every pipeline stage at increasing data scales.")
+    parser.add_argument("--scale", type=float, nargs="+", default=[1, 10],
+                        help="Scale factors relative to the bundled sample (default: 1 10)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions of the agent query set")
+    parser.add_argument("--results", type=Path, default=DEFAULT_RESULTS)
+    parser.add_argument("--baseline", type=Path, help="Earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Slowdown versus baseline reported as a regression (default: 0.2 = 20%%)")
+    parser.add_argument("--keep-data", action="store_true")
+    args = parser.parse_args()
+
+    run_id = uuid.uuid4().hex[:12]
+    commit = _git_commit()
+    args.results.parent.mkdir(parents=True, exist_ok=True)
+
+    current = []
+    print(f"{'scale':>7} {'stage':<10} {'rows':>12} {'seconds':>9}")
+    with open(args.results, "a") as out:
+        for scale in args.scale:
+            for result in run_scale(scale, args.stages, args.seed, args.repeat, args.keep_data):
+                result.update(run_id=run_id, commit=commit,
+                              at=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                current.append(result)
+                seconds = f"{result['seconds']:.2f}" if result["ok"] else "FAILED"
+                rows = f"{result['rows']:,}" if result["rows"] else "-"
+                print(f"{scale:>7g} {result['stage']:<10} {rows:>12} {seconds:>9}")
+                if result["error"]:
+                    print(f"        {result['error'].strip().splitlines()[-1]}")
+
+    print(f"\nResults appended to {args.results} (run {run_id})")
+    if args.baseline:
+        if not compare(current, load_results(args.baseline), args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+"""
+Synthetic source data at a configurable scale.
+
+Writes the seven raw source files (same names, columns and value formats as
+data/) with row counts multiplied by --scale relative to the bundled
+sample. Values are generated column-wise with NumPy and joined into CSV /
+JSONL text with Arrow compute, in chunks of --chunk-rows, so 1000x runs
+stream to disk in bounded memory.
+
+Realism:
+- referential integrity: sales and reviews point at existing customers and
+  vehicles, sessions at existing stations;
+- skew: customer purchases, vehicle popularity and station usage follow
+  Zipf-like distributions, sessions cluster around commute hours and sales
+  around spring/autumn;
+- determinism: the same --seed, --scale and --chunk-rows produce
+  byte-identical files.
+
+Usage:
+    python benchmarks/synthetic_data.py --scale 100 --out-dir /tmp/lakehouse-x100
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+# Row counts of the bundled sample (scale 1)
+BASE_ROWS = {
+    "customers": 2500,
+    "sales": 5800,
+    "product_reviews": 50,
+    "stations": 250,
+    "charging_sessions": 12000,
+    "vehicle_health": 3200,
+}
+FILES = {
+    "customers": "ecoride_customers.csv",
+    "sales": "ecoride_sales.csv",
+    "vehicles": "ecoride_vehicles.csv",
+    "product_reviews": "ecoride_product_reviews.jsonl",
+    "stations": "chargenet_stations.jsonl",
+    "charging_sessions": "chargenet_charging_sessions.jsonl",
+    "vehicle_health": "vehicle_health_data.jsonl",
+}
+TABLE_SEEDS = {name: i for i, name in enumerate(FILES)}
+DEFAULT_CHUNK_ROWS = 500_000
+
+FIRST_NAMES = ["Benny", "Glennis", "Justine", "Demetris", "Ava", "Liam", "Noah", "Emma", "Olivia",
+               "Mason", "Sophia", "Lucas", "Mia", "Ethan", "Harper", "Logan", "Ella", "Aiden",
+               "Chloe", "Jack", "Grace", "Owen", "Zoe", "Caleb", "Nora", "Ruby", "Hugo", "Ivy"]
+LAST_NAMES = ["Heyfield", "Lightning", "Rowth", "Sancho", "Worviell", "Smith", "Johnson", "Brown",
+              "Garcia", "Miller", "Davis", "Wilson", "Moore", "Taylor", "Thomas", "Clark", "Lewis",
+              "Walker", "Young", "Allen", "King", "Wright", "Scott", "Hill", "Green", "Baker"]
+DOMAINS = ["example.com", "mail.com", "netscape.com", "prlog.org", "rakuten.co.jp", "senate.gov"]
+STREETS = ["Dapin", "Hudson", "Chive Hill", "3rd", "Montana", "Shasta", "Arizona", "New Castle",
+           "Pleasure", "Oak", "Maple", "Sunset", "Lakeview", "Ridge", "Cedar"]
+STREET_SUFFIXES = ["Trail", "Terrace", "Lane", "Parkway", "Avenue", "Junction", "Circle", "Street"]
+# (city, state name, state code), weighted towards the first entries
+CITIES = [("Los Angeles", "California", "CA"), ("Houston", "Texas", "TX"),
+          ("El Paso", "Texas", "TX"), ("San Antonio", "Texas", "TX"),
+          ("Fort Lauderdale", "Florida", "FL"), ("Miami", "Florida", "FL"),
+          ("New York City", "New York", "NY"), ("Oklahoma City", "Oklahoma", "OK"),
+          ("Indianapolis", "Indiana", "IN"), ("Minneapolis", "Minnesota", "MN"),
+          ("Mesa", "Arizona", "AZ"), ("Hartford", "Connecticut", "CT"),
+          ("Seattle", "Washington", "WA"), ("Denver", "Colorado", "CO")]
+MODELS = ["UrbanGlide", "EcoSprint", "AeroFlow", "PowerRide", "TerraCross"]
+MODEL_TYPES = ["Crossover", "Hatchback", "SUV", "Sedan", "Coupe"]
+COLORS = ["Midnight Black", "Cherry Red", "Arctic White", "Sky Blue", "Metallic Silver"]
+PAYMENT_METHODS = ["Cash", "Credit Card", "Online Transfer"]
+STATION_TYPES = ["Standard", "Fast-Charge"]
+STATION_STATUS = ["Operational", "Maintenance", "Out-of-Service"]
+MAINTENANCE_TYPES = ["Tire Rotation", "Battery Check", "Brake Inspection", "Engine Diagnostic"]
+MAINTENANCE_OUTCOMES = ["Performed", "Issue Found", "Good"]
+ALERT_TYPES = ["Engine Warning", "High Battery Temperature", "Low Tire Pressure"]
+# Review text: opener prefix + model + opener suffix + body
+REVIEW_OPENERS = [("I recently purchased the", "EV"), ("We bought the", "last year"),
+                  ("After a month with the", "I can say it"), ("The", "electric vehicle")]
+REVIEW_BODIES = ["and it has been amazing for our family trips.",
+                 "and the range is better than advertised.",
+                 "but charging takes longer than I hoped.",
+                 "offers a sleek design and a quiet ride.",
+                 "and the interior feels cheap for the price."]
+
+
+# =============================================================================
+# Vectorised helpers
+# =============================================================================
+
+def _rng(seed: int, table: str, chunk: int) -> np.random.Generator:
+    return np.random.default_rng([seed, TABLE_SEEDS[table], chunk])
+
+
+def _pick(rng, values, size, weights=None):
+    """Arrow string array of values drawn (optionally weighted) from a list."""
+    p = None if weights is None else np.asarray(weights, dtype=float) / np.sum(weights)
+    return pa.array(np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=p)], pa.string())
+
+
+class SkewedIds:
+    """Draws ids 1..n with Zipf-like popularity; popular ids are spread over the range."""
+
+    def __init__(self, n: int, exponent: float, seed: int):
+        weights = 1.0 / np.arange(1, n + 1) ** exponent
+        self.cdf = np.cumsum(weights) / weights.sum()
+        self.ids = np.random.default_rng(seed).permutation(n) + 1
+
+    def draw(self, rng, size):
+        ranks = np.searchsorted(self.cdf, rng.random(size), side="right")
+        return self.ids[np.minimum(ranks, len(self.ids) - 1)]
+
+
+def _str(values) -> pa.Array:
+    return pc.cast(pa.array(values), pa.string())
+
+
+def _join(*parts, sep=""):
+    return pc.binary_join_element_wise(*parts, sep)
+
+
+def _us_date(dates: np.ndarray) -> pa.Array:
+    """M/D/YYYY without zero padding, like the raw exports."""
+    d = dates.astype("datetime64[D]")
+    years = d.astype("datetime64[Y]").astype(int) + 1970
+    months = d.astype("datetime64[M]").astype(int) % 12 + 1
+    days = (d - d.astype("datetime64[M]")).astype(int) + 1
+    return _join(_str(months), _str(days), _str(years), sep="/")
+
+
+def _iso_date(dates: np.ndarray) -> pa.Array:
+    return pc.strftime(pa.array(dates.astype("datetime64[s]")), format="%Y-%m-%d")
+
+
+def _random_dates(rng, size, start="2020-01-01", end="2024-12-31"):
+    lo, hi = np.datetime64(start, "D"), np.datetime64(end, "D")
+    return lo + rng.integers(0, (hi - lo).astype(int) + 1, size)
+
+
+def _json_str(values: pa.Array) -> pa.Array:
+    """JSON-encode a string array (generated values contain no quotes or escapes)."""
+    return pc.fill_null(_join(pa.scalar('"'), values, pa.scalar('"')), "null")
+
+
+def _json_num(values) -> pa.Array:
+    return pc.fill_null(_str(values), "null")
+
+
+def _json_object(fields) -> pa.Array:
+    """{"key": value, ...} per row from (key, JSON-encoded value array) pairs."""
+    members = [_join(pa.scalar(f'"{key}": '), value) for key, value in fields]
+    return _join(pa.scalar("{"), _join(*members, sep=", "), pa.scalar("}"))
+
+
+def _json_list(items, counts: np.ndarray) -> pa.Array:
+    """JSON arrays holding the first counts[i] of the item arrays for row i."""
+    kept = [pc.if_else(pa.array(counts > k), item, pa.nulls(len(counts), pa.string()))
+            for k, item in enumerate(items)]
+    joined = pc.binary_join_element_wise(*kept, ", ", null_handling="skip")
+    return _join(pa.scalar("["), joined, pa.scalar("]"))
+
+
+# =============================================================================
+# Tables
+# =============================================================================
+
+def vehicles() -> pa.Table:
+    """Fixed 40-vehicle catalog (does not scale)."""
+    rng = np.random.default_rng([0, TABLE_SEEDS["vehicles"]])
+    n = 40
+    model = rng.integers(0, len(MODELS), n)
+    return pa.table({
+        "id": np.arange(1, n + 1),
+        "model_name": pa.array(np.asarray(MODELS, dtype=object)[model], pa.string()),
+        "model_type": pa.array(np.asarray(MODEL_TYPES, dtype=object)[model], pa.string()),
+        "battery_capacity": rng.choice([40, 50, 80, 100], n),
+        "range": rng.choice([150, 200, 300, 350], n),
+        "color": _pick(rng, COLORS, n),
+        "year": rng.integers(2020, 2025, n),
+        "charging_time": rng.choice([8, 10, 24], n),
+    })
+
+
+def customers(rng, first_id, n) -> pa.Table:
+    ids = np.arange(first_id, first_id + n)
+    first = _pick(rng, FIRST_NAMES, n)
+    last = _pick(rng, LAST_NAMES, n)
+    city_idx = rng.choice(len(CITIES), n, p=_decaying(len(CITIES)))
+    email = _join(pc.utf8_lower(pc.utf8_slice_codeunits(first, 0, 1)), pc.utf8_lower(last),
+                  _str(ids), pa.scalar("@"), _pick(rng, DOMAINS, n))
+    phone = _join(_str(rng.integers(200, 1000, n)), _str(rng.integers(200, 1000, n)),
+                  pc.utf8_lpad(_str(rng.integers(0, 10000, n)), 4, "0"), sep="-")
+    return pa.table({
+        "id": ids,
+        "first_name": first,
+        "last_name": last,
+        "email": email,
+        "phone": phone,
+        "address": _address(rng, n),
+        "city": pa.array([CITIES[i][0] for i in city_idx], pa.string()),
+        "state": pa.array([CITIES[i][1] for i in city_idx], pa.string()),
+        "country": pa.array(["United States"] * n, pa.string()),
+    })
+
+
+def sales(rng, first_id, n, customer_ids: SkewedIds, vehicle_ids: SkewedIds) -> pa.Table:
+    # Two seasonal peaks (spring and autumn) over 2023-2024
+    day_of_year = np.clip(np.where(rng.random(n) < 0.5, rng.normal(100, 30, n), rng.normal(280, 30, n)), 0, 364)
+    dates = (np.datetime64("2023-01-01") + rng.integers(0, 2, n) * 365 + day_of_year.astype(int))
+    return pa.table({
+        "id": np.arange(first_id, first_id + n),
+        "customer_id": customer_ids.draw(rng, n),
+        "vehicle_id": vehicle_ids.draw(rng, n),
+        "sale_date": _us_date(dates),
+        "sale_price": np.round(rng.uniform(30000, 100000, n), 2),
+        "payment_method": _pick(rng, PAYMENT_METHODS, n, weights=[1, 3, 2]),
+    })
+
+
+def product_reviews(rng, first_id, n, customer_ids: SkewedIds, model_weights) -> pa.Array:
+    model = _pick(rng, MODELS, n, weights=model_weights)
+    opener = rng.integers(0, len(REVIEW_OPENERS), n)
+    prefix = pa.array([REVIEW_OPENERS[i][0] for i in opener], pa.string())
+    suffix = pa.array([REVIEW_OPENERS[i][1] for i in opener], pa.string())
+    text = _join(prefix, model, suffix, _pick(rng, REVIEW_BODIES, n), sep=" ")
+    return _json_object([
+        ("ReviewID", _json_str(_join(pa.scalar("REV"), _str(np.arange(first_id, first_id + n))))),
+        ("VehicleModel", _json_str(model)),
+        ("CustomerID", _json_str(_str(customer_ids.draw(rng, n)))),
+        ("Rating", _json_num(rng.choice([1, 2, 3, 4, 5], n, p=[0.03, 0.07, 0.2, 0.4, 0.3]))),
+        ("Date", _json_str(_iso_date(_random_dates(rng, n)))),
+        ("ReviewText", _json_str(text)),
+    ])
+
+
+def stations(rng, first_id, n) -> pa.Array:
+    city_idx = rng.choice(len(CITIES), n, p=_decaying(len(CITIES)))
+    return _json_object([
+        ("id", _json_num(np.arange(first_id, first_id + n))),
+        ("address", _json_str(_address(rng, n))),
+        ("city", _json_str(pa.array([CITIES[i][0] for i in city_idx], pa.string()))),
+        ("state", _json_str(pa.array([CITIES[i][2] for i in city_idx], pa.string()))),
+        ("country", _json_str(pa.array(["United States"] * n, pa.string()))),
+        ("number_of_chargers", _json_num(rng.integers(2, 5, n))),
+        ("station_type", _json_str(_pick(rng, STATION_TYPES, n, weights=[3, 1]))),
+        ("operational_status", _json_str(_pick(rng, STATION_STATUS, n, weights=[8, 1, 1]))),
+    ])
+
+
+def charging_sessions(rng, first_id, n, station_ids: SkewedIds) -> pa.Array:
+    # Start times cluster around the morning and evening commute
+    hour = np.where(rng.random(n) < 0.5, rng.normal(8, 1.5, n), rng.normal(18, 2, n)) % 24
+    day = _random_dates(rng, n, "2023-01-01", "2024-12-31")
+    start = day.astype("datetime64[s]") + (hour * 3600).astype(int) + rng.integers(0, 60, n)
+    duration = rng.integers(15, 121, n)
+    end = start + duration * 60
+    rate = rng.integers(7, 23, n)
+    energy = np.maximum(1, np.round(rate * duration / 60 * rng.uniform(0.6, 1.0, n))).astype(int)
+
+    def timestamp(ts):
+        return _join(_us_date(ts), pc.strftime(pa.array(ts), format="%H:%M:%S"), sep=" ")
+
+    return _json_object([
+        ("id", _json_num(np.arange(first_id, first_id + n))),
+        ("station_id", _json_num(station_ids.draw(rng, n))),
+        ("start_time", _json_str(timestamp(start))),
+        ("session_duration", _json_num(duration)),
+        ("end_time", _json_str(timestamp(end))),
+        ("charging_rate", _json_num(rate)),
+        ("energy_consumed_kWh", _json_num(energy)),
+        ("cost", _json_num(np.char.mod("%.1f", energy * 0.2))),
+    ])
+
+
+def vehicle_health(rng, first_id, n, model_weights) -> pa.Array:
+    maintenance_counts = rng.integers(1, 6, n)
+    alert_counts = rng.integers(1, 4, n)
+
+    maintenance = []
+    for _ in range(5):
+        kind = _pick(rng, MAINTENANCE_TYPES, n)
+        battery = pc.if_else(pc.equal(kind, "Battery Check"),
+                             _join(_str(rng.integers(70, 100, n)), pa.scalar("%")),
+                             pa.nulls(n, pa.string()))
+        maintenance.append(_json_object([
+            ("MaintenanceID", _json_str(_join(pa.scalar("MAINT"), _str(rng.integers(1000, 10000, n))))),
+            ("Date", _json_str(_iso_date(_random_dates(rng, n)))),
+            ("Type", _json_str(kind)),
+            ("Outcome", _json_str(_pick(rng, MAINTENANCE_OUTCOMES, n))),
+            ("Details", _json_object([
+                ("BatteryHealth", _json_str(battery)),
+                ("NextCheckupDue", _json_str(_iso_date(_random_dates(rng, n)))),
+            ])),
+        ]))
+
+    alerts = []
+    for _ in range(3):
+        kind = _pick(rng, ALERT_TYPES, n)
+        none = pa.nulls(n, pa.string())
+        pressure = pc.if_else(pc.equal(kind, "Low Tire Pressure"),
+                              _join(_str(rng.integers(26, 36, n)), pa.scalar("psi")), none)
+        temperature = pc.if_else(pc.equal(kind, "High Battery Temperature"),
+                                 _join(_str(rng.integers(120, 145, n)), pa.scalar("°F")), none)
+        action = pc.if_else(pc.equal(kind, "Low Tire Pressure"), none,
+                            pa.array(["Service Check"] * n, pa.string()))
+        alerts.append(_json_object([
+            ("AlertID", _json_str(_join(pa.scalar("ALERT"), _str(rng.integers(1000, 10000, n))))),
+            ("Date", _json_str(_iso_date(_random_dates(rng, n)))),
+            ("Type", _json_str(kind)),
+            ("Resolved", pc.if_else(pa.array(rng.random(n) < 0.6), "true", "false")),
+            ("Details", _json_object([
+                ("Pressure", _json_str(pressure)),
+                ("Temperature", _json_str(temperature)),
+                ("RecommendedAction", _json_str(action)),
+            ])),
+        ]))
+
+    return _json_object([
+        ("VehicleID", _json_str(_join(pa.scalar("VEH"), _str(np.arange(first_id, first_id + n) + 10000)))),
+        ("Model", _json_str(_pick(rng, MODELS, n, weights=model_weights))),
+        ("ManufacturingYear", _json_num(rng.integers(2020, 2025, n))),
+        ("MaintenanceHistory", _json_list(maintenance, maintenance_counts)),
+        ("Alerts", _json_list(alerts, alert_counts)),
+    ])
+
+
+def _decaying(n: int) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1)
+    return weights / weights.sum()
+
+
+def _address(rng, n) -> pa.Array:
+    return _join(_str(rng.integers(1, 99999, n)), _pick(rng, STREETS, n), _pick(rng, STREET_SUFFIXES, n), sep=" ")
+
+
+# =============================================================================
+# Writing
+# =============================================================================
+
+def _chunks(total: int, chunk_rows: int):
+    for chunk, start in enumerate(range(0, total, chunk_rows)):
+        yield chunk, start + 1, min(chunk_rows, total - start)
+
+
+def _write_csv(path, tables):
+    # Generated values contain no commas or quotes, so like the raw exports
+    # nothing is quoted (Arrow would always quote the header)
+    options = pa_csv.WriteOptions(include_header=False, quoting_style="none")
+    with open(path, "wb") as f:
+        for i, table in enumerate(tables):
+            if i == 0:
+                f.write((",".join(table.column_names) + "\n").encode())
+            pa_csv.write_csv(table, f, write_options=options)
+
+
+def _write_jsonl(path, line_arrays):
+    with open(path, "w", encoding="utf-8") as f:
+        for lines in line_arrays:
+            f.write("\n".join(lines.to_pylist()))
+            f.write("\n")
+
+
+def generate(out_dir: str, scale: float = 1.0, seed: int = 42,
+             chunk_rows: int = DEFAULT_CHUNK_ROWS) -> dict:
+    """Write all source files to out_dir; returns {table: rows}."""
+    os.makedirs(out_dir, exist_ok=True)
+    rows = {name: max(1, int(round(base * scale))) for name, base in BASE_ROWS.items()}
+    path = {name: os.path.join(out_dir, fname) for name, fname in FILES.items()}
+
+    catalog = vehicles()
+    rows["vehicles"] = catalog.num_rows
+    _write_csv(path["vehicles"], [catalog])
+
+    customer_ids = SkewedIds(rows["customers"], 0.3, seed)
+    vehicle_ids = SkewedIds(catalog.num_rows, 0.8, seed + 1)
+    station_ids = SkewedIds(rows["stations"], 0.9, seed + 2)
+    # Model popularity for reviews and health logs follows vehicle sales
+    model_weights = [1.0 / (i + 1) ** 0.5 for i in range(len(MODELS))]
+
+    def chunked(table, make):
+        for chunk, first_id, n in _chunks(rows[table], chunk_rows):
+            yield make(_rng(seed, table, chunk), first_id, n)
+
+    _write_csv(path["customers"], chunked("customers", customers))
+    _write_csv(path["sales"], chunked(
+        "sales", lambda rng, first, n: sales(rng, first, n, customer_ids, vehicle_ids)))
+    _write_jsonl(path["product_reviews"], chunked(
+        "product_reviews", lambda rng, first, n: product_reviews(rng, first, n, customer_ids, model_weights)))
+    _write_jsonl(path["stations"], chunked("stations", stations))
+    _write_jsonl(path["charging_sessions"], chunked(
+        "charging_sessions", lambda rng, first, n: charging_sessions(rng, first, n, station_ids)))
+    _write_jsonl(path["vehicle_health"], chunked(
+        "vehicle_health", lambda rng, first, n: vehicle_health(rng, first, n, model_weights)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic source files at a given scale.")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Row count multiplier relative to the bundled sample (default: 1)")
+    parser.add_argument("--out-dir", required=True)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = generate(args.out_dir, args.scale, args.seed, args.chunk_rows)
+    elapsed = time.perf_counter() - start
+    total_bytes = sum(os.path.getsize(os.path.join(args.out_dir, f)) for f in FILES.values())
+    for table, n in rows.items():
+        print(f"{FILES[table]:<36} {n:>12,} rows")
+    print(f"Wrote {sum(rows.values()):,} rows ({total_bytes / 1e6:.1f} MB) in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,28 @@
-import os
+"""
+JSON -> JSONL Converter
+=======================
+Converts JSON array exports into JSON Lines, one object per line.
+
+The input is parsed incrementally: it is read in fixed-size chunks and
+array elements are decoded one at a time, so memory stays at roughly
+--chunk-size-mb plus the largest single element, regardless of file size.
+Output lines are written in batches through a buffered (optionally gzip or
+zstd compressed) stream, and can be split into shards of --shard-rows rows.
+Files are converted in parallel, one per worker process.
+
+Usage:
+    python convert_json_to_jsonl.py                       # default exports
+    python convert_json_to_jsonl.py big.json --shard-rows 1000000 --compression zstd
+"""
+
+import argparse
+import glob
+import gzip
+import io
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
 
@@ -11,33 +34,297 @@ json_files = [
     'vehicle_health_data.json',
 ]
 
-def convert_to_jsonl(json_path, jsonl_path):
-    with open(json_path, 'r', encoding='utf-8') as f:
-        try:
-            data = json.load(f)
-        except Exception as e:
-            print(f"Error reading {json_path}: {e}")
-            return
-    if not isinstance(data, list):
-        print(f"Skipping {json_path}: not a list of objects.")
+COMPRESSION_SUFFIXES = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
+WRITE_BATCH_ROWS = 1000
+OUTPUT_BUFFER_BYTES = 1 << 20
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = '0123456789.eE+-'
+
+
+class NotAnArray(ValueError):
+    """Raised when the input's top-level value is not a JSON array."""
+
+
+def iter_json_array(f, chunk_size):
+    """
+    Yield the elements of the JSON array in text stream f, one at a time.
+
+    Only the unread tail of the current chunk (plus any element spanning
+    chunk boundaries) is kept in memory.
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    eof = False
+
+    def fill(size=chunk_size):
+        nonlocal buf, pos, eof
+        chunk = f.read(size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    fill()
+    skip_whitespace()
+    if pos >= len(buf) or buf[pos] != '[':
+        raise NotAnArray('top-level value is not an array')
+    pos += 1
+
+    skip_whitespace()
+    if pos < len(buf) and buf[pos] == ']':
         return
-    with open(jsonl_path, 'w', encoding='utf-8') as out:
-        for obj in data:
+
+    read_size = chunk_size
+    while True:
+        skip_whitespace()
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            obj, end = None, None
+        # Only accept a value once its delimiter is in the buffer
+        if end is not None:
+            delim = end
+            while delim < len(buf) and buf[delim] in _WHITESPACE:
+                delim += 1
+            # A number cut mid-way ("-23" of "-23.5e3") decodes short, with
+            # only number characters after it
+            cut_number = (not eof and end < len(buf) and buf[end] in _NUMBER_CHARS
+                          and not buf[end:].strip(_NUMBER_CHARS))
+            if delim < len(buf) and not cut_number:
+                if buf[delim] not in ',]':
+                    raise json.JSONDecodeError("Expected ',' or ']'", buf, delim)
+                yield obj
+                pos = delim + 1
+                read_size = chunk_size
+                if buf[delim] == ']':
+                    return
+                continue
+        if eof:
+            raise json.JSONDecodeError('Unterminated array', buf, len(buf))
+        # Element spans the chunk boundary: read more, growing the read so an
+        # oversized element is not re-decoded once per chunk
+        fill(read_size)
+        read_size *= 2
+
+
+def open_output(path, compression):
+    """Text stream for path, buffered and compressed as requested."""
+    if compression == 'gzip':
+        raw = gzip.open(path, 'wb', compresslevel=6)
+    elif compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise SystemExit("zstd compression requires the 'zstandard' package")
+        raw = zstandard.ZstdCompressor(level=3).stream_writer(open(path, 'wb'))
+    else:
+        raw = open(path, 'wb')
+    return io.TextIOWrapper(io.BufferedWriter(raw, OUTPUT_BUFFER_BYTES), encoding='utf-8')
+
+
+class ShardedWriter:
+    """
+    Writes JSONL lines, starting a new shard file every shard_rows rows.
+
+    Files are written under temporary names and renamed into place when the
+    writer exits without an error, replacing every earlier output for the
+    same base path (including shards of a larger earlier run). On error the
+    temporary files are removed and earlier outputs are left untouched.
+    """
+
+    def __init__(self, base_path, compression='none', shard_rows=0):
+        self.base_path = base_path
+        self.compression = compression
+        self.shard_rows = shard_rows
+        self.paths = []
+        self._out = None
+        self._rows_in_shard = 0
+
+    def _next_path(self):
+        suffix = COMPRESSION_SUFFIXES[self.compression]
+        if not self.shard_rows:
+            return self.base_path + suffix
+        stem, ext = os.path.splitext(self.base_path)
+        return f"{stem}.part-{len(self.paths):05d}{ext}{suffix}"
+
+    @staticmethod
+    def _temp_path(path):
+        return path + '.tmp'
+
+    def _rotate(self):
+        self.close()
+        path = self._next_path()
+        self._out = open_output(self._temp_path(path), self.compression)
+        self.paths.append(path)
+        self._rows_in_shard = 0
+
+    def write_lines(self, lines):
+        start = 0
+        while start < len(lines):
+            if self._out is None or (self.shard_rows and self._rows_in_shard >= self.shard_rows):
+                self._rotate()
+            room = (self.shard_rows - self._rows_in_shard) if self.shard_rows else len(lines)
+            batch = lines[start:start + room]
+            self._out.writelines(batch)
+            self._rows_in_shard += len(batch)
+            start += len(batch)
+
+    def close(self):
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+
+    def _previous_outputs(self):
+        """Existing outputs for base_path, sharded or not, in any compression."""
+        stem, ext = os.path.splitext(self.base_path)
+        shards = glob.glob(f"{glob.escape(stem)}.part-[0-9][0-9][0-9][0-9][0-9]{glob.escape(ext)}*")
+        unsharded = [self.base_path + suffix for suffix in COMPRESSION_SUFFIXES.values()]
+        return [p for p in shards + unsharded if os.path.exists(p) and not p.endswith('.tmp')]
+
+    def _commit(self):
+        for path in self._previous_outputs():
+            os.remove(path)
+        for path in self.paths:
+            os.replace(self._temp_path(path), path)
+
+    def _discard(self):
+        for path in self.paths:
             try:
-                out.write(json.dumps(obj, ensure_ascii=False) + '\n')
-            except Exception as e:
-                print(f"Error writing object in {json_path}: {e}")
+                os.remove(self._temp_path(path))
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.close()
+            if exc_type is not None:
+                self._discard()
+                return
+            if not self.paths:
+                # Empty array: still produce an (empty) output file
+                self._rotate()
+                self.close()
+        except BaseException:
+            self._discard()
+            raise
+        self._commit()
+
+
+def convert_to_jsonl(json_path, jsonl_path, compression='none', shard_rows=0,
+                     chunk_size=8 << 20):
+    """Stream one JSON array file to JSONL; returns conversion stats."""
+    start = time.perf_counter()
+    rows = 0
+    batch = []
+    with open(json_path, 'r', encoding='utf-8') as f, \
+            ShardedWriter(jsonl_path, compression, shard_rows) as writer:
+        for obj in iter_json_array(f, chunk_size):
+            batch.append(json.dumps(obj, ensure_ascii=False) + '\n')
+            if len(batch) >= WRITE_BATCH_ROWS:
+                writer.write_lines(batch)
+                rows += len(batch)
+                batch = []
+        writer.write_lines(batch)
+        rows += len(batch)
+    return {
+        'input': json_path,
+        'outputs': writer.paths,
+        'rows': rows,
+        'bytes': os.path.getsize(json_path),
+        'seconds': time.perf_counter() - start,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _peak_rss_mb():
+    """Peak RSS of this process in MB, or None where `resource` is missing (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _throughput(bytes_read, rows, seconds):
+    seconds = max(seconds, 1e-9)
+    return f"{bytes_read / seconds / 1e6:.1f} MB/s, {rows / seconds:,.0f} rows/s"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Convert JSON array files to JSON Lines.')
+    parser.add_argument('files', nargs='*',
+                        help='JSON files to convert (default: the standard exports in data/)')
+    parser.add_argument('--output-dir', help='Directory for the JSONL files (default: next to the input)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Files converted in parallel (default: CPU count)')
+    parser.add_argument('--shard-rows', type=int, default=0,
+                        help='Split output into files of at most this many rows (default: no sharding)')
+    parser.add_argument('--compression', choices=sorted(COMPRESSION_SUFFIXES), default='none')
+    parser.add_argument('--chunk-size-mb', type=float, default=8,
+                        help='Input read size per worker, which bounds its memory use (default: 8)')
+    return parser.parse_args()
+
 
 def main():
-    for fname in json_files:
-        json_path = os.path.join(DATA_DIR, fname)
-        jsonl_path = os.path.join(DATA_DIR, fname.replace('.json', '.jsonl'))
+    args = parse_args()
+    paths = args.files or [os.path.join(DATA_DIR, fname) for fname in json_files]
+
+    jobs = []
+    for json_path in paths:
         if not os.path.exists(json_path):
             print(f"File not found: {json_path}")
             continue
-        print(f"Converting {json_path} -> {jsonl_path}")
-        convert_to_jsonl(json_path, jsonl_path)
+        out_dir = args.output_dir or os.path.dirname(json_path)
+        name = os.path.splitext(os.path.basename(json_path))[0] + '.jsonl'
+        jobs.append((json_path, os.path.join(out_dir, name)))
+    if not jobs:
+        return
+
+    chunk_size = int(args.chunk_size_mb * (1 << 20))
+    start = time.perf_counter()
+    total_rows = total_bytes = 0
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(jobs))) as pool:
+        futures = {
+            pool.submit(convert_to_jsonl, json_path, jsonl_path,
+                        args.compression, args.shard_rows, chunk_size): json_path
+            for json_path, jsonl_path in jobs
+        }
+        for future in as_completed(futures):
+            json_path = futures[future]
+            try:
+                stats = future.result()
+            except Exception as e:
+                # Malformed input or an I/O error: report it and convert the other files
+                print(f"Skipping {json_path}: {type(e).__name__}: {e}")
+                continue
+            total_rows += stats['rows']
+            total_bytes += stats['bytes']
+            outputs = stats['outputs']
+            target = outputs[0] if len(outputs) == 1 else f"{len(outputs)} shards"
+            rss = (f", worker peak RSS {stats['peak_rss_mb']:.0f} MB"
+                   if stats['peak_rss_mb'] is not None else "")
+            print(f"Converted {json_path} -> {target}: {stats['rows']:,} rows in "
+                  f"{stats['seconds']:.2f}s ({_throughput(stats['bytes'], stats['rows'], stats['seconds'])}{rss})")
+
+    elapsed = time.perf_counter() - start
+    print(f"Total: {total_rows:,} rows, {total_bytes / 1e6:.1f} MB in {elapsed:.2f}s "
+          f"({_throughput(total_bytes, total_rows, elapsed)})")
+
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,217 @@
+"""
+Parquet Landing Files
+=====================
+Writes a typed, compressed Parquet copy of each raw source file next to it
+(ecoride_sales.csv -> ecoride_sales.parquet).
+
+Column names are kept as in the raw file, so the Parquet copies can replace
+the raw files as Airbyte sources. Column types follow the Silver models:
+dates and timestamps that Silver parses from strings (sale_date,
+start_time, ...) are parsed here, and amounts Silver casts to DOUBLE are
+written as double. Everything else keeps Arrow's inferred type.
+
+Files are read with Arrow's streaming CSV/JSON readers and written in row
+groups of --row-group-rows rows, so memory stays bounded for large exports.
+
+Usage:
+    python convert_to_parquet.py                       # all sources in data/
+    python convert_to_parquet.py ecoride_sales.csv --compression snappy
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.json as pa_json
+import pyarrow.parquet as pq
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+# Per-source typing, matching the Silver models:
+#   types:      explicit Arrow types for raw columns
+#   dates:      string columns parsed to date32 with the given format
+#   timestamps: string columns parsed to timestamp[ms] with the given format
+SOURCES = {
+    'ecoride_customers.csv': {
+        'types': {'id': pa.int64(), 'phone': pa.string()},
+    },
+    'ecoride_sales.csv': {
+        'types': {'id': pa.int64(), 'customer_id': pa.int64(), 'vehicle_id': pa.int64(),
+                  'sale_price': pa.float64()},
+        'dates': {'sale_date': '%m/%d/%Y'},
+    },
+    'ecoride_vehicles.csv': {
+        'types': {'id': pa.int64()},
+    },
+    'ecoride_product_reviews.jsonl': {
+        'types': {'CustomerID': pa.string(), 'Rating': pa.int64()},
+        'dates': {'Date': '%Y-%m-%d'},
+    },
+    'chargenet_stations.jsonl': {
+        'types': {'id': pa.int64()},
+    },
+    'chargenet_charging_sessions.jsonl': {
+        'types': {'id': pa.int64(), 'station_id': pa.int64(), 'cost': pa.float64()},
+        'timestamps': {'start_time': '%m/%d/%Y %H:%M:%S', 'end_time': '%m/%d/%Y %H:%M:%S'},
+    },
+    'vehicle_health_data.jsonl': {
+        'types': {'VehicleID': pa.string(), 'ManufacturingYear': pa.int64()},
+    },
+}
+
+DEFAULT_ROW_GROUP_ROWS = 128 * 1024
+# Large enough that schema inference on the first block sees a representative sample
+READ_BLOCK_BYTES = 16 << 20
+
+
+def _read_types(spec):
+    """Types to read raw columns as; parsed columns are read as strings."""
+    types = dict(spec.get('types', {}))
+    for column in list(spec.get('dates', {})) + list(spec.get('timestamps', {})):
+        types[column] = pa.string()
+    return types
+
+
+def open_source(path, spec):
+    """Streaming record batch reader for a CSV or JSONL file."""
+    types = _read_types(spec)
+    if path.endswith('.csv'):
+        return pa_csv.open_csv(
+            path,
+            read_options=pa_csv.ReadOptions(block_size=READ_BLOCK_BYTES),
+            convert_options=pa_csv.ConvertOptions(column_types=types),
+        )
+    return pa_json.open_json(
+        path,
+        read_options=pa_json.ReadOptions(block_size=READ_BLOCK_BYTES),
+        parse_options=pa_json.ParseOptions(
+            explicit_schema=pa.schema(types.items()),
+            unexpected_field_behavior='infer',
+        ),
+    )
+
+
+def raw_column_order(path):
+    """Column order of the raw file (JSON readers put explicitly typed fields first)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.readline()
+    if path.endswith('.csv'):
+        return next(csv.reader([first]), [])
+    return list(json.loads(first)) if first.strip() else []
+
+
+def apply_types(batch, spec, order=()):
+    """
+    Parse the date and timestamp columns of a batch and restore the raw column order.
+
+    Unparseable values become NULL, like Silver's TO_DATE/TO_TIMESTAMP(..., 1).
+    """
+    names = [c for c in order if c in batch.schema.names]
+    names += [c for c in batch.schema.names if c not in names]
+    columns = {name: batch.column(name) for name in names}
+    for column, fmt in spec.get('dates', {}).items():
+        parsed = pc.strptime(columns[column], format=fmt, unit='s', error_is_null=True)
+        columns[column] = pc.cast(parsed, pa.date32())
+    for column, fmt in spec.get('timestamps', {}).items():
+        parsed = pc.strptime(columns[column], format=fmt, unit='s', error_is_null=True)
+        columns[column] = pc.cast(parsed, pa.timestamp('ms'))
+    return pa.RecordBatch.from_arrays(list(columns.values()), names=list(columns))
+
+
+def convert_to_parquet(raw_path, parquet_path, spec, compression='zstd',
+                       row_group_rows=DEFAULT_ROW_GROUP_ROWS):
+    """Convert one raw file; returns conversion stats."""
+    start = time.perf_counter()
+    reader = open_source(raw_path, spec)
+    order = raw_column_order(raw_path)
+    writer = None
+    pending, pending_rows, rows = [], 0, 0
+
+    def flush():
+        nonlocal pending, pending_rows
+        if pending:
+            writer.write_table(pa.Table.from_batches(pending), row_group_size=row_group_rows)
+            pending, pending_rows = [], 0
+
+    try:
+        for batch in reader:
+            batch = apply_types(batch, spec, order)
+            if writer is None:
+                writer = pq.ParquetWriter(parquet_path, batch.schema, compression=compression)
+            elif batch.schema != writer.schema_arrow:
+                # Later blocks can infer e.g. null for an all-null column
+                batch = batch.cast(writer.schema_arrow)
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            rows += batch.num_rows
+            # Row groups are written whole, so buffer batches up to the row group size
+            if pending_rows >= row_group_rows:
+                flush()
+        if writer is None:
+            writer = pq.ParquetWriter(parquet_path, reader.schema, compression=compression)
+        flush()
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return {
+        'input': raw_path,
+        'output': parquet_path,
+        'rows': rows,
+        'raw_bytes': os.path.getsize(raw_path),
+        'parquet_bytes': os.path.getsize(parquet_path),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Write typed Parquet copies of the raw source files.')
+    parser.add_argument('files', nargs='*',
+                        help=f"Source file names in --data-dir (default: all of {', '.join(SOURCES)})")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--compression', default='zstd',
+                        choices=['zstd', 'snappy', 'gzip', 'lz4', 'none'])
+    parser.add_argument('--row-group-rows', type=int, default=DEFAULT_ROW_GROUP_ROWS)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    jobs = []
+    for fname in args.files or SOURCES:
+        name = os.path.basename(fname)
+        raw_path = os.path.join(args.data_dir, name)
+        if name not in SOURCES:
+            print(f"Skipping {name}: no typing spec in SOURCES")
+            continue
+        if not os.path.exists(raw_path):
+            print(f"File not found: {raw_path}")
+            continue
+        parquet_path = os.path.splitext(raw_path)[0] + '.parquet'
+        jobs.append((raw_path, parquet_path, SOURCES[name]))
+    if not jobs:
+        return
+
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(jobs))) as pool:
+        futures = {
+            pool.submit(convert_to_parquet, raw_path, parquet_path, spec,
+                        args.compression, args.row_group_rows): raw_path
+            for raw_path, parquet_path, spec in jobs
+        }
+        for future in as_completed(futures):
+            stats = future.result()
+            ratio = stats['raw_bytes'] / max(stats['parquet_bytes'], 1)
+            print(f"Converted {stats['input']} -> {stats['output']}: {stats['rows']:,} rows, "
+                  f"{stats['raw_bytes'] / 1e6:.2f} MB -> {stats['parquet_bytes'] / 1e6:.2f} MB "
+                  f"({ratio:.1f}x) in {stats['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,8 +20,14 @@ registry.register("dremio+flight", "sqlalchemy_dremio.flight", "DremioDialect_fl
 # Secret key for signing cookies (use env var in production)
 SECRET_KEY = os.environ.get('SUPERSET_SECRET_KEY', 'lakehouse-course-secret-key-2024')
 
-# SQLAlchemy database URI for Superset's metadata
-SQLALCHEMY_DATABASE_URI = 'sqlite:////app/superset_home/superset.db'
+# SQLAlchemy database URI for Superset's metadata. Defaults to the SQLite
+# file in superset_home; SUPERSET_METADATA_DB_URI (e.g. the opt-in superset-db
+# Postgres service) is needed for several web processes and worker threads,
+# as SQLite only supports one writer at a time.
+SQLALCHEMY_DATABASE_URI = (
+    os.environ.get('SUPERSET_METADATA_DB_URI')
+    or 'sqlite:////app/superset_home/superset.db'
+)
 
 # Flask-WTF flag for CSRF
 WTF_CSRF_ENABLED = True
@@ -29,18 +35,178 @@ WTF_CSRF_ENABLED = True
 # Allow all database connections (required for Dremio)
 PREVENT_UNSAFE_DB_CONNECTIONS = False
 
+# =============================================================================
+# CACHING & ASYNC SQL LAB
+# =============================================================================
+
+# Chart data, metadata and SQL Lab results are cached so repeated dashboard
+# loads do not re-run the same Dremio queries. With SUPERSET_REDIS_URL set,
+# everything (including the Celery broker) uses that Redis-compatible store;
+# otherwise caches are files under SUPERSET_CACHE_DIR and Celery uses a
+# filesystem broker, so no extra service is needed.
+#
+# Caches are refreshed after each Gold build by the superset_cache_warmup
+# Dagster asset (warm-up forces the queries to re-run), so timeouts can be long.
+
+from cachelib.file import FileSystemCache
+
+SUPERSET_REDIS_URL = os.environ.get('SUPERSET_REDIS_URL')
+SUPERSET_CACHE_DIR = os.environ.get('SUPERSET_CACHE_DIR', '/app/superset_home/cache')
+CACHE_DEFAULT_TIMEOUT = int(os.environ.get('SUPERSET_CACHE_TIMEOUT', 24 * 3600))
+DATA_CACHE_TIMEOUT = int(os.environ.get('SUPERSET_DATA_CACHE_TIMEOUT', 24 * 3600))
+
+
+def _cache_config(prefix, timeout):
+    """Flask-Caching config for one cache region."""
+    if SUPERSET_REDIS_URL:
+        return {
+            'CACHE_TYPE': 'RedisCache',
+            'CACHE_REDIS_URL': SUPERSET_REDIS_URL,
+            'CACHE_KEY_PREFIX': f'{prefix}_',
+            'CACHE_DEFAULT_TIMEOUT': timeout,
+        }
+    return {
+        'CACHE_TYPE': 'FileSystemCache',
+        'CACHE_DIR': os.path.join(SUPERSET_CACHE_DIR, prefix),
+        'CACHE_DEFAULT_TIMEOUT': timeout,
+        'CACHE_THRESHOLD': 10000,
+    }
+
+
+# Dashboards, datasets and other metadata
+CACHE_CONFIG = _cache_config('superset_metadata', CACHE_DEFAULT_TIMEOUT)
+# Chart query results
+DATA_CACHE_CONFIG = _cache_config('superset_data', DATA_CACHE_TIMEOUT)
+FILTER_STATE_CACHE_CONFIG = _cache_config('superset_filter_state', CACHE_DEFAULT_TIMEOUT)
+EXPLORE_FORM_DATA_CACHE_CONFIG = _cache_config('superset_explore_form_data', CACHE_DEFAULT_TIMEOUT)
+
+# Results of async SQL Lab queries, written by the Celery worker and read by
+# the web server
+if SUPERSET_REDIS_URL:
+    from cachelib.redis import RedisCache
+    from redis import Redis
+
+    RESULTS_BACKEND = RedisCache(
+        host=Redis.from_url(SUPERSET_REDIS_URL), key_prefix='superset_results_'
+    )
+else:
+    RESULTS_BACKEND = FileSystemCache(
+        os.path.join(SUPERSET_CACHE_DIR, 'sqllab_results'), default_timeout=CACHE_DEFAULT_TIMEOUT
+    )
+
+_BROKER_DIR = os.path.join(SUPERSET_CACHE_DIR, 'celery_broker')
+
+
+class CeleryConfig:
+    """Celery worker for async SQL Lab queries and cache warm-up tasks."""
+
+    broker_url = SUPERSET_REDIS_URL or 'filesystem://'
+    broker_transport_options = {} if SUPERSET_REDIS_URL else {
+        'data_folder_in': _BROKER_DIR,
+        'data_folder_out': _BROKER_DIR,
+        'processed_folder': os.path.join(_BROKER_DIR, 'processed'),
+        'store_processed': False,
+    }
+    # The filesystem broker cannot broadcast remote control commands
+    worker_enable_remote_control = bool(SUPERSET_REDIS_URL)
+    imports = ('superset.sql_lab', 'superset.tasks.cache')
+    worker_prefetch_multiplier = 1
+    task_acks_late = True
+
+
+CELERY_CONFIG = CeleryConfig
+
+if not SUPERSET_REDIS_URL:
+    for _folder in (_BROKER_DIR, CeleryConfig.broker_transport_options['processed_folder']):
+        os.makedirs(_folder, exist_ok=True)
+
+# Long SQL Lab queries run on the worker instead of blocking a web worker
+# (enable "Asynchronous query execution" on the Dremio database)
+SQLLAB_ASYNC_TIME_LIMIT_SEC = int(os.environ.get('SQLLAB_ASYNC_TIME_LIMIT_SEC', 6 * 3600))
+
 # =============================================================================
 # DREMIO ENGINE SPECIFICATION
 # =============================================================================
 
-from superset.db_engine_specs.base import BaseEngineSpec
+# Results are read from Dremio's Arrow Flight stream batch by batch instead of
+# through sqlalchemy-dremio's cursor, which converts the whole result to
+# pandas and then to a row list before Superset sees the first row.
+#   DREMIO_FETCH_ROWS:           rows converted to Python per step
+#   DREMIO_CANCEL_POLL_SECONDS:  how often a running fetch checks whether
+#                                the SQL Lab query was stopped
+
+import io
+import json
+import re
+import time
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from flask import Blueprint, Response, abort, stream_with_context
+from pyarrow import flight
+from sqlalchemy import types
+from superset.db_engine_specs.base import LimitMethod
+from superset.db_engine_specs.dremio import DremioEngineSpec as BuiltinDremioEngineSpec
+from superset.utils.core import GenericDataType
+
+DREMIO_FETCH_ROWS = int(os.environ.get('DREMIO_FETCH_ROWS', 10000))
+DREMIO_CANCEL_POLL_SECONDS = float(os.environ.get('DREMIO_CANCEL_POLL_SECONDS', 1))
+
+# Cap on rows SQL Lab fetches; pushed down to Dremio as LIMIT
+SQL_MAX_ROW = int(os.environ.get('SQL_MAX_ROW', 100000))
+DISPLAY_MAX_ROW = int(os.environ.get('DISPLAY_MAX_ROW', 10000))
+
+
+def _dremio_type(arrow_type):
+    """Dremio SQL type name of an Arrow result column."""
+    if pa.types.is_boolean(arrow_type):
+        return 'BOOLEAN'
+    if pa.types.is_int64(arrow_type) or pa.types.is_uint64(arrow_type) or pa.types.is_uint32(arrow_type):
+        return 'BIGINT'
+    if pa.types.is_integer(arrow_type):
+        return 'INTEGER'
+    if pa.types.is_float32(arrow_type) or pa.types.is_float16(arrow_type):
+        return 'FLOAT'
+    if pa.types.is_floating(arrow_type):
+        return 'DOUBLE'
+    if pa.types.is_decimal(arrow_type):
+        return f'DECIMAL({arrow_type.precision},{arrow_type.scale})'
+    if pa.types.is_date(arrow_type):
+        return 'DATE'
+    if pa.types.is_timestamp(arrow_type):
+        return 'TIMESTAMP'
+    if pa.types.is_time(arrow_type):
+        return 'TIME'
+    if pa.types.is_interval(arrow_type) or pa.types.is_duration(arrow_type):
+        return 'INTERVAL'
+    if pa.types.is_binary(arrow_type) or pa.types.is_large_binary(arrow_type):
+        return 'VARBINARY'
+    if pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type):
+        return 'LIST'
+    if pa.types.is_struct(arrow_type):
+        return 'STRUCT'
+    if pa.types.is_map(arrow_type):
+        return 'MAP'
+    return 'VARCHAR'
+
+
+def _query_stopped(query_id):
+    """True if the SQL Lab query was stopped by the user."""
+    from superset import db
+    from superset.common.db_query_status import QueryStatus
+    from superset.models.sql_lab import Query
+
+    status = db.session.query(Query.status).filter(Query.id == query_id).scalar()
+    return status == QueryStatus.STOPPED
 
-class DremioEngineSpec(BaseEngineSpec):
+
+class DremioEngineSpec(BuiltinDremioEngineSpec):
     """Engine spec for Dremio via Arrow Flight protocol."""
 
     engine = "dremio"
     engine_name = "Dremio"
     default_driver = "flight"
+    drivers = {"flight": "Arrow Flight"}
 
     # Connection string template shown in UI
     # IMPORTANT: Use port 32010 (Flight) and UseEncryption=false for local setup
@@ -51,6 +217,11 @@ class DremioEngineSpec(BaseEngineSpec):
     # Silence the statement cache warning
     supports_statement_cache = False
 
+    # Row caps (SQL Lab limit, SQL_MAX_ROW, chart row limits) are added to or
+    # lowered in the query's own LIMIT clause, so Dremio stops early
+    limit_method = LimitMethod.FORCE_LIMIT
+    allow_limit_clause = True
+
     # Time grain expressions for Dremio SQL
     _time_grain_expressions = {
         None: "{col}",
@@ -64,6 +235,198 @@ class DremioEngineSpec(BaseEngineSpec):
         "P1Y": "DATE_TRUNC('year', {col})",
     }
 
+    # Dremio types not covered by Superset's default mappings; result columns
+    # are typed from the Arrow schema (see _dremio_type), not from Python values
+    column_type_mappings = (
+        (re.compile(r"^varbinary", re.IGNORECASE), types.LargeBinary(), GenericDataType.STRING),
+        (re.compile(r"^interval", re.IGNORECASE), types.Interval(), GenericDataType.STRING),
+        (re.compile(r"^(list|struct|map)", re.IGNORECASE), types.String(), GenericDataType.STRING),
+    )
+
+    @classmethod
+    def execute(cls, cursor, query, *args, **kwargs):
+        """Start the query and keep its Flight stream open for fetch_data."""
+        if not hasattr(cursor, 'flightclient'):
+            return super().execute(cursor, query, *args, **kwargs)
+        info = cursor.flightclient.get_flight_info(
+            flight.FlightDescriptor.for_command(query), cursor.options
+        )
+        reader = cursor.flightclient.do_get(info.endpoints[0].ticket, cursor.options)
+        cursor._arrow_reader = reader
+        # The DB-API cursor methods stay usable (with no rows)
+        cursor._results = []
+        cursor.description = [
+            (field.name, _dremio_type(field.type), None, None, None, None, field.nullable)
+            for field in reader.schema
+        ]
+
+    @classmethod
+    def execute_with_cursor(cls, cursor, sql, query):
+        # Lets fetch_data notice when the user stops the query
+        cursor._superset_query_id = query.id
+        super().execute_with_cursor(cursor, sql, query)
+
+    @classmethod
+    def has_implicit_cancel(cls):
+        # Stopping a query only marks it STOPPED; the fetch polls for that and
+        # cancels the Flight stream, which cancels the Dremio job
+        return True
+
+    @classmethod
+    def iter_batches(cls, cursor, limit=None):
+        """
+        Result record batches of at most DREMIO_FETCH_ROWS rows.
+
+        Reads the Flight stream incrementally and cancels it once `limit`
+        rows were read or the SQL Lab query was stopped.
+        """
+        reader = cursor._arrow_reader
+        query_id = getattr(cursor, '_superset_query_id', None)
+        next_poll = time.monotonic() + DREMIO_CANCEL_POLL_SECONDS
+        remaining = limit or None
+        try:
+            while remaining is None or remaining > 0:
+                try:
+                    batch = reader.read_chunk().data
+                except StopIteration:
+                    return
+                for offset in range(0, batch.num_rows, DREMIO_FETCH_ROWS):
+                    chunk = batch.slice(offset, DREMIO_FETCH_ROWS)
+                    if remaining is not None:
+                        chunk = chunk.slice(0, remaining)
+                        remaining -= chunk.num_rows
+                    yield chunk
+                    if remaining == 0:
+                        break
+                if query_id is not None and time.monotonic() >= next_poll:
+                    next_poll = time.monotonic() + DREMIO_CANCEL_POLL_SECONDS
+                    if _query_stopped(query_id):
+                        # Superset reports the failure as a stopped query
+                        raise RuntimeError(f"Query {query_id} was stopped")
+            reader.cancel()
+        except BaseException:
+            reader.cancel()
+            raise
+        finally:
+            cursor._arrow_reader = None
+
+    @classmethod
+    def fetch_data(cls, cursor, limit=None):
+        if getattr(cursor, '_arrow_reader', None) is None:
+            return super().fetch_data(cursor, limit)
+        rows = []
+        for batch in cls.iter_batches(cursor, limit):
+            rows.extend(zip(*(column.to_pylist() for column in batch.columns)))
+        return rows
+
+
+# Superset only looks up engine specs in its superset.db_engine_specs
+# modules, so this spec replaces the built-in Dremio one there
+import superset.db_engine_specs.dremio as _builtin_dremio_specs
+
+_builtin_dremio_specs.DremioEngineSpec = DremioEngineSpec
+
+# =============================================================================
+# STREAMING CSV EXPORT
+# =============================================================================
+
+# Superset's own CSV export re-runs the query into one pandas DataFrame in the
+# web worker. This endpoint streams a SQL Lab query's result from Flight to
+# the browser batch by batch instead:
+#   /dremio/sqllab/export/<client_id>.csv
+# (client_id is the id of the SQL Lab query, shown in the Query history)
+#
+# The query is re-run from its SQL Lab text, rendered, row-level secured and
+# mutated the way SQL Lab runs it, but without the SQL Lab row limit (which
+# executed_sql already contains). Only single read-only statements on a
+# dremio+flight connection can be exported.
+
+dremio_export_blueprint = Blueprint('dremio_export', __name__)
+
+
+def _export_sql(query):
+    """The SQL SQL Lab runs for query, without its row limit, or None if it cannot be exported."""
+    from flask import current_app
+    from superset import is_feature_enabled, security_manager
+    from superset.jinja_context import get_template_processor
+    from superset.sql_parse import ParsedQuery, insert_rls_as_subquery, insert_rls_in_predicate
+
+    database = query.database
+    engine_spec = database.db_engine_spec
+    sql = query.select_sql or query.sql
+    processor = get_template_processor(database=database, query=query)
+    rendered = processor.process_template(
+        ParsedQuery(sql, strip_comments=True).stripped(), **json.loads(query.template_params or '{}')
+    )
+    statements = ParsedQuery(rendered, strip_comments=True).get_statements()
+    if len(statements) != 1:
+        return None
+    parsed_query = ParsedQuery(statements[0])
+    if is_feature_enabled('RLS_IN_SQLLAB'):
+        insert_rls = (
+            insert_rls_as_subquery
+            if engine_spec.allows_subqueries and engine_spec.allows_alias_in_select
+            else insert_rls_in_predicate
+        )
+        parsed_query = ParsedQuery(
+            str(insert_rls(parsed_query._parsed[0], database.id, query.schema))
+        )
+    if not engine_spec.is_readonly_query(parsed_query):
+        return None
+    return current_app.config['SQL_QUERY_MUTATOR'](
+        parsed_query.stripped(), security_manager=security_manager, database=database
+    )
+
+
+@dremio_export_blueprint.route('/dremio/sqllab/export/<client_id>.csv')
+def export_sqllab_csv(client_id):
+    from flask_login import current_user
+    from superset import db, security_manager
+    from superset.exceptions import SupersetSecurityException
+    from superset.models.sql_lab import Query
+
+    if not current_user.is_authenticated:
+        abort(401)
+    query = db.session.query(Query).filter_by(client_id=client_id).one_or_none()
+    if query is None:
+        abort(404)
+    try:
+        security_manager.raise_for_access(query=query)
+    except SupersetSecurityException:
+        abort(403)
+    # Only Flight cursors have the Arrow stream read below
+    if (not issubclass(query.database.db_engine_spec, DremioEngineSpec)
+            or query.database.url_object.get_driver_name() != 'flight'):
+        abort(400)
+    sql = _export_sql(query)
+    if sql is None:
+        abort(400)
+
+    database, schema = query.database, query.schema
+
+    def generate():
+        with database.get_raw_connection(schema=schema) as conn:
+            cursor = conn.cursor()
+            DremioEngineSpec.execute(cursor, sql)
+            sink = io.BytesIO()
+            writer = pa_csv.CSVWriter(sink, cursor._arrow_reader.schema)
+            for batch in DremioEngineSpec.iter_batches(cursor):
+                writer.write_batch(batch)
+                yield sink.getvalue()
+                sink.seek(0)
+                sink.truncate()
+            writer.close()
+            yield sink.getvalue()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename=query_{client_id}.csv'},
+    )
+
+
+BLUEPRINTS = [dremio_export_blueprint]
+
 # =============================================================================
 # STARTUP MESSAGE
 # =============================================================================
@@ -1,119 +1,320 @@
 """
 Data Lakehouse Pipeline Assets
 ==============================
-Silver → Gold transformation pipeline using Dagster + dbt + Soda.
+Bronze → Silver → Gold pipeline using Dagster + dbt + Soda.
 
 Architecture:
-- Bronze: Airbyte syncs source data (run manually via Airbyte UI)
+- Bronze: Airbyte syncs source data (run manually via Airbyte UI), or the
+  native ingestion assets below load data/ into the same Iceberg tables
 - Silver: dbt transformations (clean/standardize Bronze data)
 - Gold: dbt transformations (business aggregations)
 - Quality: Soda data quality checks after each layer
+- Rollups: pre-aggregated Gold tables for Superset dashboards
+- Dashboards: Superset chart cache warm-up after Gold builds
 """
 
-import subprocess
-from dagster import asset, AssetExecutionContext, Output, MetadataValue
+import os
+import time
+from typing import Optional
+
+import requests
+from dagster import asset, AssetExecutionContext, AutomationCondition, Config, Output, MetadataValue
 from dagster_dbt import DbtCliResource, dbt_assets
 
+from .bronze import BRONZE_NAMESPACE, BRONZE_SOURCES, bronze_catalog, load_source
+from .change_detection import ChangePlan
+from .incremental_quality import run_incremental_checks
+from .fused_checks import run_table_scan_compare, run_table_scan_fused
+from .quality import (
+    SODA_DIR,
+    check_result_events,
+    results_markdown,
+    run_soda_checks,
+    run_table_scan,
+    run_table_scan_profiled,
+    soda_check_specs,
+)
+from .rollups import build_rollups, load_rollups, rollups_markdown
+from .dashboards import SUPERSET_URL, SupersetClient, gold_model_tables, warm_up_tables
 from .constants import (
     dbt_silver_manifest_path,
     dbt_gold_manifest_path,
 )
 
 
+def _latest_metadata(context: AssetExecutionContext, key: str):
+    """A metadata value of the asset's latest materialization, or None."""
+    event = context.instance.get_latest_materialization_event(context.asset_key)
+    if event is None or event.asset_materialization is None:
+        return None
+    value = event.asset_materialization.metadata.get(key)
+    return value.value if value is not None else None
+
+
+# =============================================================================
+# BRONZE LAYER - Native Ingestion
+# =============================================================================
+
+# One asset per source file, so files load in parallel. The asset keys
+# (bronze/<table>) are the keys dagster-dbt gives the Silver dbt sources,
+# which makes these assets upstream of the Silver models.
+
+class BronzeLoadConfig(Config):
+    """Run config for Bronze ingestion assets."""
+
+    # Reload whole files instead of appending the rows added since the last load
+    full_reload: bool = False
+
+
+def _bronze_source_asset(table_name: str):
+    @asset(
+        name=table_name,
+        key_prefix=[BRONZE_NAMESPACE],
+        group_name="bronze",
+        description=f"Bronze Iceberg table loaded from data/{BRONZE_SOURCES[table_name]}",
+    )
+    def _bronze_asset(context: AssetExecutionContext, config: BronzeLoadConfig):
+        """
+        Bronze Layer: Load a raw file into its Iceberg table.
+
+        Only rows appended to the file since the last load are written, unless
+        the file was rewritten or full_reload is set.
+        """
+        state, stats = load_source(
+            bronze_catalog(), table_name, _latest_metadata(context, "file_state"),
+            config.full_reload, context.log,
+        )
+        return Output(
+            value=stats,
+            metadata={
+                "load_mode": MetadataValue.text(stats["mode"]),
+                "rows_loaded": MetadataValue.int(stats["rows"]),
+                "bytes_read": MetadataValue.int(stats["bytes"]),
+                "file_state": MetadataValue.json(state),
+            },
+        )
+
+    return _bronze_asset
+
+
+bronze_assets = [_bronze_source_asset(table_name) for table_name in BRONZE_SOURCES]
+
+
 # =============================================================================
 # SILVER LAYER - dbt Transformations
 # =============================================================================
 
-@dbt_assets(
-    manifest=dbt_silver_manifest_path,
-    select="fqn:*",
-    name="silver_dbt_assets",
-)
-def silver_dbt_assets(context: AssetExecutionContext, dbt_silver: DbtCliResource):
+# Models are split per domain (one Dagster step each) so independent
+# branches run concurrently, and a Gold domain starts as soon as the Silver
+# models it reads are done. Gold sources map to Silver model asset keys
+# through the dagster meta in transformation/gold/models/sources.yml.
+DBT_DOMAINS = ["ecoride", "chargenet", "vehicle_health"]
+
+
+class DbtBuildConfig(Config):
+    """Run config for dbt build assets."""
+
+    # Rebuild incremental models from scratch instead of merging new rows
+    full_refresh: bool = False
+    # Override the dbt thread count from profiles.yml (DBT_THREADS)
+    threads: Optional[int] = None
+    # Skip models whose input snapshots and SQL are unchanged since their last run
+    skip_unchanged: bool = True
+
+
+def _dbt_build_args(config: DbtBuildConfig) -> list:
+    args = ["build"]
+    if config.full_refresh:
+        args.append("--full-refresh")
+    if config.threads:
+        args.extend(["--threads", str(config.threads)])
+    return args
+
+
+def _run_dbt_build(context: AssetExecutionContext, dbt: DbtCliResource,
+                   manifest_path, config: DbtBuildConfig):
     """
-    Silver Layer: Clean and standardize data using dbt.
+    Run dbt build for the step's models, skipping those whose inputs are unchanged.
 
-    Transforms raw Bronze Iceberg tables into clean, typed, deduplicated tables.
+    Returns True if dbt ran, False if every model was up to date.
     """
-    yield from dbt_silver.cli(["build"], context=context).stream()
+    plan = ChangePlan(manifest_path, context)
+    args = _dbt_build_args(config)
+
+    if config.skip_unchanged and not config.full_refresh:
+        yield from plan.skip_events()
+        if not plan.changed:
+            context.log.info("All models up to date, skipping dbt build")
+            return False
+        args.extend(plan.exclude_args())
+
+    yield from plan.annotate(dbt.cli(args, context=context).stream())
+    return True
+
+
+def _silver_domain_assets(domain: str):
+    @dbt_assets(
+        manifest=dbt_silver_manifest_path,
+        select=f"path:models/{domain}",
+        name=f"silver_{domain}_dbt_assets",
+    )
+    def _silver_assets(context: AssetExecutionContext, dbt_silver: DbtCliResource,
+                       config: DbtBuildConfig):
+        """
+        Silver Layer: Clean and standardize data using dbt.
+
+        Transforms raw Bronze Iceberg tables into clean, typed, deduplicated tables.
+        Append-heavy models (sales, charging_sessions, vehicle_health_logs) are
+        incremental; set full_refresh in the run config to rebuild them.
+        """
+        yield from _run_dbt_build(context, dbt_silver, dbt_silver_manifest_path, config)
+
+    return _silver_assets
+
+
+silver_dbt_assets = [_silver_domain_assets(domain) for domain in DBT_DOMAINS]
 
 
 # =============================================================================
 # GOLD LAYER - dbt Aggregations
 # =============================================================================
 
-@dbt_assets(
-    manifest=dbt_gold_manifest_path,
-    select="fqn:*",
-    name="gold_dbt_assets",
-)
-def gold_dbt_assets(context: AssetExecutionContext, dbt_gold: DbtCliResource):
+def _gold_domain_assets(domain: str):
+    @dbt_assets(
+        manifest=dbt_gold_manifest_path,
+        select=f"path:models/{domain}",
+        name=f"gold_{domain}_dbt_assets",
+    )
+    def _gold_assets(context: AssetExecutionContext, dbt_gold: DbtCliResource,
+                     config: DbtBuildConfig):
+        """
+        Gold Layer: Business-ready aggregations using dbt.
+
+        Creates analytics-ready tables like customer lifetime value,
+        vehicle utilization metrics, and charging station performance.
+        customer_lifetime_value and charging_station_utilization are incremental;
+        set full_refresh in the run config to recompute them from all of Silver.
+        """
+        built = yield from _run_dbt_build(context, dbt_gold, dbt_gold_manifest_path, config)
+        if built:
+            _notify_agent_schema_change(context)
+
+    return _gold_assets
+
+
+gold_dbt_assets = [_gold_domain_assets(domain) for domain in DBT_DOMAINS]
+
+
+def _notify_agent_schema_change(context):
     """
-    Gold Layer: Business-ready aggregations using dbt.
+    Tell the SQL agent to drop its cached Gold schema.
 
-    Creates analytics-ready tables like customer lifetime value,
-    vehicle utilization metrics, and charging station performance.
+    Best effort: the agent may not be running, which must not fail the build.
     """
-    yield from dbt_gold.cli(["build"], context=context).stream()
+    url = os.getenv("AGENT_SCHEMA_INVALIDATE_URL")
+    if not url:
+        return
+    try:
+        token = os.getenv("AGENT_SCHEMA_INVALIDATE_TOKEN", "")
+        requests.post(url, headers={"X-Invalidate-Token": token}, timeout=5).raise_for_status()
+        context.log.info("SQL agent schema cache invalidated")
+    except requests.RequestException as e:
+        context.log.warning(f"Could not invalidate SQL agent schema cache: {e}")
 
 
 # =============================================================================
 # SODA DATA QUALITY CHECKS
 # =============================================================================
 
-def _run_soda_scan(context, config_file: str, checks_file: str, layer_name: str) -> dict:
+# How checks are evaluated: "fused" (one aggregate query per table, Soda as
+# fallback for checks it cannot compile), "soda" (Soda Core scans),
+# "compare" (both, failing on any difference; Soda results are used) or
+# "profile" (one Soda scan per check, to time every check on its own)
+QUALITY_ENGINES = {
+    "fused": run_table_scan_fused,
+    "soda": run_table_scan,
+    "compare": run_table_scan_compare,
+    "profile": run_table_scan_profiled,
+}
+QUALITY_ENGINE = os.getenv("QUALITY_ENGINE", "fused")
+
+SODA_SILVER_CONFIG = SODA_DIR / "configuration_silver.yml"
+SODA_SILVER_CHECKS = SODA_DIR / "checks" / "silver_checks.yml"
+SODA_GOLD_CONFIG = SODA_DIR / "configuration_gold.yml"
+SODA_GOLD_CHECKS = SODA_DIR / "checks" / "gold_checks.yml"
+
+
+class QualityConfig(Config):
+    """Run config for the quality assets."""
+
+    # "auto": checks of incremental tables scoped to rows (and keys) loaded
+    # since the last run, with a full sweep every full_sweep_hours; "full":
+    # always check whole tables
+    scope: str = "auto"
+    full_sweep_hours: float = 24
+
+
+def _soda_quality(context, config_file, checks_file, layer_name: str, asset: str,
+                  config: QualityConfig):
     """
-    Helper function to run Soda scans and parse results.
+    Run a layer's Soda checks and yield the output plus one asset check result per check.
 
-    Returns dict with check results and metadata.
+    With the fused engine and scope "auto", checks of incremental tables are
+    scoped to rows loaded since the last run (see incremental_quality.py).
+    Raises if any check failed or errored, like a non-zero `soda scan` exit code.
     """
-    context.log.info(f"Running Soda {layer_name} quality checks...")
-
-    result = subprocess.run(
-        [
-            "soda", "scan",
-            "-d", "lakehouse",
-            "-c", config_file,
-            checks_file
-        ],
-        capture_output=True,
-        text=True
-    )
+    metadata = {}
+    if QUALITY_ENGINE == "fused" and config.scope != "full":
+        state = _latest_metadata(context, "quality_state")
+        last_sweep = _latest_metadata(context, "full_sweep_at")
+        sweep_due = last_sweep is None or time.time() - last_sweep > config.full_sweep_hours * 3600
+        results, state, scopes = run_incremental_checks(
+            context, config_file, checks_file, layer_name, None if sweep_due else state
+        )
+        metadata = {
+            "quality_state": MetadataValue.json(state),
+            "full_sweep_at": MetadataValue.float(time.time() if sweep_due else last_sweep),
+            "scopes": MetadataValue.json(scopes),
+        }
+    else:
+        results = run_soda_checks(
+            context, config_file, checks_file, layer_name,
+            scan_fn=QUALITY_ENGINES[QUALITY_ENGINE],
+        )
 
-    # Log the full output
-    context.log.info(f"Soda output:\n{result.stdout}")
-    if result.stderr:
-        context.log.warning(f"Soda stderr:\n{result.stderr}")
-
-    # Parse results from output
-    passed = failed = warnings = errors = 0
-    for line in result.stdout.split('\n'):
-        if 'checks PASSED' in line:
-            # Extract number like "23/23 checks PASSED"
-            parts = line.split('/')
-            if len(parts) >= 2:
-                passed = int(parts[0].split()[-1])
-        elif 'FAILED' in line and 'checks' in line.lower():
-            parts = line.split()
-            for i, p in enumerate(parts):
-                if p.isdigit():
-                    failed = int(p)
-                    break
-
-    return {
-        "passed": passed,
-        "failed": failed,
-        "return_code": result.returncode,
-        "output": result.stdout,
-    }
+    passed = sum(r.passed for r in results)
+    failed = len(results) - passed
+    if failed:
+        yield from check_result_events(results, asset)
+        failures = "\n".join(
+            f"- {r.table}: {r.name} ({r.outcome or 'error'}, value={r.value})"
+            for r in results if not r.passed
+        )
+        raise Exception(
+            f"Soda {layer_name} quality checks failed!\n"
+            f"Passed: {passed}, Failed: {failed}\n"
+            f"{failures}"
+        )
+
+    yield Output(
+        value={"passed": passed, "failed": failed},
+        metadata={
+            "checks_passed": MetadataValue.int(passed),
+            "checks_failed": MetadataValue.int(failed),
+            "soda_results": MetadataValue.md(results_markdown(results)),
+            **metadata,
+        }
+    )
+    yield from check_result_events(results, asset)
 
 
 @asset(
-    deps=[silver_dbt_assets],
+    deps=silver_dbt_assets,
     group_name="quality",
     description="Soda data quality checks for Silver layer",
+    check_specs=soda_check_specs(SODA_SILVER_CHECKS, "soda_silver_quality"),
 )
-def soda_silver_quality(context: AssetExecutionContext):
+def soda_silver_quality(context: AssetExecutionContext, config: QualityConfig):
     """
     Run Soda data quality checks on Silver layer tables.
 
@@ -124,36 +325,18 @@ def soda_silver_quality(context: AssetExecutionContext):
     - Valid email formats
     - No negative values where inappropriate
     """
-    results = _run_soda_scan(
-        context,
-        config_file="/app/soda/configuration_silver.yml",
-        checks_file="/app/soda/checks/silver_checks.yml",
-        layer_name="Silver"
-    )
-
-    if results["return_code"] != 0:
-        raise Exception(
-            f"Soda Silver quality checks failed!\n"
-            f"Passed: {results['passed']}, Failed: {results['failed']}\n"
-            f"Output:\n{results['output']}"
-        )
-
-    return Output(
-        value=results,
-        metadata={
-            "checks_passed": MetadataValue.int(results["passed"]),
-            "checks_failed": MetadataValue.int(results["failed"]),
-            "soda_output": MetadataValue.md(f"```\n{results['output']}\n```"),
-        }
+    yield from _soda_quality(
+        context, SODA_SILVER_CONFIG, SODA_SILVER_CHECKS, "Silver", "soda_silver_quality", config
     )
 
 
 @asset(
-    deps=[gold_dbt_assets],
+    deps=gold_dbt_assets,
     group_name="quality",
     description="Soda data quality checks for Gold layer",
+    check_specs=soda_check_specs(SODA_GOLD_CHECKS, "soda_gold_quality"),
 )
-def soda_gold_quality(context: AssetExecutionContext):
+def soda_gold_quality(context: AssetExecutionContext, config: QualityConfig):
     """
     Run Soda data quality checks on Gold layer tables.
 
@@ -163,25 +346,83 @@ def soda_gold_quality(context: AssetExecutionContext):
     - Business metrics are within expected ranges
     - Valid categorical values
     """
-    results = _run_soda_scan(
-        context,
-        config_file="/app/soda/configuration_gold.yml",
-        checks_file="/app/soda/checks/gold_checks.yml",
-        layer_name="Gold"
+    yield from _soda_quality(
+        context, SODA_GOLD_CONFIG, SODA_GOLD_CHECKS, "Gold", "soda_gold_quality", config
     )
 
-    if results["return_code"] != 0:
-        raise Exception(
-            f"Soda Gold quality checks failed!\n"
-            f"Passed: {results['passed']}, Failed: {results['failed']}\n"
-            f"Output:\n{results['output']}"
-        )
 
+# =============================================================================
+# GOLD ROLLUPS - Pre-aggregated Tables for Dashboards
+# =============================================================================
+
+class RollupConfig(Config):
+    """Run config for the rollup asset."""
+
+    # Rebuild every rollup table, even if its source and definition are unchanged
+    force: bool = False
+
+
+@asset(
+    deps=gold_dbt_assets,
+    group_name="rollups",
+    description="Pre-aggregated Gold tables for Superset, from transformation/gold/rollups.yml",
+    # Also refreshed automatically whenever a Gold asset materializes
+    automation_condition=AutomationCondition.eager(),
+)
+def gold_rollups(context: AssetExecutionContext, config: RollupConfig):
+    """
+    Build the dashboard rollup tables (catalog.gold.rollup_<name>_<grain>).
+
+    Each rollup groups a Gold table by its dimensions and by the time column
+    truncated to each Superset time grain. Rollups whose source snapshot and
+    definition are unchanged since the last run are skipped.
+    """
+    versions, stats = build_rollups(
+        _latest_metadata(context, "rollup_versions"), config.force, context.log
+    )
+    built = [s for s in stats if s["action"] == "built"]
     return Output(
-        value=results,
+        value=stats,
         metadata={
-            "checks_passed": MetadataValue.int(results["passed"]),
-            "checks_failed": MetadataValue.int(results["failed"]),
-            "soda_output": MetadataValue.md(f"```\n{results['output']}\n```"),
-        }
+            "rollups_built": MetadataValue.int(len(built)),
+            "rollups_skipped": MetadataValue.int(len(stats) - len(built)),
+            "rollups": MetadataValue.md(rollups_markdown(stats)),
+            "rollup_versions": MetadataValue.json(versions),
+        },
+    )
+
+
+# =============================================================================
+# SUPERSET - Dashboard Cache Warm-up
+# =============================================================================
+
+@asset(
+    deps=[*gold_dbt_assets, gold_rollups],
+    group_name="dashboards",
+    description="Refresh Superset's cached chart data for Gold and rollup datasets",
+    automation_condition=AutomationCondition.eager(),
+)
+def superset_cache_warmup(context: AssetExecutionContext):
+    """
+    Re-run the charts on Gold and rollup tables so dashboards load from cache.
+
+    Best effort: Superset may not be running or configured, which must not
+    fail the pipeline.
+    """
+    tables = gold_model_tables(dbt_gold_manifest_path) + [r.table for r in load_rollups()]
+    stats = []
+    if not SUPERSET_URL:
+        context.log.info("SUPERSET_URL not set, skipping cache warm-up")
+    else:
+        try:
+            stats = warm_up_tables(SupersetClient(), tables, context.log)
+        except requests.RequestException as e:
+            context.log.warning(f"Could not log in to Superset: {e}")
+    return Output(
+        value=stats,
+        metadata={
+            "datasets_warmed": MetadataValue.int(len(stats)),
+            "charts_warmed": MetadataValue.int(sum(s["charts"] for s in stats)),
+            "chart_errors": MetadataValue.int(sum(s["errors"] for s in stats)),
+        },
     )
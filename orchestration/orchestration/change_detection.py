@@ -0,0 +1,183 @@
+"""
+Change-aware dbt runs
+=====================
+Skips dbt models whose inputs have not changed since their last successful
+materialization.
+
+A model's input version is the Iceberg snapshot id (read from Nessie) of
+every source table it reads, plus hashes of its own SQL, its resolved
+config (dbt_project.yml settings such as partition_by), the macros it calls
+(transitively) and, when it uses var(), the project vars. The version
+is stored as materialization metadata and as the asset's Dagster data
+version; on the next run, models with an identical input version (and no
+rebuilt upstream model) are excluded from `dbt build` and recorded with an
+AssetObservation explaining the skip.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Set
+
+import requests
+import yaml
+from dagster import (
+    AssetExecutionContext,
+    AssetKey,
+    AssetObservation,
+    DataVersion,
+    MetadataValue,
+    Output,
+)
+from dagster_dbt import DagsterDbtTranslator
+
+NESSIE_URL = os.getenv("NESSIE_URL", "http://nessie:19120")
+NESSIE_BRANCH = os.getenv("NESSIE_BRANCH", "main")
+
+INPUT_VERSIONS_KEY = "input_versions"
+
+
+def _hash(value) -> str:
+    payload = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def nessie_table_version(schema: str, table: str) -> Optional[str]:
+    """Current Iceberg snapshot id of schema.table on the Nessie branch."""
+    url = f"{NESSIE_URL.rstrip('/')}/api/v2/trees/{NESSIE_BRANCH}/contents/{schema}.{table}"
+    try:
+        response = requests.get(url, timeout=5)
+        response.raise_for_status()
+    except requests.RequestException:
+        return None
+    content = response.json().get("content", {})
+    snapshot = content.get("snapshotId")
+    return str(snapshot) if snapshot is not None else content.get("metadataLocation")
+
+
+class ChangePlan:
+    """Which models of one dbt_assets step to build, and why the rest are skipped."""
+
+    def __init__(self, manifest_path: Path, context: AssetExecutionContext):
+        self.manifest = json.loads(Path(manifest_path).read_text())
+        self.context = context
+        self.translator = DagsterDbtTranslator()
+        self._source_versions: Dict[str, Optional[str]] = {}
+        # manifest.json is written to <project>/target
+        project_file = Path(manifest_path).parent.parent.joinpath("dbt_project.yml")
+        project = yaml.safe_load(project_file.read_text()) if project_file.exists() else {}
+        self._vars_version = _hash((project or {}).get("vars"))
+
+        self.models = {
+            uid: node
+            for uid, node in self.manifest["nodes"].items()
+            if node["resource_type"] == "model"
+            and self.asset_key(node) in context.selected_asset_keys
+        }
+        self.input_versions = {uid: self._input_versions(node) for uid, node in self.models.items()}
+        self.changed = self._changed_models()
+
+    def asset_key(self, node: dict) -> AssetKey:
+        return self.translator.get_asset_key(node)
+
+    def _source_version(self, uid: str) -> Optional[str]:
+        if uid not in self._source_versions:
+            source = self.manifest["sources"][uid]
+            self._source_versions[uid] = nessie_table_version(
+                source["schema"], source.get("identifier") or source["name"]
+            )
+        return self._source_versions[uid]
+
+    def _macros_version(self, node: dict) -> str:
+        """Hash of the SQL of every macro the node calls, directly or through other macros."""
+        macros = self.manifest.get("macros", {})
+        seen, pending = set(), list(node["depends_on"].get("macros", []))
+        while pending:
+            uid = pending.pop()
+            if uid in seen or uid not in macros:
+                continue
+            seen.add(uid)
+            pending.extend(macros[uid].get("depends_on", {}).get("macros", []))
+        return _hash({uid: macros[uid].get("macro_sql") for uid in sorted(seen)})
+
+    def _input_versions(self, node: dict) -> dict:
+        versions = {
+            "sql": node["checksum"]["checksum"],
+            "config": _hash(node.get("config")),
+            "macros": self._macros_version(node),
+        }
+        if "var(" in node.get("raw_code", ""):
+            versions["vars"] = self._vars_version
+        for uid in node["depends_on"]["nodes"]:
+            if uid.startswith("source."):
+                versions[uid] = self._source_version(uid)
+        return versions
+
+    def _previous_versions(self, node: dict) -> Optional[dict]:
+        event = self.context.instance.get_latest_materialization_event(self.asset_key(node))
+        if event is None or event.asset_materialization is None:
+            return None
+        value = event.asset_materialization.metadata.get(INPUT_VERSIONS_KEY)
+        return value.value if value is not None else None
+
+    def _changed_models(self) -> Set[str]:
+        changed = set()
+        for uid, node in self.models.items():
+            versions = self.input_versions[uid]
+            unknown = any(v is None for v in versions.values())
+            if unknown or self._previous_versions(node) != versions:
+                changed.add(uid)
+
+        # Anything downstream of a rebuilt model in this step must rebuild too
+        grew = True
+        while grew:
+            grew = False
+            for uid, node in self.models.items():
+                if uid not in changed and changed.intersection(node["depends_on"]["nodes"]):
+                    changed.add(uid)
+                    grew = True
+        return changed
+
+    @property
+    def unchanged(self) -> Iterable[str]:
+        return [uid for uid in self.models if uid not in self.changed]
+
+    def exclude_args(self) -> list:
+        """dbt --exclude arguments for the unchanged models."""
+        names = [self.models[uid]["name"] for uid in self.unchanged]
+        return ["--exclude", " ".join(names)] if names else []
+
+    def data_version(self, uid: str) -> DataVersion:
+        return DataVersion(_hash(self.input_versions[uid]))
+
+    def skip_events(self) -> Iterator[AssetObservation]:
+        for uid in self.unchanged:
+            node = self.models[uid]
+            yield AssetObservation(
+                asset_key=self.asset_key(node),
+                metadata={
+                    "skipped": MetadataValue.bool(True),
+                    "skip_reason": MetadataValue.text("inputs unchanged since last materialization"),
+                    INPUT_VERSIONS_KEY: MetadataValue.json(self.input_versions[uid]),
+                },
+            )
+
+    def annotate(self, events: Iterable) -> Iterator:
+        """Attach input versions and data versions to dbt Output events."""
+        uid_by_key = {self.asset_key(node): uid for uid, node in self.models.items()}
+        for event in events:
+            if isinstance(event, Output):
+                key = self.context.asset_key_for_output(event.output_name)
+                uid = uid_by_key.get(key)
+                if uid is not None:
+                    event = Output(
+                        value=event.value,
+                        output_name=event.output_name,
+                        metadata={
+                            **event.metadata,
+                            INPUT_VERSIONS_KEY: MetadataValue.json(self.input_versions[uid]),
+                        },
+                        data_version=self.data_version(uid),
+                    )
+            yield event
@@ -1,4 +1,7 @@
+import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
 from pathlib import Path
 
 from dagster_dbt import DbtCliResource
@@ -8,25 +11,68 @@ dbt_gold_project_dir = Path(__file__).joinpath("..", "..", "..", "transformation
 dbt_silver = DbtCliResource(project_dir=os.fspath(dbt_silver_project_dir))
 dbt_gold = DbtCliResource(project_dir=os.fspath(dbt_gold_project_dir))
 
-# If DAGSTER_DBT_PARSE_PROJECT_ON_LOAD is set, a manifest will be created at run time.
-# Otherwise, we expect a manifest to be present in the project's target directory.
-if os.getenv("DAGSTER_DBT_PARSE_PROJECT_ON_LOAD"):
-    dbt_silver_manifest_path = (
-        dbt_silver.cli(
-            ["--quiet", "parse"],
-            target_path=Path("target"),
-        )
-        .wait()
-        .target_path.joinpath("manifest.json")
-    )
-    dbt_gold_manifest_path = (
-        dbt_gold.cli(
+# Everything that can change the parsed manifest
+_MANIFEST_INPUT_DIRS = ["models", "macros", "seeds", "snapshots", "tests", "analyses"]
+_MANIFEST_INPUT_FILES = ["dbt_project.yml", "profiles.yml", "packages.yml", "dependencies.yml"]
+_MANIFEST_HASH_FILE = "manifest.sha256"
+
+
+def _project_hash(project_dir: Path) -> str:
+    """Content hash of a dbt project's sources, config, dbt version and env."""
+    digest = hashlib.sha256()
+    paths = [project_dir / name for name in _MANIFEST_INPUT_FILES]
+    for name in _MANIFEST_INPUT_DIRS:
+        paths.extend(sorted((project_dir / name).rglob("*")))
+    for path in paths:
+        if path.is_file():
+            digest.update(os.fspath(path.relative_to(project_dir)).encode())
+            digest.update(path.read_bytes())
+    for package in ("dbt-core", "dbt-dremio"):
+        try:
+            digest.update(f"{package}=={metadata.version(package)}".encode())
+        except metadata.PackageNotFoundError:
+            pass
+    for key in sorted(os.environ):
+        if key.startswith(("DBT_", "DREMIO_")):
+            digest.update(f"{key}={os.environ[key]}".encode())
+    return digest.hexdigest()
+
+
+def _cached_manifest(dbt: DbtCliResource, project_dir: Path) -> Path:
+    """
+    Return the project's manifest, running `dbt parse` only if the project changed.
+
+    The content hash of the last parse is stored next to target/manifest.json.
+    """
+    target_dir = project_dir.joinpath("target")
+    manifest_path = target_dir.joinpath("manifest.json")
+    hash_path = target_dir.joinpath(_MANIFEST_HASH_FILE)
+    current_hash = _project_hash(project_dir)
+
+    if manifest_path.exists() and hash_path.exists() and hash_path.read_text() == current_hash:
+        return manifest_path
+
+    manifest_path = (
+        dbt.cli(
             ["--quiet", "parse"],
             target_path=Path("target"),
         )
         .wait()
         .target_path.joinpath("manifest.json")
     )
+    manifest_path.parent.joinpath(_MANIFEST_HASH_FILE).write_text(current_hash)
+    return manifest_path
+
+
+# If DAGSTER_DBT_PARSE_PROJECT_ON_LOAD is set, a manifest will be created at run time
+# (reusing the previous one when the project is unchanged, both projects in parallel).
+# Otherwise, we expect a manifest to be present in the project's target directory.
+if os.getenv("DAGSTER_DBT_PARSE_PROJECT_ON_LOAD"):
+    with ThreadPoolExecutor(max_workers=2) as _pool:
+        _silver = _pool.submit(_cached_manifest, dbt_silver, dbt_silver_project_dir)
+        _gold = _pool.submit(_cached_manifest, dbt_gold, dbt_gold_project_dir)
+        dbt_silver_manifest_path = _silver.result()
+        dbt_gold_manifest_path = _gold.result()
 else:
     dbt_silver_manifest_path = dbt_silver_project_dir.joinpath("target", "manifest.json")
-    dbt_gold_manifest_path = dbt_gold_project_dir.joinpath("target", "manifest.json")
\ No newline at end of file
+    dbt_gold_manifest_path = dbt_gold_project_dir.joinpath("target", "manifest.json")
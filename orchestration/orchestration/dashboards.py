@@ -0,0 +1,97 @@
+"""
+Superset Cache Warm-up
+======================
+Re-runs the chart queries of Gold datasets through the Superset API after a
+Gold build, so the first dashboard load of the day is served from Superset's
+chart data cache instead of every user sending the same queries to Dremio.
+
+Uses `PUT /api/v1/dataset/warm_up_cache`, which recomputes (force refresh)
+and caches every chart built on a dataset. Tables without a Superset dataset
+are skipped.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Iterable, List
+
+import requests
+
+SUPERSET_URL = os.getenv("SUPERSET_URL")
+SUPERSET_USERNAME = os.getenv("SUPERSET_USERNAME", "admin")
+SUPERSET_PASSWORD = os.getenv("SUPERSET_PASSWORD", "admin")
+# Name of the Dremio database connection in Superset
+SUPERSET_DATABASE_NAME = os.getenv("SUPERSET_DATABASE_NAME", "Dremio")
+# Chart queries can take a while on a cold Dremio
+WARMUP_TIMEOUT_SECONDS = int(os.getenv("SUPERSET_WARMUP_TIMEOUT", "600"))
+
+
+class SupersetClient:
+    """Authenticated session against the Superset REST API."""
+
+    def __init__(self, url: str = SUPERSET_URL, username: str = SUPERSET_USERNAME,
+                 password: str = SUPERSET_PASSWORD):
+        self.url = url.rstrip("/")
+        self.session = requests.Session()
+        response = self.session.post(
+            f"{self.url}/api/v1/security/login",
+            json={"username": username, "password": password, "provider": "db", "refresh": False},
+            timeout=10,
+        )
+        response.raise_for_status()
+        self.session.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        # Write endpoints need a CSRF token tied to the session cookie
+        response = self.session.get(f"{self.url}/api/v1/security/csrf_token/", timeout=10)
+        response.raise_for_status()
+        self.session.headers["X-CSRFToken"] = response.json()["result"]
+        self.session.headers["Referer"] = self.url
+
+    def warm_up_dataset(self, table_name: str, db_name: str = SUPERSET_DATABASE_NAME) -> List[dict]:
+        """
+        Refresh the cached data of every chart on a dataset.
+
+        Returns one {chart_id, viz_status, viz_error} dict per chart, or an
+        empty list if Superset has no such dataset.
+        """
+        response = self.session.put(
+            f"{self.url}/api/v1/dataset/warm_up_cache",
+            json={"db_name": db_name, "table_name": table_name},
+            timeout=WARMUP_TIMEOUT_SECONDS,
+        )
+        if response.status_code == 404:
+            return []
+        response.raise_for_status()
+        return response.json().get("result", [])
+
+
+def gold_model_tables(manifest_path: Path) -> List[str]:
+    """Table names of the Gold dbt models."""
+    manifest = json.loads(Path(manifest_path).read_text())
+    return sorted(
+        node.get("alias") or node["name"]
+        for node in manifest["nodes"].values()
+        if node["resource_type"] == "model"
+    )
+
+
+def warm_up_tables(client: SupersetClient, tables: Iterable[str], log=None) -> List[dict]:
+    """Warm every table's charts; returns one stats dict per table that has charts."""
+    stats = []
+    for table in tables:
+        try:
+            charts = client.warm_up_dataset(table)
+        except requests.RequestException as e:
+            if log:
+                log.warning(f"Cache warm-up failed for {table}: {e}")
+            stats.append({"table": table, "charts": 0, "errors": 1})
+            continue
+        if not charts:
+            continue
+        errors = [c for c in charts if c.get("viz_error")]
+        for chart in errors:
+            if log:
+                log.warning(f"Chart {chart.get('chart_id')} on {table}: {chart['viz_error']}")
+        stats.append({"table": table, "charts": len(charts), "errors": len(errors)})
+        if log:
+            log.info(f"Warmed {len(charts)} chart(s) on {table}")
+    return stats
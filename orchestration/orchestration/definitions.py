@@ -5,23 +5,50 @@ Dagster Definitions for Data Lakehouse Pipeline
 dbt transformation pipeline: Silver → Gold + Soda quality checks
 
 Architecture:
-- Bronze: Airbyte syncs source data (run manually via Airbyte UI)
+- Bronze: Airbyte syncs source data (run manually via Airbyte UI), or the
+  native ingestion assets (bronze group) load data/ directly
 - Silver: dbt transformations (clean/standardize Bronze data)
 - Gold: dbt transformations (business aggregations)
 - Quality: Soda data quality checks after each transformation layer
+- Rollups: pre-aggregated Gold tables for Superset dashboards (rollups group)
+- Dashboards: Superset chart cache warm-up after Gold builds
 """
 
-from dagster import Definitions, define_asset_job, AssetSelection
+import os
+
+from dagster import Definitions, define_asset_job, AssetSelection, multiprocess_executor
 
 from .assets import (
+    bronze_assets,
     silver_dbt_assets,
     gold_dbt_assets,
     soda_silver_quality,
     soda_gold_quality,
+    gold_rollups,
+    superset_cache_warmup,
 )
 from .constants import dbt_silver, dbt_gold
 
 
+# =============================================================================
+# JOBS - Bronze Ingestion
+# =============================================================================
+
+# Load data/ into the Bronze Iceberg tables (instead of an Airbyte sync)
+bronze_ingestion = define_asset_job(
+    name="bronze_ingestion",
+    description="Load raw files into Bronze Iceberg tables (incremental appends)",
+    selection=AssetSelection.groups("bronze"),
+)
+
+# Native ingestion followed by the whole pipeline
+full_pipeline_with_ingestion = define_asset_job(
+    name="full_pipeline_with_ingestion",
+    description="Bronze ingestion + dbt transformations + Soda quality checks",
+    selection=AssetSelection.all(),
+)
+
+
 # =============================================================================
 # JOBS - dbt Only (Original - No Quality Checks)
 # =============================================================================
@@ -30,20 +57,20 @@ from .constants import dbt_silver, dbt_gold
 full_dbt_pipeline = define_asset_job(
     name="full_dbt_pipeline",
     description="Transform Bronze → Silver → Gold (dbt only, no quality checks)",
-    selection=AssetSelection.assets(silver_dbt_assets, gold_dbt_assets),
+    selection=AssetSelection.assets(*silver_dbt_assets, *gold_dbt_assets),
 )
 
 # Individual layer jobs for demo flexibility
 silver_job = define_asset_job(
     name="silver_transformation",
     description="Transform Bronze → Silver (clean & standardize raw data)",
-    selection=AssetSelection.assets(silver_dbt_assets),
+    selection=AssetSelection.assets(*silver_dbt_assets),
 )
 
 gold_job = define_asset_job(
     name="gold_transformation",
     description="Transform Silver → Gold (aggregate & join for analytics)",
-    selection=AssetSelection.assets(gold_dbt_assets),
+    selection=AssetSelection.assets(*gold_dbt_assets),
 )
 
 
@@ -55,21 +82,21 @@ gold_job = define_asset_job(
 full_pipeline_with_quality = define_asset_job(
     name="full_pipeline_with_quality",
     description="Complete pipeline: dbt transformations + Soda quality checks",
-    selection=AssetSelection.all(),
+    selection=AssetSelection.all() - AssetSelection.groups("bronze"),
 )
 
 # Silver + quality check
 silver_with_quality = define_asset_job(
     name="silver_with_quality",
     description="Silver transformation + Soda quality validation",
-    selection=AssetSelection.assets(silver_dbt_assets, soda_silver_quality),
+    selection=AssetSelection.assets(*silver_dbt_assets, soda_silver_quality),
 )
 
 # Gold + quality check
 gold_with_quality = define_asset_job(
     name="gold_with_quality",
     description="Gold transformation + Soda quality validation",
-    selection=AssetSelection.assets(gold_dbt_assets, soda_gold_quality),
+    selection=AssetSelection.assets(*gold_dbt_assets, soda_gold_quality),
 )
 
 # Quality checks only (useful for ad-hoc validation)
@@ -80,20 +107,54 @@ quality_checks_only = define_asset_job(
 )
 
 
+# =============================================================================
+# JOBS - Dashboard Rollups & Cache Warm-up
+# =============================================================================
+
+# Gold + the rollup tables Superset dashboards read + warm chart caches
+gold_with_rollups = define_asset_job(
+    name="gold_with_rollups",
+    description="Gold transformation + dashboard rollup tables + Superset cache warm-up",
+    selection=AssetSelection.assets(*gold_dbt_assets, gold_rollups, superset_cache_warmup),
+)
+
+# Rollups only (e.g. after editing transformation/gold/rollups.yml)
+rollups_only = define_asset_job(
+    name="rollups_only",
+    description="Create or refresh the rollup tables from the existing Gold tables, then warm caches",
+    selection=AssetSelection.assets(gold_rollups, superset_cache_warmup),
+)
+
+# Cache warm-up only (e.g. before the morning dashboard rush)
+superset_warmup_only = define_asset_job(
+    name="superset_warmup_only",
+    description="Refresh Superset's cached chart data for Gold datasets",
+    selection=AssetSelection.assets(superset_cache_warmup),
+)
+
+
 # =============================================================================
 # DAGSTER DEFINITIONS
 # =============================================================================
 
 defs = Definitions(
     assets=[
-        # dbt transformation assets
-        silver_dbt_assets,
-        gold_dbt_assets,
+        # Bronze ingestion assets (one per source file)
+        *bronze_assets,
+        # dbt transformation assets (one per domain and layer)
+        *silver_dbt_assets,
+        *gold_dbt_assets,
         # Soda quality check assets
         soda_silver_quality,
         soda_gold_quality,
+        # Dashboard rollup tables and Superset cache warm-up
+        gold_rollups,
+        superset_cache_warmup,
     ],
     jobs=[
+        # Bronze ingestion
+        bronze_ingestion,
+        full_pipeline_with_ingestion,
         # Original jobs (dbt only)
         full_dbt_pipeline,
         silver_job,
@@ -103,9 +164,18 @@ defs = Definitions(
         silver_with_quality,
         gold_with_quality,
         quality_checks_only,
+        # Dashboard rollups
+        gold_with_rollups,
+        rollups_only,
+        superset_warmup_only,
     ],
     resources={
         "dbt_silver": dbt_silver,
         "dbt_gold": dbt_gold,
     },
+    # Independent domain branches (chargenet, ecoride, vehicle_health) run as
+    # separate steps; this bounds how many run at the same time
+    executor=multiprocess_executor.configured(
+        {"max_concurrent": int(os.getenv("DAGSTER_MAX_CONCURRENT_STEPS", "4"))}
+    ),
 )
@@ -0,0 +1,229 @@
+"""
+Fused Quality Checks
+====================
+Compiles all SodaCL checks for one table into a single aggregate query.
+
+Soda issues roughly one query per metric; here every metric of a table
+(row_count, missing_count, duplicate_count, invalid_count, min, max, avg)
+becomes one column of one SELECT, so each table is scanned once. Thresholds
+are evaluated client-side. Results use the same CheckResult shape as the
+Soda runner, and `compare_results` diffs the two for validation.
+
+Supported checks: `<metric>[(column)] <op> <number>` with op in
+<, <=, =, !=, >=, >, plus `valid format: email` and `valid values: [...]`
+for invalid_count. Anything else raises UnsupportedCheck.
+"""
+
+import math
+import operator
+import re
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .dremio import DremioFlight
+from .quality import CheckResult, configured_name, run_table_scan
+
+_CHECK = re.compile(
+    r"^\s*(?P<metric>[a-z_]+)\s*(?:\(\s*(?P<column>[A-Za-z0-9_\"]+)\s*\))?"
+    r"\s*(?P<op><=|>=|!=|=|<|>)\s*(?P<threshold>-?[0-9.]+)\s*$"
+)
+_OPERATORS = {
+    "<": operator.lt, "<=": operator.le, "=": operator.eq,
+    "!=": operator.ne, ">=": operator.ge, ">": operator.gt,
+}
+# Same pattern Soda Core uses for `valid format: email`
+EMAIL_REGEX = r"^[a-zA-Z0-9.!#$%&'*+/=?^_`{|}~-]+@[a-zA-Z0-9-]+(\.[a-zA-Z0-9-]+)*$"
+
+
+class UnsupportedCheck(ValueError):
+    """Raised for SodaCL checks the fused compiler cannot express."""
+
+
+class _Metric:
+    def __init__(self, check):
+        definition, options = (next(iter(check.items())) if isinstance(check, dict)
+                               else (check, None))
+        match = _CHECK.match(definition)
+        if not match:
+            raise UnsupportedCheck(f"Cannot compile check: {definition}")
+        self.name = configured_name(check)
+        self.metric = match["metric"]
+        self.column = match["column"]
+        self.op = match["op"]
+        self.threshold = float(match["threshold"])
+        self.options = options if isinstance(options, dict) else {}
+
+    def _invalid_condition(self) -> str:
+        col = self.column
+        if self.options.get("valid format") == "email":
+            pattern = EMAIL_REGEX.replace("'", "''")
+            return f"NOT REGEXP_LIKE({col}, '{pattern}')"
+        if "valid values" in self.options:
+            values = ", ".join(
+                "'" + str(v).replace("'", "''") + "'" for v in self.options["valid values"]
+            )
+            return f"{col} NOT IN ({values})"
+        raise UnsupportedCheck(f"invalid_count needs 'valid format: email' or 'valid values': {self.name}")
+
+    def expression(self) -> str:
+        m, col = self.metric, self.column
+        if m == "row_count" and col is None:
+            return "COUNT(*)"
+        if col is None:
+            raise UnsupportedCheck(f"{m} needs a column: {self.name}")
+        if m == "missing_count":
+            return f"COALESCE(SUM(CASE WHEN {col} IS NULL THEN 1 ELSE 0 END), 0)"
+        if m == "duplicate_count":
+            # Distinct non-null values that occur more than once (Soda semantics)
+            return f"COUNT(DISTINCT CASE WHEN {_dup_alias(col)} > 1 THEN {col} END)"
+        if m == "invalid_count":
+            return (f"COALESCE(SUM(CASE WHEN {col} IS NOT NULL AND {self._invalid_condition()} "
+                    f"THEN 1 ELSE 0 END), 0)")
+        if m in ("min", "max", "avg", "sum"):
+            return f"{m.upper()}({col})"
+        raise UnsupportedCheck(f"Unsupported metric {m}: {self.name}")
+
+    def evaluate(self, value) -> bool:
+        if value is None:
+            return False
+        return _OPERATORS[self.op](float(value), self.threshold)
+
+    @property
+    def row_wise(self) -> bool:
+        """
+        True if the check holds for a table exactly when it holds for each row.
+
+        Such checks can be evaluated on changed rows only: "no missing or
+        invalid values" and min/max bounds, but not row counts, averages or
+        duplicates, which depend on the other rows.
+        """
+        if self.metric in ("missing_count", "invalid_count"):
+            return self._zero_tolerance
+        if self.metric == "min":
+            return self.op in (">", ">=")
+        if self.metric == "max":
+            return self.op in ("<", "<=")
+        return False
+
+    @property
+    def key_wise(self) -> bool:
+        """
+        True for a "no duplicates" check.
+
+        If the table had no duplicates, a new duplicate involves a key of a
+        changed row, so only those keys need to be looked up in the table.
+        """
+        return self.metric == "duplicate_count" and self._zero_tolerance
+
+    @property
+    def _zero_tolerance(self) -> bool:
+        return self.op in ("=", "<", "<=") and self.evaluate(0) and not self.evaluate(1)
+
+
+def _dup_alias(column: str) -> str:
+    return f"__dup_{column.strip(chr(34)).lower()}"
+
+
+def compile_table_query(full_table: str, checks: list, where: Optional[str] = None,
+                        watermark_column: Optional[str] = None) -> Tuple[str, List[_Metric]]:
+    """
+    One SELECT computing every metric of the table's checks.
+
+    Metric i is column m{i}; avg metrics also get their non-null count as
+    n{i}. With watermark_column, the newest value of that column is
+    returned as wm. where restricts the scan (e.g. to newly loaded rows).
+    """
+    metrics = [_Metric(check) for check in checks]
+    selects = [f"{m.expression()} AS m{i}" for i, m in enumerate(metrics)]
+    selects += [f"COUNT({m.column}) AS n{i}" for i, m in enumerate(metrics) if m.metric == "avg"]
+    if watermark_column:
+        selects.append(f"MAX({watermark_column}) AS wm")
+
+    if where:
+        full_table = f"(SELECT * FROM {full_table} WHERE {where})"
+
+    dup_columns = sorted({m.column for m in metrics if m.metric == "duplicate_count"})
+    if dup_columns:
+        windows = ", ".join(
+            f"COUNT(*) OVER (PARTITION BY {c}) AS {_dup_alias(c)}" for c in dup_columns
+        )
+        source = f"(SELECT t.*, {windows} FROM {full_table} t) t"
+    else:
+        source = full_table
+    return f"SELECT {', '.join(selects)} FROM {source}", metrics
+
+
+def fused_metrics(config_file: Path, table: str, checks: list, where: Optional[str] = None,
+                  watermark_column: Optional[str] = None):
+    """Run the fused query for one table; returns (metrics, result row, seconds)."""
+    with DremioFlight.from_soda_config(config_file) as conn:
+        sql, metrics = compile_table_query(f"{conn.schema}.{table}", checks, where, watermark_column)
+
+        start = time.perf_counter()
+        row = conn.query_one(sql)
+        return metrics, row, time.perf_counter() - start
+
+
+def run_fused_table_scan(config_file: Path, table: str, checks: list) -> List[CheckResult]:
+    """Evaluate all checks of one table from a single aggregate query."""
+    metrics, row, seconds = fused_metrics(config_file, table, checks)
+
+    results = []
+    for i, metric in enumerate(metrics):
+        value = row[f"m{i}"]
+        results.append(CheckResult(
+            table=table,
+            name=metric.name,
+            outcome="pass" if metric.evaluate(value) else "fail",
+            value=value,
+            seconds=seconds,
+        ))
+    return results
+
+
+def compare_results(fused: List[CheckResult], soda: List[CheckResult],
+                    rel_tol: float = 1e-9) -> List[str]:
+    """Describe every check where the fused and Soda results disagree."""
+    soda_by_key = {(r.table, r.name): r for r in soda}
+    mismatches = []
+    for f in fused:
+        s = soda_by_key.get((f.table, f.name))
+        if s is None:
+            mismatches.append(f"{f.table}: {f.name} missing from Soda results")
+            continue
+        same_value = (
+            f.value == s.value
+            or (f.value is not None and s.value is not None
+                and math.isclose(float(f.value), float(s.value), rel_tol=rel_tol))
+        )
+        if f.outcome != s.outcome or not same_value:
+            mismatches.append(
+                f"{f.table}: {f.name} fused={f.outcome}/{f.value} soda={s.outcome}/{s.value}"
+            )
+    return mismatches
+
+
+def run_table_scan_fused(config_file: Path, table: str, checks: list) -> List[CheckResult]:
+    """Fused scan of one table, falling back to Soda if a check cannot be compiled."""
+    try:
+        compile_table_query(table, checks)
+    except UnsupportedCheck:
+        return run_table_scan(config_file, table, checks)
+    return run_fused_table_scan(config_file, table, checks)
+
+
+def run_table_scan_compare(config_file: Path, table: str, checks: list) -> List[CheckResult]:
+    """
+    Run both engines on one table and raise if they disagree.
+
+    Returns the Soda results, so comparison mode never changes the gate.
+    """
+    soda = run_table_scan(config_file, table, checks)
+    fused = run_table_scan_fused(config_file, table, checks)
+    mismatches = compare_results(fused, soda)
+    if mismatches:
+        raise AssertionError(
+            f"Fused checks differ from Soda on {table}:\n" + "\n".join(mismatches)
+        )
+    return soda
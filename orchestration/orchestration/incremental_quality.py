@@ -0,0 +1,181 @@
+"""
+Incremental Quality Checks
+==========================
+Scopes quality checks to rows loaded or updated since the previous check run.
+
+Tables with a load watermark column (Silver `_loaded_at`, incremental Gold
+`last_loaded_at`) are merge tables: updated rows come back with a newer
+watermark. Running totals would count them twice, so no metric is carried
+over between runs. Instead, with the fused engine, each kind of check gets
+its own query:
+
+- row-wise checks (missing/invalid values, min/max bounds) run on the rows
+  past the watermark only. The rest of the table passed them in an earlier
+  run (the state only advances when every check passed) and was not touched
+  since.
+- "no duplicates" checks look up only the keys of those rows: a key that
+  occurs more than once in the table is a new duplicate.
+- row counts run as a bare `COUNT(*)` of the table, which Dremio answers
+  from Iceberg metadata without reading data files.
+- everything else (averages, sums, duplicate tolerances) runs on the whole
+  table, without any window function.
+
+Other tables, tables with checks the fused engine cannot compile (checked by
+Soda), and every table during a full sweep are checked in full with one
+fused query. Rows re-assigned to another key only show up in full sweeps,
+which is why a periodic sweep is forced.
+"""
+
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .dremio import DremioFlight
+from .fused_checks import UnsupportedCheck, compile_table_query
+from .quality import SODA_MAX_WORKERS, CheckResult, load_check_groups, run_table_scan
+
+WATERMARK_COLUMNS = {
+    # Silver incremental models
+    "sales": "_loaded_at",
+    "charging_sessions": "_loaded_at",
+    # Gold incremental aggregates
+    "charging_station_utilization": "last_loaded_at",
+    "customer_lifetime_value": "last_loaded_at",
+}
+
+
+def _plain(value):
+    """Decimals become floats so values can be stored as JSON metadata."""
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _timestamp_literal(value: str) -> str:
+    parsed = datetime.datetime.fromisoformat(value)
+    return f"TIMESTAMP '{parsed.isoformat(sep=' ', timespec='milliseconds')}'"
+
+
+def _query(conn: DremioFlight, sql: str):
+    """(first row, seconds) of sql."""
+    start = time.perf_counter()
+    row = conn.query_one(sql)
+    return row, time.perf_counter() - start
+
+
+def _result(table: str, metric, value, seconds: float, scoped: bool = False) -> CheckResult:
+    value = _plain(value)
+    # No changed rows: nothing new can violate a row-wise check
+    passed = metric.evaluate(value) or (scoped and value is None)
+    return CheckResult(table=table, name=metric.name, outcome="pass" if passed else "fail",
+                       value=value, seconds=seconds)
+
+
+def _fused(conn: DremioFlight, table: str, checks: list, where: Optional[str] = None,
+           watermark_column: Optional[str] = None):
+    """One fused query for checks; returns ({name: CheckResult}, newest watermark)."""
+    sql, metrics = compile_table_query(f"{conn.schema}.{table}", checks, where, watermark_column)
+    row, seconds = _query(conn, sql)
+    results = {
+        m.name: _result(table, m, row[f"m{i}"], seconds, scoped=where is not None)
+        for i, m in enumerate(metrics)
+    }
+    return results, row.get("wm")
+
+
+def _new_key_duplicates(conn: DremioFlight, table: str, column: str, where: str):
+    """(keys of changed rows occurring more than once in the table, seconds)."""
+    full_table = f"{conn.schema}.{table}"
+    sql = (
+        f"SELECT COUNT(*) AS m FROM ("
+        f"SELECT {column} FROM {full_table} "
+        f"WHERE {column} IN (SELECT {column} FROM {full_table} WHERE {where}) "
+        f"GROUP BY {column} HAVING COUNT(*) > 1) d"
+    )
+    row, seconds = _query(conn, sql)
+    return row["m"], seconds
+
+
+def _incremental(conn: DremioFlight, table: str, checks: list, metrics: list,
+                 watermark_column: str, where: str):
+    """Run checks scoped to the rows past the watermark; returns ({name: CheckResult}, newest watermark)."""
+    # Always run: it also finds the newest watermark (files before it are pruned)
+    row_wise = [c for c, m in zip(checks, metrics) if m.row_wise]
+    results, watermark = _fused(conn, table, row_wise, where, watermark_column)
+
+    counts = [m for m in metrics if m.metric == "row_count" and m.column is None]
+    if counts:
+        row, seconds = _query(conn, f"SELECT COUNT(*) AS m FROM {conn.schema}.{table}")
+        results.update({m.name: _result(table, m, row["m"], seconds) for m in counts})
+
+    for m in metrics:
+        if m.key_wise:
+            value, seconds = _new_key_duplicates(conn, table, m.column, where)
+            results[m.name] = _result(table, m, value, seconds)
+
+    rest = [c for c, m in zip(checks, metrics) if m.name not in results]
+    if rest:
+        results.update(_fused(conn, table, rest)[0])
+    return results, watermark
+
+
+def run_table_checks(config_file: Path, table: str, checks: list,
+                     previous: Optional[dict]) -> Tuple[List[CheckResult], Optional[dict], str]:
+    """
+    Check one table, scoped to its changed rows if it has a watermark and state.
+
+    Returns (results, new state or None, scope).
+    """
+    try:
+        _, metrics = compile_table_query(table, checks)
+    except UnsupportedCheck:
+        # Same fallback as run_table_scan_fused
+        return run_table_scan(config_file, table, checks), None, "soda"
+
+    watermark_column = WATERMARK_COLUMNS.get(table)
+    incremental = bool(watermark_column and previous and previous.get("watermark"))
+    with DremioFlight.from_soda_config(config_file) as conn:
+        if incremental:
+            where = f"{watermark_column} > {_timestamp_literal(previous['watermark'])}"
+            results, watermark = _incremental(conn, table, checks, metrics, watermark_column, where)
+        else:
+            results, watermark = _fused(conn, table, checks, None, watermark_column)
+
+    ordered = [results[m.name] for m in metrics]
+    if not watermark_column:
+        return ordered, None, "full"
+    state = {"watermark": watermark.isoformat() if watermark is not None else None}
+    if state["watermark"] is None and incremental:
+        state["watermark"] = previous["watermark"]
+    return ordered, state, "incremental" if incremental else "full"
+
+
+def run_incremental_checks(context, config_file: Path, checks_file: Path, layer_name: str,
+                           previous_state: Optional[Dict[str, dict]],
+                           max_workers: int = SODA_MAX_WORKERS):
+    """
+    Run every table's checks concurrently, incrementally where possible.
+
+    previous_state of None forces a full sweep. Returns (results, new state, scopes).
+    """
+    groups = load_check_groups(checks_file)
+    previous_state = previous_state or {}
+    context.log.info(
+        f"Running {layer_name} quality checks on {len(groups)} tables "
+        f"({'incremental' if previous_state else 'full sweep'})..."
+    )
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            table: pool.submit(run_table_checks, config_file, table, checks,
+                               previous_state.get(table))
+            for table, checks in groups.items()
+        }
+        results, state, scopes = [], {}, {}
+        for table, future in futures.items():
+            table_results, table_state, scope = future.result()
+            results.extend(table_results)
+            scopes[table] = scope
+            if table_state is not None:
+                state[table] = table_state
+    return results, state, scopes
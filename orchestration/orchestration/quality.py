@@ -0,0 +1,197 @@
+"""
+Soda Quality Runner
+===================
+Runs Soda checks through Soda Core's Python API instead of the CLI.
+
+Each `checks for <table>` block of a checks file becomes its own scan, and
+the scans run concurrently on a bounded thread pool. Results come back as
+structured data (outcome and measured value per check, duration per table
+scan) and are reported as Dagster asset checks.
+
+A table's checks share one scan, so their duration is the table's. To find
+a slow check, run_table_scan_profiled runs every check as its own scan
+(slower overall) and reports each check's own duration.
+"""
+
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import yaml
+from dagster import AssetCheckResult, AssetCheckSeverity, AssetCheckSpec, MetadataValue
+
+SODA_DIR = Path(__file__).joinpath("..", "..", "..", "soda").resolve()
+SODA_DATA_SOURCE = "lakehouse"
+SODA_MAX_WORKERS = int(os.getenv("SODA_MAX_WORKERS", "4"))
+
+
+@dataclass
+class CheckResult:
+    """Outcome of one Soda check."""
+
+    table: str
+    name: str
+    outcome: Optional[str]  # "pass", "warn", "fail", or None if the check errored
+    value: Any
+    seconds: float  # duration of the scan the check ran in
+    profiled: bool = False  # True if that scan ran only this check
+
+    @property
+    def timing(self) -> str:
+        return "check" if self.profiled else "table scan"
+
+    @property
+    def passed(self) -> bool:
+        return self.outcome in ("pass", "warn")
+
+
+def load_check_groups(checks_file: Path) -> Dict[str, list]:
+    """Split a SodaCL file into {table: [checks]}."""
+    document = yaml.safe_load(Path(checks_file).read_text()) or {}
+    groups = {}
+    for key, checks in document.items():
+        match = re.match(r"checks for (\S+)", key)
+        if match:
+            groups[match.group(1)] = checks
+    return groups
+
+
+def configured_name(check) -> str:
+    """Soda reports a check under its `name`, or its definition if unnamed."""
+    if isinstance(check, dict):
+        definition, options = next(iter(check.items()))
+        if isinstance(options, dict) and options.get("name"):
+            return options["name"]
+        return definition
+    return str(check)
+
+
+def check_spec_name(table: str, name: str) -> str:
+    """Dagster-safe asset check name for a Soda check."""
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_").lower()
+    return f"{table}__{slug}"
+
+
+def soda_check_specs(checks_file: Path, asset: str) -> List[AssetCheckSpec]:
+    """One AssetCheckSpec per check in the file, attached to the given asset."""
+    return [
+        AssetCheckSpec(name=check_spec_name(table, configured_name(check)), asset=asset,
+                       description=configured_name(check))
+        for table, checks in load_check_groups(checks_file).items()
+        for check in checks
+    ]
+
+
+def run_table_scan(config_file: Path, table: str, checks: list) -> List[CheckResult]:
+    """Run the checks of one table as a single Soda scan."""
+    # Imported here: Soda is slow to import and only needed inside runs
+    from soda.scan import Scan
+
+    scan = Scan()
+    scan.set_data_source_name(SODA_DATA_SOURCE)
+    scan.set_scan_definition_name(f"dagster_{table}")
+    scan.add_configuration_yaml_file(file_path=os.fspath(config_file))
+    scan.add_sodacl_yaml_str(yaml.safe_dump({f"checks for {table}": checks}))
+
+    start = time.perf_counter()
+    scan.execute()
+    seconds = time.perf_counter() - start
+
+    reported = {c.get("name"): c for c in scan.get_scan_results().get("checks", [])}
+    results = []
+    for check in checks:
+        name = configured_name(check)
+        soda_check = reported.get(name, {})
+        results.append(CheckResult(
+            table=table,
+            name=name,
+            outcome=soda_check.get("outcome"),
+            value=(soda_check.get("diagnostics") or {}).get("value"),
+            seconds=seconds,
+        ))
+    return results
+
+
+def table_seconds(results: List[CheckResult]) -> float:
+    """Time spent on one table's checks."""
+    if all(r.profiled for r in results):
+        return sum(r.seconds for r in results)
+    return max(r.seconds for r in results)
+
+
+def run_table_scan_profiled(config_file: Path, table: str, checks: list) -> List[CheckResult]:
+    """Run each check of one table as its own Soda scan, timing every check."""
+    results = []
+    for check in checks:
+        (result,) = run_table_scan(config_file, table, [check])
+        result.profiled = True
+        results.append(result)
+    return results
+
+
+def run_soda_checks(context, config_file: Path, checks_file: Path, layer_name: str,
+                    max_workers: int = SODA_MAX_WORKERS,
+                    scan_fn: Callable[[Path, str, list], List[CheckResult]] = None
+                    ) -> List[CheckResult]:
+    """
+    Run every table's checks concurrently and return the flattened results.
+
+    scan_fn runs one table's checks; it defaults to a Soda scan.
+    """
+    scan_fn = scan_fn or run_table_scan
+    groups = load_check_groups(checks_file)
+    context.log.info(
+        f"Running Soda {layer_name} quality checks on {len(groups)} tables "
+        f"({max_workers} concurrent scans)..."
+    )
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            table: pool.submit(scan_fn, config_file, table, checks)
+            for table, checks in groups.items()
+        }
+        results = []
+        for table, future in futures.items():
+            table_results = future.result()
+            context.log.info(
+                f"{table}: {sum(r.passed for r in table_results)}/{len(table_results)} passed "
+                f"in {table_seconds(table_results):.2f}s" if table_results else f"{table}: no checks"
+            )
+            results.extend(table_results)
+    return results
+
+
+def check_result_events(results: List[CheckResult], asset: str) -> Iterator[AssetCheckResult]:
+    for r in results:
+        yield AssetCheckResult(
+            asset_key=asset,
+            check_name=check_spec_name(r.table, r.name),
+            passed=r.passed,
+            severity=AssetCheckSeverity.WARN if r.outcome == "warn" else AssetCheckSeverity.ERROR,
+            metadata={
+                "table": MetadataValue.text(r.table),
+                "outcome": MetadataValue.text(r.outcome or "error"),
+                "value": MetadataValue.text(str(r.value)),
+                "check_seconds" if r.profiled else "scan_seconds": MetadataValue.float(round(r.seconds, 3)),
+                "timing": MetadataValue.text(r.timing),
+            },
+        )
+
+
+def results_markdown(results: List[CheckResult]) -> str:
+    """
+    Results table, slowest first.
+
+    Without profiling the time is the table scan's (shared by the table's
+    checks), so checks are grouped by table; use the "profile" quality
+    engine for per-check times.
+    """
+    lines = ["| table | check | outcome | value | seconds | timing |", "|---|---|---|---|---|---|"]
+    for r in sorted(results, key=lambda r: (-r.seconds, r.table, r.name)):
+        lines.append(
+            f"| {r.table} | {r.name} | {r.outcome or 'error'} | {r.value} | {r.seconds:.2f} | {r.timing} |"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,206 @@
+"""
+Gold Rollups
+============
+Pre-aggregated tables for Superset dashboards, declared in
+transformation/gold/rollups.yml.
+
+Each rollup is built at every configured time grain as
+catalog.gold.rollup_<name>_<grain>, grouping by its dimensions and the time
+column truncated with the same DATE_TRUNC expression Superset applies for
+that grain. A dashboard chart on the rollup table then scans a few hundred
+rows instead of re-aggregating the Gold table on every refresh.
+
+Tables are rebuilt (DROP + CREATE TABLE AS) through Dremio over Arrow
+Flight, on a temporary Nessie branch that is merged into NESSIE_BRANCH once
+every changed rollup was built. Dashboards keep reading the previous tables
+during the build, and a failed build leaves them untouched. The connection
+comes from DREMIO_HOST / DREMIO_FLIGHT_PORT / DREMIO_USER / DREMIO_PASSWORD
+(the settings of the dbt profile).
+
+A rollup's version is the Iceberg snapshot id of its source table plus a
+hash of its generated SQL; rollups whose version is unchanged since the last
+build are skipped.
+"""
+
+import hashlib
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+from .change_detection import NESSIE_BRANCH, nessie_table_version
+from .dremio import DremioFlight
+
+ROLLUPS_FILE = Path(__file__).joinpath("..", "..", "..", "transformation", "gold", "rollups.yml").resolve()
+GOLD_NAMESPACE = "gold"
+# Dremio path of the Gold tables: <Nessie source>.<namespace>
+GOLD_SCHEMA = os.getenv("DREMIO_GOLD_SCHEMA", "catalog.gold")
+
+# Must match DremioEngineSpec._time_grain_expressions in
+# docker/superset/superset_config.py, so rollup time buckets line up with
+# Superset's time grains
+TIME_GRAIN_EXPRESSIONS = {
+    "PT1S": "DATE_TRUNC('second', {col})",
+    "PT1M": "DATE_TRUNC('minute', {col})",
+    "PT1H": "DATE_TRUNC('hour', {col})",
+    "P1D": "DATE_TRUNC('day', {col})",
+    "P1W": "DATE_TRUNC('week', {col})",
+    "P1M": "DATE_TRUNC('month', {col})",
+    "P3M": "DATE_TRUNC('quarter', {col})",
+    "P1Y": "DATE_TRUNC('year', {col})",
+}
+# Table name suffix per grain
+TIME_GRAIN_NAMES = {
+    "PT1S": "second", "PT1M": "minute", "PT1H": "hour", "P1D": "day",
+    "P1W": "week", "P1M": "month", "P3M": "quarter", "P1Y": "year",
+}
+# Aggregates whose results can be aggregated again at a coarser level
+AGGREGATES = {"sum": "SUM", "count": "COUNT", "min": "MIN", "max": "MAX"}
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class Rollup:
+    """One rollup table: a rollup definition at one time grain."""
+
+    def __init__(self, definition: dict, grain: Optional[str]):
+        self.name = definition["name"]
+        self.source = definition["source"]
+        self.time_column = definition.get("time_column")
+        self.grain = grain
+        self.dimensions = list(definition.get("dimensions", []))
+        self.measures = {column: list(aggs) for column, aggs in definition.get("measures", {}).items()}
+        self._validate()
+
+    def _validate(self):
+        names = [self.name, self.source, *self.dimensions, *self.measures]
+        if self.time_column:
+            names.append(self.time_column)
+        for name in names:
+            if not _IDENTIFIER.match(name):
+                raise ValueError(f"Rollup {self.name}: invalid identifier {name!r}")
+        if self.grain is not None and self.grain not in TIME_GRAIN_EXPRESSIONS:
+            raise ValueError(
+                f"Rollup {self.name}: unknown time grain {self.grain!r} "
+                f"(expected one of {', '.join(TIME_GRAIN_EXPRESSIONS)})"
+            )
+        for column, aggs in self.measures.items():
+            unknown = set(aggs) - set(AGGREGATES)
+            if unknown:
+                raise ValueError(
+                    f"Rollup {self.name}: unsupported aggregate(s) {sorted(unknown)} for {column} "
+                    f"(expected {', '.join(AGGREGATES)})"
+                )
+
+    @property
+    def table(self) -> str:
+        if self.grain is None:
+            return f"rollup_{self.name}"
+        return f"rollup_{self.name}_{TIME_GRAIN_NAMES[self.grain]}"
+
+    def select_sql(self, schema: str) -> str:
+        """The aggregate query the rollup table is built from."""
+        keys = []
+        if self.grain is not None:
+            keys.append((TIME_GRAIN_EXPRESSIONS[self.grain].format(col=self.time_column), self.time_column))
+        keys.extend((column, column) for column in self.dimensions)
+
+        selects = [expression if expression == alias else f"{expression} AS {alias}"
+                   for expression, alias in keys]
+        selects.append("COUNT(*) AS row_count")
+        for column, aggs in self.measures.items():
+            selects.extend(f"{AGGREGATES[agg]}({column}) AS {column}_{agg}" for agg in aggs)
+
+        sql = f"SELECT {', '.join(selects)} FROM {schema}.{self.source}"
+        if keys:
+            sql += f" GROUP BY {', '.join(expression for expression, _ in keys)}"
+        return sql
+
+    def version(self, schema: str) -> Optional[str]:
+        """Source snapshot plus SQL hash; None if the source snapshot is unknown."""
+        snapshot = nessie_table_version(GOLD_NAMESPACE, self.source)
+        if snapshot is None:
+            return None
+        sql_hash = hashlib.sha256(self.select_sql(schema).encode()).hexdigest()[:16]
+        return f"{snapshot}:{sql_hash}"
+
+
+def load_rollups(path: Path = ROLLUPS_FILE) -> List[Rollup]:
+    """All rollup tables declared in rollups.yml, one per rollup and time grain."""
+    config = yaml.safe_load(Path(path).read_text()) or {}
+    rollups = []
+    for definition in config.get("rollups", []):
+        if definition.get("time_column"):
+            grains = definition.get("time_grains") or ["P1D"]
+        else:
+            grains = [None]
+        rollups.extend(Rollup(definition, grain) for grain in grains)
+    tables = [r.table for r in rollups]
+    duplicates = {t for t in tables if tables.count(t) > 1}
+    if duplicates:
+        raise ValueError(f"Duplicate rollup tables: {', '.join(sorted(duplicates))}")
+    return rollups
+
+
+def build_rollups(previous_versions: Optional[Dict[str, str]], force: bool = False,
+                  log=None) -> Tuple[Dict[str, str], List[dict]]:
+    """
+    Create or refresh the rollup tables whose source or definition changed.
+
+    Returns (versions by table, one stats dict per rollup table).
+    """
+    previous_versions = previous_versions or {}
+    versions, stats, pending = {}, [], []
+    for rollup in load_rollups():
+        version = rollup.version(GOLD_SCHEMA)
+        if not force and version is not None and previous_versions.get(rollup.table) == version:
+            versions[rollup.table] = version
+            stats.append({"table": rollup.table, "source": rollup.source, "action": "skipped"})
+            if log:
+                log.info(f"{GOLD_SCHEMA}.{rollup.table}: {rollup.source} unchanged, skipping")
+        else:
+            pending.append((rollup, version))
+    if not pending:
+        return versions, stats
+
+    source = GOLD_SCHEMA.split(".")[0]
+    branch = f"rollups_{uuid.uuid4().hex[:12]}"
+    with DremioFlight.from_env(GOLD_SCHEMA) as conn:
+        conn.query(f"CREATE BRANCH {branch} AT BRANCH {NESSIE_BRANCH} IN {source}")
+        try:
+            for rollup, version in pending:
+                full_table = f"{GOLD_SCHEMA}.{rollup.table}"
+                start = time.perf_counter()
+                # Same rebuild as a dbt table materialization, off the live branch
+                conn.query(f"DROP TABLE IF EXISTS {full_table} AT BRANCH {branch}")
+                conn.query(
+                    f"CREATE TABLE {full_table} AT BRANCH {branch} AS {rollup.select_sql(GOLD_SCHEMA)}"
+                )
+                rows = conn.query_one(
+                    f"SELECT COUNT(*) AS row_count FROM {full_table} AT BRANCH {branch}"
+                )["row_count"]
+                seconds = time.perf_counter() - start
+                if version is not None:
+                    versions[rollup.table] = version
+                stats.append({"table": rollup.table, "source": rollup.source, "action": "built",
+                              "rows": rows, "seconds": round(seconds, 2)})
+                if log:
+                    log.info(f"{full_table}: built {rows:,} rows from {rollup.source} in {seconds:.1f}s")
+            # Publishes every rebuilt table in one Nessie commit
+            conn.query(f"MERGE BRANCH {branch} INTO {NESSIE_BRANCH} IN {source}")
+        finally:
+            conn.query(f"DROP BRANCH IF EXISTS {branch} FORCE IN {source}")
+    return versions, stats
+
+
+def rollups_markdown(stats: List[dict]) -> str:
+    lines = ["| Table | Source | Action | Rows | Seconds |", "|---|---|---|---|---|"]
+    for s in stats:
+        lines.append(
+            f"| {s['table']} | {s['source']} | {s['action']} | {s.get('rows', '')} | {s.get('seconds', '')} |"
+        )
+    return "\n".join(lines)
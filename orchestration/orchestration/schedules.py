@@ -7,7 +7,7 @@ from .assets import silver_dbt_assets
 
 schedules = [
 #     build_schedule_from_dbt_selection(
-#         [silver_dbt_assets],
+#         silver_dbt_assets,
 #         job_name="materialize_dbt_models",
 #         cron_schedule="0 0 * * *",
 #         dbt_select="fqn:*",
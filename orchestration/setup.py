@@ -18,6 +18,7 @@ setup(
         "boto3",
         "pyarrow",
         "s3fs",
+        "pyiceberg[pyarrow]",
         "requests",
         # Data quality
         "soda-core-dremio",
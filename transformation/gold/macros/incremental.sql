@@ -0,0 +1,21 @@
+-- Incremental helpers for Gold aggregates
+--
+-- Incremental aggregates store last_loaded_at, the newest Silver _loaded_at
+-- they have absorbed. Each run uses the Silver rows loaded after that
+-- watermark only to find the touched keys, then re-aggregates those keys
+-- from all of Silver and merges them. Silver merges and Full Refresh syncs
+-- re-stamp existing rows, so adding the new rows to stored totals would
+-- count them again.
+-- Keys whose dimension attributes (e.g. a station's city) differ from the
+-- stored row are re-aggregated as well.
+-- Rows moved to another key (e.g. a sale re-assigned to another customer)
+-- leave the old key stale until: dbt build --full-refresh
+
+{% macro new_silver_rows(loaded_at_column='_loaded_at') -%}
+    {% if is_incremental() %}
+    WHERE {{ loaded_at_column }} > (
+        SELECT COALESCE(MAX(last_loaded_at), TIMESTAMP '1970-01-01 00:00:00')
+        FROM {{ this }}
+    )
+    {% endif %}
+{%- endmacro %}
@@ -1,13 +1,65 @@
+-- Gold layer: Charging station utilization
+-- Incremental: stations with newly loaded (or re-loaded) sessions, stations
+-- whose city/country/station_type changed in Silver, and new stations are
+-- re-aggregated from all of Silver and merged on station_id
+
+{{ config(
+    materialized="incremental",
+    incremental_strategy="merge",
+    unique_key="station_id"
+) }}
+
 {% set nessie_branch = var('nessie_branch', 'main') %}
 
+WITH
+{% if is_incremental() %}
+touched_stations AS (
+    SELECT DISTINCT station_id
+    FROM {{ source('silver', 'charging_sessions') }} AT branch {{ nessie_branch }}
+    {{ new_silver_rows() }}
+    UNION
+    -- Dimension attributes changed since the station was last aggregated
+    SELECT st.id
+    FROM {{ source('silver', 'stations') }} AT branch {{ nessie_branch }} st
+    JOIN {{ this }} g ON g.station_id = st.id
+    WHERE g.city IS DISTINCT FROM st.city
+        OR g.country IS DISTINCT FROM st.country
+        OR g.station_type IS DISTINCT FROM st.station_type
+),
+{% endif %}
+
+station_sessions AS (
+    SELECT
+        st.id as station_id,
+        st.city,
+        st.country,
+        st.station_type,
+        COUNT(cs.id) as total_sessions,
+        COALESCE(SUM(cs.session_duration), 0) as duration_sum,
+        COUNT(cs.session_duration) as duration_count,
+        SUM(cs.energy_consumed_kWh) as total_energy_consumed,
+        MAX(cs._loaded_at) as last_loaded_at
+    FROM {{ source('silver', 'stations') }} AT branch {{ nessie_branch }} st
+    LEFT JOIN {{ source('silver', 'charging_sessions') }} AT branch {{ nessie_branch }} cs
+        ON st.id = cs.station_id
+    {% if is_incremental() %}
+    WHERE st.id IN (SELECT station_id FROM touched_stations)
+        OR st.id NOT IN (SELECT station_id FROM {{ this }})
+    {% endif %}
+    GROUP BY st.id, st.city, st.country, st.station_type
+)
+
 SELECT
-    st.id as station_id,
-    st.city,
-    st.country,
-    st.station_type,
-    COUNT(cs.id) as total_sessions,
-    AVG(cs.session_duration) as average_duration,
-    SUM(cs.energy_consumed_kWh) as total_energy_consumed
-FROM {{ source('silver', 'stations') }} AT branch {{ nessie_branch }} st
-LEFT JOIN {{ source('silver', 'charging_sessions') }} AT branch {{ nessie_branch }} cs ON st.id = cs.station_id
-GROUP BY st.id, st.city, st.country, st.station_type
+    station_id,
+    city,
+    country,
+    station_type,
+    total_sessions,
+    CASE
+        WHEN duration_count > 0 THEN CAST(duration_sum AS DOUBLE) / duration_count
+    END as average_duration,
+    total_energy_consumed,
+    duration_sum,
+    duration_count,
+    last_loaded_at
+FROM station_sessions
@@ -1,12 +1,60 @@
+-- Gold layer: Customer lifetime value
+-- Incremental: customers with newly loaded (or re-loaded) sales, customers
+-- whose first_name/email changed in Silver, and new customers are
+-- re-aggregated from all of Silver and merged on customer_id
+
+{{ config(
+    materialized="incremental",
+    incremental_strategy="merge",
+    unique_key="customer_id"
+) }}
+
 {% set nessie_branch = var('nessie_branch', 'main') %}
 
+WITH
+{% if is_incremental() %}
+touched_customers AS (
+    SELECT DISTINCT customer_id
+    FROM {{ source('silver', 'sales') }} AT branch {{ nessie_branch }}
+    {{ new_silver_rows() }}
+    UNION
+    -- Dimension attributes changed since the customer was last aggregated
+    SELECT c.id
+    FROM {{ source('silver', 'customers') }} AT branch {{ nessie_branch }} c
+    JOIN {{ this }} g ON g.customer_id = c.id
+    WHERE g.first_name IS DISTINCT FROM c.first_name
+        OR g.email IS DISTINCT FROM c.email
+),
+{% endif %}
+
+customer_sales AS (
+    SELECT
+        c.id as customer_id,
+        c.first_name,
+        c.email,
+        SUM(s.sale_price) as total_spent,
+        COUNT(s.id) as total_transactions,
+        COUNT(s.sale_price) as price_count,
+        MAX(s._loaded_at) as last_loaded_at
+    FROM {{ source('silver', 'customers') }} AT branch {{ nessie_branch }} c
+    LEFT JOIN {{ source('silver', 'sales') }} AT branch {{ nessie_branch }} s
+        ON c.id = s.customer_id
+    {% if is_incremental() %}
+    WHERE c.id IN (SELECT customer_id FROM touched_customers)
+        OR c.id NOT IN (SELECT customer_id FROM {{ this }})
+    {% endif %}
+    GROUP BY c.id, c.first_name, c.email
+)
+
 SELECT
-    c.id as customer_id,
-    c.first_name,
-    c.email,
-    SUM(s.sale_price) as total_spent,
-    COUNT(s.id) as total_transactions,
-    AVG(s.sale_price) as average_transaction_value
-FROM {{ source('silver', 'customers') }} AT branch {{ nessie_branch }} c
-LEFT JOIN {{ source('silver', 'sales') }} AT branch {{ nessie_branch }} s ON c.id = s.customer_id
-GROUP BY c.id, c.first_name, c.email
+    customer_id,
+    first_name,
+    email,
+    total_spent,
+    total_transactions,
+    CASE
+        WHEN price_count > 0 THEN total_spent / price_count
+    END as average_transaction_value,
+    price_count,
+    last_loaded_at
+FROM customer_sales
@@ -0,0 +1,39 @@
+-- Incremental helpers for append-heavy Silver models
+--
+-- Bronze rows carry Airbyte's _airbyte_extracted_at; Silver keeps it as
+-- _loaded_at so each incremental run only reads rows synced after the
+-- newest one already in the Silver table.
+-- Force a full rebuild with: dbt build --full-refresh
+
+{% macro loaded_at_column() -%}
+    _airbyte_extracted_at AS _loaded_at
+{%- endmacro %}
+
+{% macro incremental_filter(source_column='_airbyte_extracted_at', target_column='_loaded_at') -%}
+    {% if is_incremental() %}
+    WHERE {{ source_column }} > (
+        SELECT COALESCE(MAX({{ target_column }}), TIMESTAMP '1970-01-01 00:00:00')
+        FROM {{ this }}
+    )
+    {% endif %}
+{%- endmacro %}
+
+-- Newest version of each key among the rows the incremental filter lets
+-- through; a merge fails or keeps an arbitrary version when a batch holds
+-- the same key twice (re-synced or updated rows)
+{% macro latest_synced_rows(relation, unique_key='id', source_column='_airbyte_extracted_at') -%}
+    (
+        SELECT *
+        FROM (
+            SELECT
+                *,
+                ROW_NUMBER() OVER (
+                    PARTITION BY {{ unique_key }}
+                    ORDER BY {{ source_column }} DESC
+                ) AS _sync_rank
+            FROM {{ relation }}
+            {{ incremental_filter(source_column) }}
+        ) ranked
+        WHERE _sync_rank = 1
+    ) latest
+{%- endmacro %}
@@ -1,8 +1,15 @@
 -- Silver layer: Charging sessions cleaned and standardized
--- Excludes Airbyte metadata columns (_airbyte_*)
+-- Excludes Airbyte metadata columns (_airbyte_*) except the sync timestamp
+-- Incremental: only newly synced rows are read, late updates merged on id
+-- (the newest version of an id wins when one sync holds several)
 -- NOTE: Column names may need adjustment based on actual Bronze schema
 
-{{ config(materialized="table", twin_strategy="allow") }}
+{{ config(
+    materialized="incremental",
+    incremental_strategy="merge",
+    unique_key="id",
+    twin_strategy="allow"
+) }}
 
 SELECT
     id,
@@ -11,6 +18,7 @@ SELECT
     energy_consumed_kWh,
     charging_rate,
     cost,
-    start_time,
-    end_time
-FROM {{ source("bronze", "charging_sessions") }}
+    TO_TIMESTAMP(start_time, 'MM/DD/YYYY HH24:MI:SS', 1) AS start_time,
+    TO_TIMESTAMP(end_time, 'MM/DD/YYYY HH24:MI:SS', 1) AS end_time,
+    {{ loaded_at_column() }}
+FROM {{ latest_synced_rows(source("bronze", "charging_sessions")) }}
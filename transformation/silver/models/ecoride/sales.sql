@@ -1,7 +1,14 @@
 -- Silver layer: Sales transactions cleaned and standardized
--- Excludes Airbyte metadata columns (_airbyte_*)
+-- Excludes Airbyte metadata columns (_airbyte_*) except the sync timestamp
+-- Incremental: only newly synced rows are read, late updates merged on id
+-- (the newest version of an id wins when one sync holds several)
 
-{{ config(materialized="table", twin_strategy="allow") }}
+{{ config(
+    materialized="incremental",
+    incremental_strategy="merge",
+    unique_key="id",
+    twin_strategy="allow"
+) }}
 
 SELECT
     id,
@@ -9,5 +16,6 @@ SELECT
     vehicle_id,
     TO_DATE(sale_date, 'MM/DD/YYYY', 1) AS sale_date,
     CAST(sale_price AS DOUBLE) AS sale_price,
-    payment_method
-FROM {{ source("bronze", "sales") }}
+    payment_method,
+    {{ loaded_at_column() }}
+FROM {{ latest_synced_rows(source("bronze", "sales")) }}
@@ -1,13 +1,21 @@
 -- Silver layer: Vehicle health logs cleaned and standardized
--- Excludes Airbyte metadata columns (_airbyte_*)
+-- Excludes Airbyte metadata columns (_airbyte_*) except the sync timestamp
+-- Rebuilt from Bronze on every run (not incremental): Full Refresh | Overwrite
+-- syncs and Bronze overwrites re-stamp every record, and records have no
+-- stable key to merge on (VehicleID repeats, history and alerts are nested
+-- arrays), so appending rows past the watermark would duplicate them
 -- NOTE: Column names depend on original JSON field names - may need adjustment
 
-{{ config(materialized="table", twin_strategy="allow") }}
+{{ config(
+    materialized="table",
+    twin_strategy="allow"
+) }}
 
 SELECT
     VehicleID AS vehicle_id,
     Model AS model,
     ManufacturingYear AS manufacturing_year,
     Alerts AS alerts,
-    MaintenanceHistory AS maintenance_history
+    MaintenanceHistory AS maintenance_history,
+    {{ loaded_at_column() }}
 FROM {{ source("bronze", "vehicle_health") }}